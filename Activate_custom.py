@@ -27,6 +27,11 @@ _script_fullpath                            = CommonEnvironment.ThisFullpath()
 _script_dir, _script_name                   = os.path.split(_script_fullpath)
 # ----------------------------------------------------------------------
 
+sys.path.insert(0, os.path.join(_script_dir, "Libraries", "Python", "CppMSVCCommon", "v1.0"))
+from CppMSVCCommon import EnvironmentCache
+
+del sys.path[0]
+
 # <Class '<name>' has no '<attr>' member> pylint: disable = E1101
 # <Unrearchable code> pylint: disable = W0101
 # <Unused argument> pylint: disable = W0613
@@ -52,7 +57,15 @@ def GetCustomActions(
     cases, this is Bash on Linux systems and Batch or PowerShell on Windows systems.
     """
 
-    return []
+    return _GetCachedEnvironmentActions(
+        output_stream,
+        configuration,
+        version_specs,
+        generated_dir,
+        verbose,
+        fast,
+        repositories,
+    )
 
 
 # ----------------------------------------------------------------------
@@ -96,3 +109,73 @@ def GetCustomScriptExtractors():
     """
 
     return
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetCachedEnvironmentActions(
+    output_stream,
+    configuration,
+    version_specs,
+    generated_dir,
+    verbose,
+    fast,
+    repositories,
+    capture_func=None,
+):
+    """\
+    Captures the toolchain environment once per (configuration, version specs,
+    dependency revisions) and replays it when `fast` is set (see
+    CppMSVCCommon.EnvironmentCache). `capture_func` has the same signature as
+    EnvironmentCache.Capture, which is used by default.
+    """
+
+    capture_command_line = EnvironmentCache.GetCaptureCommandLine(configuration)
+    if not capture_command_line:
+        return []
+
+    cache = EnvironmentCache.EnvironmentCache(
+        os.getenv(EnvironmentCache.CACHE_DIR_ENV_VAR) or os.path.join(generated_dir, "EnvironmentCache"),
+        EnvironmentCache.GetMaxAge(),
+    )
+
+    key = cache.CreateKey(
+        configuration,
+        version_specs,
+        [
+            EnvironmentCache.GetRevision(repository.Root) if getattr(repository, "Root", None) else None
+            for repository in repositories or []
+        ],
+        capture_command_line,
+    )
+
+    diff = cache.Get(key)
+
+    if diff is None:
+        capture_func = capture_func or EnvironmentCache.Capture
+
+        try:
+            diff = capture_func(capture_command_line)
+        except EnvironmentCache.CaptureError as ex:
+            # Activation continues without the cache
+            output_stream.write("WARNING: The environment could not be captured; {}\n".format(ex))
+            return []
+
+        cache.Set(key, diff)
+
+        if verbose:
+            output_stream.write("The environment has been captured ({} variables).\n".format(len(diff)))
+
+    if not fast:
+        return []
+
+    if verbose:
+        output_stream.write("Replaying the cached environment ({} variables).\n".format(len(diff)))
+
+    # Entries are added to path-like variables so that changes made to them by other
+    # repositories during this activation are preserved.
+    return [
+        CurrentShell.Commands.Augment(name, value) if EnvironmentCache.IsPathVariable(name) else CurrentShell.Commands.Set(name, value)
+        for name, value in sorted(diff.items())
+    ]
@@ -0,0 +1,422 @@
+# ----------------------------------------------------------------------
+# |
+# |  EnvironmentCache.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 20:51:09
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Captures the environment variables produced by the MSVC toolchain once and
+replays them during fast activations.
+
+The capture is performed by a command that derives the toolchain environment
+and writes the resulting variables as NAME=VALUE lines. On Windows, the default
+command locates the latest Visual Studio installation with vswhere and runs `set`
+after calling vcvarsall.bat for the configuration's architecture; a different
+command can be provided via an environment variable. The difference between that
+output and the current environment is cached per (configuration, version specs,
+dependency revisions, capture command).
+
+Only the entries added to path-like variables (PATH, INCLUDE, LIB, LIBPATH) are
+cached, so that they can be replayed by augmenting the variables rather than
+replacing their values; other variables are cached (and replayed) as values.
+
+Cached entries are discarded when:
+
+    - The format version or the capture command changes.
+    - The entry is older than the maximum age.
+    - A directory added to a path-like variable no longer exists (for example,
+      the toolchain was updated or removed).
+
+Variables removed by the capture command (and entries removed from path-like
+variables) are not replayed.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+import CommonEnvironment
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Optional environment variable that overrides the command that derives the toolchain
+# environment and writes it as NAME=VALUE lines (for example, a stand-in script can be used
+# when running on Linux, where there isn't a default command).
+CAPTURE_COMMAND_LINE_ENV_VAR                = "CPP_MSVC_COMMON_ENVIRONMENT_CAPTURE_COMMAND"
+
+# Optional environment variable that overrides the cache directory (a directory within
+# the activation's generated directory is used by default)
+CACHE_DIR_ENV_VAR                           = "CPP_MSVC_COMMON_ENVIRONMENT_CACHE_DIR"
+
+# Optional environment variable that overrides the maximum age of an entry (in seconds)
+MAX_AGE_ENV_VAR                             = "CPP_MSVC_COMMON_ENVIRONMENT_CACHE_MAX_AGE"
+
+DEFAULT_MAX_AGE                             = 7 * 24 * 60 * 60
+
+PATH_VARIABLES                              = ("PATH", "INCLUDE", "LIB", "LIBPATH")
+
+# Configurations that have a default capture command on Windows
+DEFAULT_CAPTURE_ARCHITECTURES               = ("x64", "x86")
+
+# Increment this value when the format of cached content changes
+_FORMAT_VERSION                             = 2
+
+_VSWHERE_FILENAME                           = r"%ProgramFiles(x86)%\Microsoft Visual Studio\Installer\vswhere.exe"
+
+# Invoked by cmd.exe. The command fails when vswhere isn't available; the environment isn't
+# written when vcvarsall.bat fails.
+_DEFAULT_CAPTURE_COMMAND_LINE_TEMPLATE      = (
+    'if not exist "{vswhere}" (exit 1) else '
+    'for /f "usebackq delims=" %i in (`"{vswhere}" -latest -products * -requires Microsoft.VisualStudio.Component.VC.Tools.x86.x64 -property installationPath`) '
+    r'do @call "%i\VC\Auxiliary\Build\vcvarsall.bat" {architecture} >NUL && set'
+)
+
+_ENTRY_EXTENSION                            = ".environment"
+
+
+# ----------------------------------------------------------------------
+class CaptureError(Exception):
+    """Raised when the capture command fails"""
+
+
+# ----------------------------------------------------------------------
+class EnvironmentCache(object):
+    """Cache of environment variable differences produced by a capture command"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        cache_dir,
+        max_age=DEFAULT_MAX_AGE,
+    ):
+        self.CacheDir                       = cache_dir
+        self.MaxAge                         = max_age
+
+        if not os.path.isdir(cache_dir):
+            try:
+                os.makedirs(cache_dir)
+            except OSError:
+                # Another process may have created the directory
+                if not os.path.isdir(cache_dir):
+                    raise
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def CreateKey(configuration, version_specs, revisions, capture_command_line):
+        """\
+        Returns the key for the provided values; `revisions` is a list of revisions
+        (or None when a revision can't be determined) for each dependency.
+        """
+
+        hasher = hashlib.sha256()
+
+        hasher.update(
+            json.dumps(
+                [
+                    _FORMAT_VERSION,
+                    configuration,
+                    version_specs,
+                    revisions,
+                    capture_command_line,
+                ],
+                sort_keys=True,
+                default=_ToJson,
+            ).encode("utf-8"),
+        )
+
+        return hasher.hexdigest()
+
+    # ----------------------------------------------------------------------
+    def Get(self, key, environ=None):
+        """\
+        Returns the cached differences (see CreateDiff) or None if the key isn't in
+        the cache; entries that are no longer valid are removed.
+        """
+
+        filename = self._GetEntryFilename(key)
+
+        try:
+            with open(filename) as f:
+                entry = json.load(f)
+
+            if entry["version"] != _FORMAT_VERSION or entry["key"] != key:
+                raise ValueError()
+
+            diff = entry["diff"]
+
+            if time.time() - entry["created"] > self.MaxAge or not _AreDirectoriesValid(diff, environ or os.environ):
+                raise ValueError()
+
+            return diff
+
+        except (IOError, OSError):
+            return None
+
+        except (ValueError, KeyError, TypeError):
+            self.Remove(key)
+            return None
+
+    # ----------------------------------------------------------------------
+    def Set(self, key, diff):
+        filename = self._GetEntryFilename(key)
+
+        fd, temp_filename = tempfile.mkstemp(
+            dir=self.CacheDir,
+            suffix=".tmp",
+        )
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {
+                        "version": _FORMAT_VERSION,
+                        "key": key,
+                        "created": time.time(),
+                        "diff": diff,
+                    },
+                    f,
+                )
+
+            os.replace(temp_filename, filename)
+
+        finally:
+            if os.path.isfile(temp_filename):
+                os.remove(temp_filename)
+
+    # ----------------------------------------------------------------------
+    def Remove(self, key):
+        try:
+            os.remove(self._GetEntryFilename(key))
+        except OSError:
+            pass
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _GetEntryFilename(self, key):
+        return os.path.join(self.CacheDir, "{}{}".format(key, _ENTRY_EXTENSION))
+
+
+# ----------------------------------------------------------------------
+def GetMaxAge():
+    """Returns the maximum age configured via the environment variable (or the default)"""
+
+    value = os.getenv(MAX_AGE_ENV_VAR)
+    return int(value) if value else DEFAULT_MAX_AGE
+
+
+# ----------------------------------------------------------------------
+def GetCaptureCommandLine(configuration):
+    """\
+    Returns the capture command configured via the environment variable, the default
+    command for the configuration, or None if there isn't a command (in which case
+    the cache isn't used).
+    """
+
+    command_line = os.getenv(CAPTURE_COMMAND_LINE_ENV_VAR)
+    if command_line:
+        return command_line
+
+    if os.name != "nt" or configuration not in DEFAULT_CAPTURE_ARCHITECTURES:
+        return None
+
+    return _DEFAULT_CAPTURE_COMMAND_LINE_TEMPLATE.format(
+        vswhere=_VSWHERE_FILENAME,
+        architecture=configuration,
+    )
+
+
+# ----------------------------------------------------------------------
+def Capture(command_line, environ=None):
+    """\
+    Invokes the capture command and returns its differences relative to `environ`
+    (os.environ by default); see CreateDiff.
+    """
+
+    environ = os.environ if environ is None else environ
+
+    result = subprocess.run(
+        command_line,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        env=dict(environ),
+    )
+
+    if result.returncode != 0:
+        raise CaptureError(
+            "'{}' failed ({}):\n{}".format(command_line, result.returncode, result.stdout),
+        )
+
+    return CreateDiff(environ, ParseVariables(result.stdout))
+
+
+# ----------------------------------------------------------------------
+def ParseVariables(content):
+    """Returns the {name: value} variables in NAME=VALUE lines; other lines are ignored"""
+
+    variables = {}
+
+    for line in content.splitlines():
+        name, sep, value = line.partition("=")
+
+        # Names that begin with '=' are drive-specific working directories on Windows
+        if not sep or not name or name != name.strip():
+            continue
+
+        variables[name] = value
+
+    return variables
+
+
+# ----------------------------------------------------------------------
+def CreateDiff(before, after):
+    """\
+    Returns {name: value} for the variables in `after` that are new or different
+    in `before`. The value of a path-like variable is the list of entries that were
+    added to it; path-like variables without added entries aren't included.
+    """
+
+    before = {_NormalizeName(name): value for name, value in before.items()}
+
+    diff = {}
+
+    for name, value in after.items():
+        before_value = before.get(_NormalizeName(name))
+        if before_value == value:
+            continue
+
+        if IsPathVariable(name):
+            existing = set(_NormalizePathEntry(entry) for entry in (before_value or "").split(os.pathsep))
+
+            added = []
+
+            for entry in value.split(os.pathsep):
+                normalized_entry = _NormalizePathEntry(entry)
+
+                if entry and normalized_entry not in existing:
+                    existing.add(normalized_entry)
+                    added.append(entry)
+
+            if added:
+                diff[name] = added
+
+            continue
+
+        diff[name] = value
+
+    return diff
+
+
+# ----------------------------------------------------------------------
+def IsPathVariable(name):
+    """Returns True if the variable is path-like (its differences are entries to add)"""
+
+    return _NormalizeName(name) in PATH_VARIABLES
+
+
+# ----------------------------------------------------------------------
+def GetRevision(repository_root):
+    """\
+    Returns the current revision of the Git or Mercurial repository, or None if it
+    can't be determined. Repository metadata is read directly, as launching the SCM
+    would be more expensive than the cache lookup.
+    """
+
+    git_dir = os.path.join(repository_root, ".git")
+
+    try:
+        if os.path.isdir(git_dir):
+            with open(os.path.join(git_dir, "HEAD")) as f:
+                head = f.read().strip()
+
+            if not head.startswith("ref:"):
+                return head
+
+            ref = head[len("ref:"):].strip()
+
+            ref_filename = os.path.join(git_dir, *ref.split("/"))
+            if os.path.isfile(ref_filename):
+                with open(ref_filename) as f:
+                    return f.read().strip()
+
+            packed_refs_filename = os.path.join(git_dir, "packed-refs")
+            if os.path.isfile(packed_refs_filename):
+                with open(packed_refs_filename) as f:
+                    for line in f:
+                        parts = line.split()
+                        if len(parts) == 2 and parts[1] == ref:
+                            return parts[0]
+
+            return None
+
+        dirstate_filename = os.path.join(repository_root, ".hg", "dirstate")
+        if os.path.isfile(dirstate_filename):
+            # The first 20 bytes are the node id of the working directory's parent
+            with open(dirstate_filename, "rb") as f:
+                return f.read(20).hex()
+
+    except (IOError, OSError):
+        pass
+
+    return None
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _NormalizeName(name):
+    # Environment variable names are case-insensitive on Windows
+    return name.upper() if os.name == "nt" else name
+
+
+# ----------------------------------------------------------------------
+def _NormalizePathEntry(entry):
+    return os.path.normcase(entry)
+
+
+# ----------------------------------------------------------------------
+def _AreDirectoriesValid(diff, environ):
+    environ = {_NormalizeName(name): value for name, value in environ.items()}
+
+    for name, value in diff.items():
+        if not IsPathVariable(name):
+            continue
+
+        if not isinstance(value, list):
+            raise ValueError()
+
+        existing = set(_NormalizePathEntry(entry) for entry in environ.get(_NormalizeName(name), "").split(os.pathsep))
+
+        for directory in value:
+            if _NormalizePathEntry(directory) not in existing and not os.path.isdir(directory):
+                return False
+
+    return True
+
+
+# ----------------------------------------------------------------------
+def _ToJson(value):
+    if hasattr(value, "_asdict"):
+        return value._asdict()
+
+    if hasattr(value, "__dict__"):
+        return vars(value)
+
+    return str(value)
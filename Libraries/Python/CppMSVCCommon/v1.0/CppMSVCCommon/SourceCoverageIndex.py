@@ -0,0 +1,457 @@
+# ----------------------------------------------------------------------
+# |
+# |  SourceCoverageIndex.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 21:37:52
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Persisted per-method coverage organized by source file.
+
+The index is populated by CodeCoverageExecutor when per-method results are
+extracted (or read from the coverage cache) and used to check the coverage of
+changed source files before they are committed without running tests or
+extracting coverage for the entire repository. Sharded extraction only calculates
+totals, so it isn't used while the index is enabled.
+
+Layout:
+
+    <index_dir>/binaries/<hash>.json    Information about an extracted binary: the coverage
+                                        file, include and exclude patterns, the size and
+                                        modification time of both files when extracted,
+                                        and the source files that contain its methods.
+    <index_dir>/files/<hash>.json       Methods (module, namespace, class, name and block counts)
+                                        within a source file for each binary, along with the
+                                        file's accepted (baseline) totals.
+
+Checking a set of changed files only reads the entries for those files and the
+binaries that contain their methods, so the cost is independent of the size of
+the index. The index isn't safe for concurrent writers.
+
+This module is imported by the SCM hook and therefore doesn't import the test
+executor (or its dependencies) unless coverage has to be extracted.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from collections import namedtuple
+
+import CommonEnvironment
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Set this environment variable to the directory of the index to populate it during
+# extraction and to check coverage when committing.
+INDEX_DIR_ENV_VAR                           = "CPP_MSVC_COMMON_COVERAGE_INDEX_DIR"
+
+# Increment this value when the format of the index changes
+_FORMAT_VERSION                             = 2
+
+# ----------------------------------------------------------------------
+FileCoverage                                = namedtuple(
+    "FileCoverage",
+    [
+        "SourceFile",
+        "BaselineCovered",                  # None if the file doesn't have a baseline
+        "BaselineNotCovered",               # None if the file doesn't have a baseline
+        "CurrentCovered",
+        "CurrentNotCovered",
+    ],
+)
+
+
+# ----------------------------------------------------------------------
+def IsRegression(file_coverage):
+    """Returns True if the percentage of covered blocks decreased relative to the baseline"""
+
+    if file_coverage.BaselineCovered is None:
+        return False
+
+    # Compare covered / total without floating point: a / b < c / d  <==>  a * d < c * b
+    baseline_total = file_coverage.BaselineCovered + file_coverage.BaselineNotCovered
+    current_total = file_coverage.CurrentCovered + file_coverage.CurrentNotCovered
+
+    if baseline_total == 0 or current_total == 0:
+        return file_coverage.BaselineCovered != 0 and file_coverage.CurrentCovered == 0
+
+    return file_coverage.CurrentCovered * baseline_total < file_coverage.BaselineCovered * current_total
+
+
+# ----------------------------------------------------------------------
+class SourceCoverageIndex(object):
+    """Per-method coverage by source file; see the module's documentation for more information"""
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def GetDefault(cls):
+        """Returns the index configured via the environment variable (or None if it isn't enabled)"""
+
+        index_dir = os.getenv(INDEX_DIR_ENV_VAR)
+        if not index_dir:
+            return None
+
+        return cls(index_dir)
+
+    # ----------------------------------------------------------------------
+    def __init__(self, index_dir):
+        self.IndexDir                       = index_dir
+
+        self._binaries_dir                  = os.path.join(index_dir, "binaries")
+        self._files_dir                     = os.path.join(index_dir, "files")
+
+    # ----------------------------------------------------------------------
+    def Record(self, binary_filename, coverage_filename, includes, excludes, results):
+        """Replaces the information associated with the binary with the CoverageResults"""
+
+        binary_filename = _Normalize(binary_filename)
+
+        methods = {}
+
+        for (module, name, covered, not_covered), namespace, class_name, source_file in zip(
+            results.MethodTotals("blocks"),
+            results.Namespaces,
+            results.Classes,
+            results.SourceFiles,
+        ):
+            if not source_file:
+                continue
+
+            methods.setdefault(_Normalize(source_file), []).append(
+                [module, namespace, class_name, name, covered, not_covered],
+            )
+
+        previous = self._Read(self._GetBinaryFilename(binary_filename)) or {}
+
+        # Remove the binary from files that no longer contain its methods
+        for source_file in previous.get("source_files", []):
+            if source_file in methods:
+                continue
+
+            content = self._Read(self._GetFileFilename(source_file))
+            if content is None:
+                continue
+
+            content["methods"].pop(binary_filename, None)
+            self._Write(self._GetFileFilename(source_file), content)
+
+        for source_file, file_methods in methods.items():
+            filename = self._GetFileFilename(source_file)
+
+            content = self._Read(filename) or {
+                "source_file": source_file,
+                "methods": {},
+                "baseline": None,
+            }
+
+            content["methods"][binary_filename] = file_methods
+            self._Write(filename, content)
+
+        self._Write(
+            self._GetBinaryFilename(binary_filename),
+            {
+                "binary_filename": binary_filename,
+                "coverage_filename": os.path.realpath(coverage_filename),
+                "includes": list(includes or []),
+                "excludes": list(excludes or []),
+                "inputs": _GetInputs(binary_filename, coverage_filename),
+                "source_files": sorted(methods.keys()),
+            },
+        )
+
+    # ----------------------------------------------------------------------
+    def IsRecorded(self, binary_filename, coverage_filename, includes, excludes):
+        """\
+        Returns True if the binary was recorded with the coverage file and patterns
+        and neither file has changed since.
+        """
+
+        binary_filename = _Normalize(binary_filename)
+
+        info = self._Read(self._GetBinaryFilename(binary_filename))
+        if info is None:
+            return False
+
+        return (
+            info["coverage_filename"] == os.path.realpath(coverage_filename)
+            and info["includes"] == list(includes or [])
+            and info["excludes"] == list(excludes or [])
+            and info["inputs"] == _GetInputs(binary_filename, coverage_filename)
+        )
+
+    # ----------------------------------------------------------------------
+    def GetStaleBinaries(self, source_files):
+        """\
+        Returns information about the binaries that contain methods in the source
+        files and whose binary or coverage file changed since they were recorded;
+        each item is a dict with the keys "binary_filename", "coverage_filename",
+        "includes" and "excludes".
+        """
+
+        binaries = set()
+
+        for source_file in source_files:
+            content = self._Read(self._GetFileFilename(_Normalize(source_file)))
+            if content is not None:
+                binaries.update(content["methods"].keys())
+
+        results = []
+
+        for binary_filename in sorted(binaries):
+            info = self._Read(self._GetBinaryFilename(binary_filename))
+            if info is None:
+                continue
+
+            if info["inputs"] != _GetInputs(info["binary_filename"], info["coverage_filename"]):
+                results.append(info)
+
+        return results
+
+    # ----------------------------------------------------------------------
+    def GetFileCoverage(self, source_files):
+        """Returns FileCoverage for each source file in the index"""
+
+        results = []
+
+        for source_file in source_files:
+            content = self._Read(self._GetFileFilename(_Normalize(source_file)))
+            if content is None:
+                continue
+
+            covered = 0
+            not_covered = 0
+
+            # Methods are combined in the same way as they are by CoverageMerge with KEY_NAME
+            # (see KEYS in CoverageResults): rows with the same scope are summed within a
+            # binary, and the same method compiled into many binaries is counted once with
+            # the best coverage observed.
+            method_totals = {}
+
+            for binary_methods in content["methods"].values():
+                scope_totals = {}
+
+                for module, namespace, class_name, name, method_covered, method_not_covered in binary_methods:
+                    scope = (module, namespace, class_name, name)
+
+                    existing = scope_totals.get(scope)
+                    if existing is None:
+                        scope_totals[scope] = (method_covered, method_not_covered)
+                    else:
+                        scope_totals[scope] = (existing[0] + method_covered, existing[1] + method_not_covered)
+
+                for (_, namespace, class_name, name), (method_covered, method_not_covered) in scope_totals.items():
+                    key = (namespace, class_name, name)
+                    total = method_covered + method_not_covered
+
+                    existing = method_totals.get(key)
+                    if existing is None:
+                        method_totals[key] = (method_covered, total)
+                    else:
+                        method_totals[key] = (max(existing[0], method_covered), max(existing[1], total))
+
+            for method_covered, total in method_totals.values():
+                covered += method_covered
+                not_covered += max(total, method_covered) - method_covered
+
+            baseline = content["baseline"]
+
+            results.append(
+                FileCoverage(
+                    content["source_file"],
+                    baseline[0] if baseline is not None else None,
+                    baseline[1] if baseline is not None else None,
+                    covered,
+                    not_covered,
+                ),
+            )
+
+        return results
+
+    # ----------------------------------------------------------------------
+    def Accept(self, file_coverage_items):
+        """Makes the current totals of each FileCoverage the baseline for the file"""
+
+        for file_coverage in file_coverage_items:
+            filename = self._GetFileFilename(file_coverage.SourceFile)
+
+            content = self._Read(filename)
+            if content is None:
+                continue
+
+            content["baseline"] = [file_coverage.CurrentCovered, file_coverage.CurrentNotCovered]
+            self._Write(filename, content)
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _GetBinaryFilename(self, binary_filename):
+        return os.path.join(self._binaries_dir, "{}.json".format(_Hash(binary_filename)))
+
+    # ----------------------------------------------------------------------
+    def _GetFileFilename(self, source_file):
+        return os.path.join(self._files_dir, "{}.json".format(_Hash(source_file)))
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _Read(filename):
+        try:
+            with open(filename) as f:
+                content = json.load(f)
+
+            if content.get("version") != _FORMAT_VERSION:
+                return None
+
+            return content["content"]
+
+        except (IOError, OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _Write(filename, content):
+        dirname = os.path.dirname(filename)
+
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        fd, temp_filename = tempfile.mkstemp(
+            dir=dirname,
+            suffix=".tmp",
+        )
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": _FORMAT_VERSION, "content": content}, f)
+
+            os.replace(temp_filename, filename)
+
+        finally:
+            if os.path.isfile(temp_filename):
+                os.remove(temp_filename)
+
+
+# ----------------------------------------------------------------------
+def CheckChangedFiles(
+    index,
+    changed_filenames,
+    output_stream,
+    extract_func=None,
+):
+    """\
+    Checks the coverage of the changed files; returns 0 if coverage didn't regress
+    (in which case the current coverage becomes the baseline) or -1 if it did.
+
+    Coverage is only extracted for binaries whose inputs changed since they were
+    recorded. `extract_func` has the same signature as
+    CodeCoverageExecutor.ExtractMethodCoverageInfo, which is used by default.
+    """
+
+    for info in index.GetStaleBinaries(changed_filenames):
+        if not os.path.isfile(info["coverage_filename"]):
+            output_stream.write(
+                "WARNING: The coverage file '{}' for '{}' no longer exists; its previous coverage will be used.\n".format(
+                    info["coverage_filename"],
+                    info["binary_filename"],
+                ),
+            )
+            continue
+
+        if extract_func is None:
+            from CppMSVCCommon.TestExecutorImpl.CodeCoverageExecutor import CodeCoverageExecutor
+
+            extract_func = CodeCoverageExecutor.ExtractMethodCoverageInfo
+
+        results = extract_func(
+            info["coverage_filename"],
+            info["binary_filename"],
+            info["includes"],
+            info["excludes"],
+            output_stream,
+        )
+
+        if isinstance(results, int):
+            output_stream.write(
+                "Coverage could not be extracted for '{}' ({}).\n".format(info["binary_filename"], results),
+            )
+            return results or -1
+
+        # ExtractMethodCoverageInfo records the results when this is the default index
+        if not index.IsRecorded(info["binary_filename"], info["coverage_filename"], info["includes"], info["excludes"]):
+            index.Record(
+                info["binary_filename"],
+                info["coverage_filename"],
+                info["includes"],
+                info["excludes"],
+                results,
+            )
+
+    file_coverage_items = index.GetFileCoverage(changed_filenames)
+
+    regressions = [file_coverage for file_coverage in file_coverage_items if IsRegression(file_coverage)]
+
+    if regressions:
+        output_stream.write(
+            "Code coverage regressed:\n{}\n".format(
+                "\n".join(
+                    "    - {}: {} (baseline: {})".format(
+                        file_coverage.SourceFile,
+                        _FormatPercentage(file_coverage.CurrentCovered, file_coverage.CurrentNotCovered),
+                        _FormatPercentage(file_coverage.BaselineCovered, file_coverage.BaselineNotCovered),
+                    )
+                    for file_coverage in regressions
+                ),
+            ),
+        )
+
+        return -1
+
+    index.Accept(file_coverage_items)
+    return 0
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Normalize(filename):
+    return os.path.normcase(os.path.realpath(filename))
+
+
+# ----------------------------------------------------------------------
+def _Hash(value):
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+# ----------------------------------------------------------------------
+def _GetInputs(binary_filename, coverage_filename):
+    inputs = []
+
+    for filename in [binary_filename, coverage_filename]:
+        try:
+            stat = os.stat(filename)
+            inputs.append([stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            inputs.append(None)
+
+    return inputs
+
+
+# ----------------------------------------------------------------------
+def _FormatPercentage(covered, not_covered):
+    total = covered + not_covered
+    if total == 0:
+        return "N/A"
+
+    return "{:.2f}%".format(covered * 100.0 / total)
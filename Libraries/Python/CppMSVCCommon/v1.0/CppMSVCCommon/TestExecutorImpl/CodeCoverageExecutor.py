@@ -15,25 +15,48 @@
 # ----------------------------------------------------------------------
 """Contains the CodeCoverageExecutor object"""
 
-import csv
-from fnmatch import fnmatch
+import math
 import os
-import subprocess
+
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 import CommonEnvironment
 from CommonEnvironment.CallOnExit import CallOnExit
 from CommonEnvironment import FileSystem
 from CommonEnvironment import Interface
-from CommonEnvironment import Process
 from CommonEnvironment.Shell.All import CurrentShell
 
 from CppCommon.CodeCoverageExecutor import CodeCoverageExecutor as CodeCoverageExecutorBase
 
+from CppMSVCCommon.SourceCoverageIndex import SourceCoverageIndex
+from CppMSVCCommon.TestExecutorImpl import CoverageConverter
+from CppMSVCCommon.TestExecutorImpl.CoverageCache import CoverageCache
+from CppMSVCCommon.TestExecutorImpl.CoveragePipeline import CoveragePipeline
+from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults, ROW_NAME_INDEX, ROW_BLOCKS_COVERED_INDEX, ROW_BLOCKS_NOT_COVERED_INDEX
+from CppMSVCCommon.TestExecutorImpl import CoverageSession
+from CppMSVCCommon.TestExecutorImpl import CoverageShards
+from CppMSVCCommon.TestExecutorImpl import InstrumentationManifest
+from CppMSVCCommon.TestExecutorImpl.PatternMatcher import PatternMatcher
+from CppMSVCCommon.TestExecutorImpl import Timing
+
 # ----------------------------------------------------------------------
 _script_fullpath                            = CommonEnvironment.ThisFullpath()
 _script_dir, _script_name                   = os.path.split(_script_fullpath)
 # ----------------------------------------------------------------------
 
+# ----------------------------------------------------------------------
+BatchResult                                 = namedtuple(
+    "BatchResult",
+    [
+        "CoverageFilename",
+        "BinaryFilename",
+        "Result",                           # (covered, not_covered) on success, a non-zero result code or None on failure
+        "Error",                            # Error message if an exception was raised during extraction
+        "Output",
+    ],
+)
+
 # ----------------------------------------------------------------------
 @Interface.staticderived
 class CodeCoverageExecutor(CodeCoverageExecutorBase):
@@ -49,8 +72,18 @@ class CodeCoverageExecutor(CodeCoverageExecutorBase):
     @staticmethod
     @Interface.override
     def PreprocessBinary(binary_filename, output_stream):
-        FileSystem.RemoveFile("{}.orig".format(binary_filename))
-        return Process.Execute('vsinstr "{}" /COVERAGE'.format(binary_filename), output_stream)
+        return InstrumentationManifest.InstrumentBinary(binary_filename, output_stream)
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def PreprocessBinaries(binary_filenames, output_stream, max_workers=None):
+        """Instruments multiple binaries concurrently; returns a result code for each binary"""
+
+        return InstrumentationManifest.InstrumentBinaries(
+            binary_filenames,
+            output_stream,
+            max_workers=max_workers,
+        )
 
     # ----------------------------------------------------------------------
     @classmethod
@@ -59,111 +92,578 @@ class CodeCoverageExecutor(CodeCoverageExecutorBase):
         # Shutdown any existing monitors
         cls.StopCoverage(output_stream)
 
-        result, output = _ProcessExecuteWorkaround(
-            'VSPerfCmd.exe /WAITSTART /START:COVERAGE "/OUTPUT:{}"'.format(
-                coverage_filename,
-            ),
-        )
-        output_stream.write(output)
-
-        return result
+        return CoverageSession.StartMonitor(coverage_filename, output_stream)
 
     # ----------------------------------------------------------------------
     @staticmethod
     @Interface.override
     def StopCoverage(output_stream):
-        return Process.Execute("VSPerfCmd.exe /SHUTDOWN", output_stream)
+        return CoverageSession.StopMonitor(output_stream)
 
     # ----------------------------------------------------------------------
     @staticmethod
     @Interface.override
     def ExtractCoverageInfo(coverage_filename, binary_filename, includes, excludes, output_stream):
-        if excludes:
-            excludes_func = lambda method_name: any(fnmatch(method_name, exclude) for exclude in excludes)
-        else:
-            excludes_func = lambda method_name: False
+        source_index = SourceCoverageIndex.GetDefault()
+        cache = CoverageCache.GetDefault()
+
+        if cache is not None:
+            # Per-method results are required to populate the index, so cached totals are only
+            # used when the index is disabled or already contains the binary.
+            if source_index is None or source_index.IsRecorded(binary_filename, coverage_filename, includes, excludes):
+                totals = _GetCachedTotals(
+                    cache,
+                    cache.CreateKey(
+                        coverage_filename,
+                        os.path.basename(binary_filename),
+                        includes,
+                        excludes,
+                    ),
+                )
+
+                if totals is not None:
+                    return totals
+
+            results = CodeCoverageExecutor.ExtractMethodCoverageInfo(
+                coverage_filename,
+                binary_filename,
+                includes,
+                excludes,
+                output_stream,
+            )
 
-        if includes:
-            includes_func = lambda method_name: any(fnmatch(method_name, include) for include in includes)
-        else:
-            includes_func = lambda method_name: True
+            if not isinstance(results, CoverageResults):
+                return results
+
+            return results.Totals("blocks")
+
+        if source_index is not None:
+            # Per-method results are required to populate the index, so sharded extraction
+            # (which only calculates totals) isn't used.
+            results = CodeCoverageExecutor.ExtractMethodCoverageInfo(
+                coverage_filename,
+                binary_filename,
+                includes,
+                excludes,
+                output_stream,
+            )
+
+            if not isinstance(results, CoverageResults):
+                return results
+
+            return results.Totals("blocks")
+
+        shard_workers = CoverageShards.GetDefaultWorkers()
+        if shard_workers is not None:
+            return CodeCoverageExecutor.ExtractCoverageInfoSharded(
+                coverage_filename,
+                binary_filename,
+                includes,
+                excludes,
+                output_stream,
+                max_workers=shard_workers,
+            )
+
+        counts = [0, 0]
 
         # ----------------------------------------------------------------------
-        def ShouldInclude(method_name):
-            return not excludes_func(method_name) and includes_func(method_name)
+        def OnRow(row):
+            counts[0] += int(row[ROW_BLOCKS_COVERED_INDEX])
+            counts[1] += int(row[ROW_BLOCKS_NOT_COVERED_INDEX])
 
         # ----------------------------------------------------------------------
 
-        temp_filename = CurrentShell.CreateTempFilename()
+        result = _ExtractRows(coverage_filename, binary_filename, includes, excludes, OnRow, output_stream)
+        if result != 0:
+            return result
+
+        return tuple(counts)
 
-        command_line = '"{powershell}" -ExecutionPolicy Bypass -NoProfile -File "{filename}" "{coverage}" "{module}" > "{temp_filename}" 2>&1'.format(
-            powershell=r"{}\syswow64\WindowsPowerShell\v1.0\powershell.exe".format(
-                os.getenv("SystemRoot"),
-            ),
-            filename=os.path.join(_script_dir, "CoverageToCsv.ps1"),
-            coverage=coverage_filename,
-            module=os.path.basename(binary_filename),
-            temp_filename=temp_filename,
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def ExtractCoverageInfoSharded(
+        coverage_filename,
+        binary_filename,
+        includes,
+        excludes,
+        output_stream,
+        max_workers=None,
+    ):
+        """\
+        Returns the same (covered, not_covered) totals as ExtractCoverageInfo (or a
+        non-zero result code on failure), but writes the converter's output to a
+        temporary file and parses it in shards on a process pool (see CoverageShards).
+
+        This is beneficial for binaries whose converter output is hundreds of MB.
+        """
+
+        command_line = CoverageConverter.CreateCommandLine(
+            coverage_filename,
+            os.path.basename(binary_filename),
         )
 
-        result = Process.Execute(command_line, output_stream)
+        csv_filename = CurrentShell.CreateTempFilename(".csv")
+
+        with CallOnExit(lambda: FileSystem.RemoveFile(csv_filename)):
+            with Timing.Phase("ExtractCoverageInfo", binary_filename) as phase:
+                result = CoverageConverter.ConvertToFile(command_line, csv_filename)
+
+                shard_result = CoverageShards.ParseFile(
+                    csv_filename,
+                    includes,
+                    excludes,
+                    max_workers=max_workers,
+                    binary_filename=binary_filename,
+                )
+
+                phase.SetCounter("rows_parsed", shard_result.NumRows)
+                phase.SetCounter("rows_filtered", shard_result.NumRows - shard_result.NumIncluded)
+                phase.SetCounter("bytes_read", os.path.getsize(csv_filename))
+
+                # Errors are handled in the same way as they are when the output is streamed
+                if shard_result.Error is not None:
+                    raise CoverageConverter.ConversionError(shard_result.Error)
+
+                if result != 0:
+                    output_stream.write("'{}' failed ({})\n".format(command_line, result))
+
+                    phase.SetResult(result)
+                    return result
+
+        return shard_result.Covered, shard_result.NotCovered
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def ExtractMethodCoverageInfo(coverage_filename, binary_filename, includes, excludes, output_stream):
+        """\
+        Returns CoverageResults with per-method line and block counts (or a non-zero
+        result code on failure).
+
+        Results are cached when the cache is enabled (see CoverageCache.GetDefault)
+        and recorded in the source coverage index when it is enabled (see
+        SourceCoverageIndex.GetDefault).
+        """
+
+        source_index = SourceCoverageIndex.GetDefault()
+
+        cache = CoverageCache.GetDefault()
+        cache_key = None
+
+        if cache is not None:
+            cache_key = cache.CreateKey(
+                coverage_filename,
+                os.path.basename(binary_filename),
+                includes,
+                excludes,
+            )
+
+            if cache_key is not None:
+                results = cache.Get(cache_key)
+                if results is not None:
+                    if source_index is not None and not source_index.IsRecorded(binary_filename, coverage_filename, includes, excludes):
+                        source_index.Record(binary_filename, coverage_filename, includes, excludes, results)
+
+                    return results
+
+        results = CoverageResults()
+
+        result = _ExtractRows(coverage_filename, binary_filename, includes, excludes, results.AppendRow, output_stream)
         if result != 0:
             return result
 
-        with CallOnExit(lambda: FileSystem.RemoveFile(temp_filename)):
-            covered = 0
-            not_covered = 0
+        if cache_key is not None:
+            cache.Set(cache_key, results)
 
-            with open(temp_filename, "r") as input:
-                reader = csv.reader(input)
+        if source_index is not None:
+            source_index.Record(binary_filename, coverage_filename, includes, excludes, results)
 
-                for row in reader:
-                    if not isinstance(row, (tuple, list)):
-                        raise Exception(row)
-                    if len(row) == 1:
-                        raise Exception(row[0])
+        return results
 
-                    method_name = row[1]
-                    if not ShouldInclude(method_name):
-                        continue
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def ExtractCoverageInfoBatch(
+        items,
+        includes,
+        excludes,
+        output_stream,
+        max_workers=None,
+        jobs_per_invocation=None,
+    ):
+        """\
+        Extracts coverage information for multiple (coverage_filename, binary_filename)
+        items on a process pool.
+
+        Items are divided into groups of `jobs_per_invocation` items (by default, the
+        items are divided evenly across the workers), and each group is converted by
+        a single invocation of CoverageToCsv.ps1 so that PowerShell startup and
+        assembly loading costs are only paid once per group.
+
+        Returns a BatchResult for each item, in the same order as `items`. Failures
+        are reported for each item individually and do not prevent the extraction
+        of other items. The output associated with each item is written to
+        `output_stream` in order.
+
+        Each item is timed as an "ExtractCoverageInfo" phase and each converter
+        invocation as an "ExtractCoverageInfoBatch" phase; phases completed within
+        workers are reported to this process' sink (see Timing).
+
+        When the source coverage index is enabled, the per-method results of each
+        item are recorded by this process after they are returned by the workers
+        (the index isn't safe for concurrent writers).
+        """
+
+        items = list(items)
+
+        if jobs_per_invocation is None:
+            jobs_per_invocation = int(
+                math.ceil(len(items) / float(max_workers or os.cpu_count() or 1)),
+            )
+
+        jobs_per_invocation = max(1, jobs_per_invocation)
+
+        chunks = [
+            items[index:index + jobs_per_invocation]
+            for index in range(0, len(items), jobs_per_invocation)
+        ]
+
+        source_index = SourceCoverageIndex.GetDefault()
+
+        results = []
 
-                    covered += int(row[-2])
-                    not_covered += int(row[-1])
+        # ----------------------------------------------------------------------
+        def RecordResults(index_items):
+            for coverage_filename, binary_filename, method_results in index_items:
+                source_index.Record(binary_filename, coverage_filename, includes, excludes, method_results)
 
-            return covered, not_covered
+        # ----------------------------------------------------------------------
+
+        if max_workers == 1 or len(chunks) < 2:
+            for chunk in chunks:
+                chunk_results, index_items = _ExtractCoverageInfoBatchChunk(chunk, includes, excludes, source_index is not None)
+
+                RecordResults(index_items)
+                results += chunk_results
+
+        else:
+            # Phases completed within the workers are reported to this process' sink
+            is_timing_enabled = Timing.IsEnabled()
+
+            with ProcessPoolExecutor(max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        Timing.CollectPhases,
+                        is_timing_enabled,
+                        _ExtractCoverageInfoBatchChunk,
+                        chunk,
+                        includes,
+                        excludes,
+                        source_index is not None,
+                    )
+                    for chunk in chunks
+                ]
+
+                for chunk, future in zip(chunks, futures):
+                    try:
+                        (chunk_results, index_items), phases = future.result()
+
+                        Timing.Replay(phases)
+                        RecordResults(index_items)
+                        results += chunk_results
+
+                    except Exception as ex:
+                        # The worker process itself failed
+                        results += [
+                            BatchResult(coverage_filename, binary_filename, None, str(ex), "")
+                            for coverage_filename, binary_filename in chunk
+                        ]
+
+        for result in results:
+            output_stream.write(result.Output)
+
+        return results
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def ExtractSessionCoverageInfo(session, includes, excludes, output_stream, max_workers=None):
+        """\
+        Extracts coverage information for each binary run within a CoverageSession.
+
+        Returns an OrderedDict of binary_filename -> BatchResult, in the order in
+        which the binaries were first run.
+        """
+
+        # A binary may have been run multiple times within the session, but its coverage
+        # is extracted from the same coverage file.
+        binary_filenames = list(OrderedDict.fromkeys(session.BinaryFilenames))
+
+        results = CodeCoverageExecutor.ExtractCoverageInfoBatch(
+            [(session.CoverageFilename, binary_filename) for binary_filename in binary_filenames],
+            includes,
+            excludes,
+            output_stream,
+            max_workers=max_workers,
+        )
+
+        return OrderedDict((result.BinaryFilename, result) for result in results)
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def ExecutePipeline(
+        binary_filenames,
+        includes,
+        excludes,
+        output_stream,
+        command_lines=None,
+        **pipeline_kwargs
+    ):
+        """\
+        Instruments, runs and extracts coverage for the binaries with overlapping
+        stages; returns a CoveragePipeline.PipelineResult for each binary (in the
+        same order as `binary_filenames`).
+
+        See CoveragePipeline for the values that can be provided in `pipeline_kwargs`.
+        """
+
+        return CoveragePipeline(includes, excludes, **pipeline_kwargs).Execute(
+            binary_filenames,
+            output_stream,
+            command_lines,
+        )
 
 
 # ----------------------------------------------------------------------
 # ----------------------------------------------------------------------
 # ----------------------------------------------------------------------
-def _ProcessExecuteWorkaround(command_line):
-    # I haven't been able to figure out what is causing this, but it appears that VSPerfCmd.exe
-    # isn't sending an EOF before terminating during startup. This causes problems for subprocess-
-    # based means of forking processes and ends up hanging forever. To work around this, use
-    # subprocess.call, which doesn't use standard streams for input and output.
-    #
-    # Unfortunately, there isn't an easy way to capture the output from subprocess.call, so
-    # invoke the command with output redirected to a file, then extract the content from the
-    # file itself.
-    #
-    # This is all a great big hack.
-
-    temp_filename = CurrentShell.CreateTempFilename("._ProcessExecuteWorkaround.output")
-
-    command_line += ' > "{}" 2>&1'.format(temp_filename)
-
-    result = subprocess.call(
-        command_line,
-        shell=True,
+def _ExtractRows(coverage_filename, binary_filename, includes, excludes, on_row_func, output_stream):
+    """Invokes `on_row_func` for each row that should be included; returns a result code"""
+
+    should_include_func = PatternMatcher(includes, excludes)
+
+    command_line = CoverageConverter.CreateCommandLine(
+        coverage_filename,
+        os.path.basename(binary_filename),
     )
 
-    assert os.path.isfile(temp_filename), temp_filename
-    with open(temp_filename) as f:
-        output = f.read()
+    with Timing.Phase("ExtractCoverageInfo", binary_filename) as phase:
+        stats = {} if phase.IsEnabled else None
+
+        num_rows = 0
+        num_included = 0
 
-    # For some reason, this file is still in use when we attempt to delete it here.
-    # For now, don't delete it as it should be pretty small.
-    #
-    # FileSystem.RemoveFile(temp_filename)
+        try:
+            for row in CoverageConverter.EnumRows(command_line, stats):
+                num_rows += 1
+
+                if should_include_func(row[ROW_NAME_INDEX]):
+                    num_included += 1
+                    on_row_func(row)
+
+            result = 0
+
+        except CoverageConverter.ConversionError as ex:
+            if ex.Result is None:
+                raise
+
+            output_stream.write("{}\n".format(ex))
+            result = ex.Result
+
+        finally:
+            phase.SetCounter("rows_parsed", num_rows)
+            phase.SetCounter("rows_filtered", num_rows - num_included)
+
+            if stats is not None:
+                phase.SetCounter("bytes_read", stats.get("bytes_read", 0))
+
+        phase.SetResult(result)
+
+    return result
+
+
+# ----------------------------------------------------------------------
+def _GetCachedTotals(cache, cache_key):
+    """Returns the cached block totals without materializing per-method results (or None)"""
+
+    if cache_key is None:
+        return None
+
+    return cache.GetTotals(cache_key)
+
+
+# ----------------------------------------------------------------------
+def _ExtractCoverageInfoBatchChunk(items, includes, excludes, is_index_enabled):
+    """\
+    Returns (results, index_items), where `index_items` is a list of
+    (coverage_filename, binary_filename, CoverageResults) to record in the source
+    coverage index (empty if `is_index_enabled` is False).
+    """
+
+    # This function must be defined at the module level so that it can be invoked within a
+    # process pool.
+    cache = CoverageCache.GetDefault()
+    source_index = SourceCoverageIndex.GetDefault() if is_index_enabled else None
+
+    results = [None] * len(items)
+    index_items = [] if source_index is not None else None
+    pending = []
+
+    for index, (coverage_filename, binary_filename) in enumerate(items):
+        cache_key = None
+
+        if cache is not None:
+            cache_key = cache.CreateKey(
+                coverage_filename,
+                os.path.basename(binary_filename),
+                includes,
+                excludes,
+            )
+
+            if source_index is None or source_index.IsRecorded(binary_filename, coverage_filename, includes, excludes):
+                totals = _GetCachedTotals(cache, cache_key)
+            else:
+                # Per-method results are required to populate the index
+                method_results = cache.Get(cache_key) if cache_key is not None else None
+
+                if method_results is None:
+                    totals = None
+                else:
+                    totals = method_results.Totals("blocks")
+                    index_items.append((coverage_filename, binary_filename, method_results))
+
+            if totals is not None:
+                results[index] = BatchResult(coverage_filename, binary_filename, totals, None, "")
+                continue
+
+        pending.append((index, cache_key))
+
+    if pending:
+        with Timing.Phase("ExtractCoverageInfoBatch") as phase:
+            phase.SetCounter("items", len(items))
+            phase.SetCounter("cache_hits", len(items) - len(pending))
+
+            _ExtractPendingBatchItems(items, pending, includes, excludes, cache, index_items, results, phase)
+
+    return results, index_items or []
+
+
+# ----------------------------------------------------------------------
+def _ExtractPendingBatchItems(items, pending, includes, excludes, cache, index_items, results, phase):
+    should_include_func = PatternMatcher(includes, excludes)
+
+    stats = {} if phase.IsEnabled else None
+
+    num_rows = 0
+    num_included = 0
+
+    counts = [[0, 0] for _ in pending]
+    method_results = [CoverageResults() for _ in pending] if cache is not None or index_items is not None else None
+
+    # Each item is reported as its own phase, timed from the point at which the converter
+    # begins the job until it completes the job. Rows are processed in job order, so the
+    # rows associated with a job are the rows processed between these points.
+    job_phases = {}
+
+    # ----------------------------------------------------------------------
+    def OnJobBegin(job_index):
+        job_phase = Timing.Phase("ExtractCoverageInfo", items[pending[job_index][0]][1])
+        job_phase.__enter__()
+
+        job_phases[job_index] = (job_phase, num_rows, num_included)
+
+    # ----------------------------------------------------------------------
+    def OnJobEnd(job_index, error):
+        if job_index not in job_phases:
+            return
+
+        job_phase, initial_num_rows, initial_num_included = job_phases.pop(job_index)
+
+        job_num_rows = num_rows - initial_num_rows
+
+        job_phase.SetCounter("rows_parsed", job_num_rows)
+        job_phase.SetCounter("rows_filtered", job_num_rows - (num_included - initial_num_included))
+        job_phase.SetResult(0 if error is None else -1)
+
+        job_phase.__exit__(None, None, None)
+
+    # ----------------------------------------------------------------------
+
+    batch_filename = CurrentShell.CreateTempFilename(".CoverageToCsv.batch")
+
+    CoverageConverter.WriteBatchFile(
+        batch_filename,
+        [
+            (items[index][0], os.path.basename(items[index][1]))
+            for index, _ in pending
+        ],
+    )
+
+    job_status = {}
+    failure = None
+
+    with CallOnExit(lambda: FileSystem.RemoveFile(batch_filename)):
+        try:
+            for job_index, row in CoverageConverter.EnumBatchRows(
+                CoverageConverter.CreateBatchCommandLine(batch_filename),
+                job_status,
+                stats,
+                on_job_begin_func=OnJobBegin if phase.IsEnabled else None,
+                on_job_end_func=OnJobEnd if phase.IsEnabled else None,
+            ):
+                num_rows += 1
+
+                if not should_include_func(row[ROW_NAME_INDEX]):
+                    continue
+
+                num_included += 1
+
+                job_counts = counts[job_index]
+
+                job_counts[0] += int(row[ROW_BLOCKS_COVERED_INDEX])
+                job_counts[1] += int(row[ROW_BLOCKS_NOT_COVERED_INDEX])
+
+                if method_results is not None:
+                    method_results[job_index].AppendRow(row)
+
+        except CoverageConverter.ConversionError as ex:
+            failure = ex
+
+        finally:
+            # Jobs that were interrupted
+            for job_index in list(job_phases.keys()):
+                OnJobEnd(job_index, "The converter did not complete this item")
+
+    phase.SetCounter("rows_parsed", num_rows)
+    phase.SetCounter("rows_filtered", num_rows - num_included)
+
+    if stats is not None:
+        phase.SetCounter("bytes_read", stats.get("bytes_read", 0))
+
+    if failure is not None or len(job_status) != len(pending) or any(error is not None for error in job_status.values()):
+        phase.SetResult(-1)
+
+    for job_index, (index, cache_key) in enumerate(pending):
+        coverage_filename, binary_filename = items[index]
+
+        if job_index in job_status:
+            error = job_status[job_index]
+
+            if error is None:
+                if cache_key is not None:
+                    cache.Set(cache_key, method_results[job_index])
+
+                if index_items is not None:
+                    index_items.append((coverage_filename, binary_filename, method_results[job_index]))
+
+                result = BatchResult(coverage_filename, binary_filename, tuple(counts[job_index]), None, "")
+            else:
+                result = BatchResult(coverage_filename, binary_filename, None, error, "")
+
+        elif failure is not None and failure.Result is not None:
+            result = BatchResult(coverage_filename, binary_filename, failure.Result, None, "{}\n".format(failure))
+
+        elif failure is not None:
+            result = BatchResult(coverage_filename, binary_filename, None, str(failure), "")
+
+        else:
+            result = BatchResult(coverage_filename, binary_filename, None, "The converter did not process this item", "")
 
-    return result, output
+        results[index] = result
@@ -0,0 +1,533 @@
+# ----------------------------------------------------------------------
+# |
+# |  ColumnarCoverage.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 14:36:10
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Reads and writes coverage information in a compact, columnar binary format.
+
+Layout (all values are little-endian):
+
+    Header              See _HEADER
+    Module index        One _MODULE_ENTRY per module; rows for a module are contiguous
+    Name offsets        (num_rows + 1) uint64 offsets of method names within the string table
+    Columns             One int32 column of num_rows values for each item in COLUMN_NAMES
+    Scope ids           Three uint32 columns of num_rows values (namespace, class and source
+                        file) that index the scope offsets; scope 0 is always the empty string
+    Scope offsets       (num_scopes + 1) uint64 offsets of scope names within the string table
+    String table        UTF-8 encoded method names followed by module names and scope names
+
+Readers memory-map the file, so totals can be calculated and rows filtered without
+creating Python objects for every row.
+"""
+
+import csv
+import mmap
+import os
+import struct
+import sys
+
+from array import array
+
+import CommonEnvironment
+
+from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults, COLUMN_NAMES, UNITS
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+MAGIC                                       = b"MSVCCOV\0"
+VERSION                                     = 3
+
+# magic, version, num_columns, num_rows, num_modules, num_scopes, name_offsets_offset, columns_offset, strings_offset, strings_size, scope_ids_offset, scope_offsets_offset
+_HEADER                                     = struct.Struct("<8sIIQIIQQQQQQ")
+
+# name_offset, name_length, <reserved>, first_row, num_rows
+_MODULE_ENTRY                               = struct.Struct("<QIIQQ")
+
+_IS_LITTLE_ENDIAN                           = sys.byteorder == "little"
+
+_OFFSET_TYPECODE                            = "Q"
+_COLUMN_TYPECODE                            = "i"
+_SCOPE_ID_TYPECODE                          = "I"
+
+assert array(_OFFSET_TYPECODE).itemsize == 8
+assert array(_COLUMN_TYPECODE).itemsize == 4
+assert array(_SCOPE_ID_TYPECODE).itemsize == 4
+
+
+# ----------------------------------------------------------------------
+def Write(output_filename, results):
+    """Writes CoverageResults to a file"""
+
+    # Rows for each module must be contiguous
+    module_rows = {}
+
+    for index, module in enumerate(results.Modules):
+        module_rows.setdefault(module, []).append(index)
+
+    row_order = []
+    module_info = []
+
+    for module, indexes in module_rows.items():
+        module_info.append((module, len(row_order), len(indexes)))
+        row_order += indexes
+
+    # Strings
+    name_offsets = array(_OFFSET_TYPECODE, [0])
+    string_table = bytearray()
+
+    for index in row_order:
+        string_table += results.Names[index].encode("utf-8")
+        name_offsets.append(len(string_table))
+
+    module_entries = []
+
+    for module, first_row, num_rows in module_info:
+        encoded = module.encode("utf-8")
+
+        module_entries.append(_MODULE_ENTRY.pack(len(string_table), len(encoded), 0, first_row, num_rows))
+        string_table += encoded
+
+    scope_ids = {"": 0}
+    scope_offsets = array(_OFFSET_TYPECODE, [len(string_table), len(string_table)])
+
+    namespace_ids = array(_SCOPE_ID_TYPECODE)
+    class_ids = array(_SCOPE_ID_TYPECODE)
+    source_file_ids = array(_SCOPE_ID_TYPECODE)
+
+    for index in row_order:
+        for scope, ids in [
+            (results.Namespaces[index], namespace_ids),
+            (results.Classes[index], class_ids),
+            (results.SourceFiles[index], source_file_ids),
+        ]:
+            scope_id = scope_ids.get(scope)
+
+            if scope_id is None:
+                scope_id = len(scope_ids)
+                scope_ids[scope] = scope_id
+
+                string_table += scope.encode("utf-8")
+                scope_offsets.append(len(string_table))
+
+            ids.append(scope_id)
+
+    # Columns
+    columns = []
+
+    for column_name in COLUMN_NAMES:
+        source = results.Columns[column_name]
+        columns.append(array(_COLUMN_TYPECODE, (source[index] for index in row_order)))
+
+    if not _IS_LITTLE_ENDIAN:
+        for values in [name_offsets, namespace_ids, class_ids, source_file_ids, scope_offsets] + columns:
+            values.byteswap()
+
+    # Write
+    name_offsets_offset = _HEADER.size + _MODULE_ENTRY.size * len(module_entries)
+    columns_offset = name_offsets_offset + name_offsets.itemsize * len(name_offsets)
+    scope_ids_offset = columns_offset + sum(column.itemsize * len(column) for column in columns)
+    scope_offsets_offset = scope_ids_offset + namespace_ids.itemsize * 3 * len(row_order)
+    strings_offset = scope_offsets_offset + scope_offsets.itemsize * len(scope_offsets)
+
+    with open(output_filename, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(COLUMN_NAMES),
+                len(row_order),
+                len(module_entries),
+                len(scope_ids),
+                name_offsets_offset,
+                columns_offset,
+                strings_offset,
+                len(string_table),
+                scope_ids_offset,
+                scope_offsets_offset,
+            ),
+        )
+
+        for module_entry in module_entries:
+            f.write(module_entry)
+
+        f.write(name_offsets.tobytes())
+
+        for column in columns:
+            f.write(column.tobytes())
+
+        f.write(namespace_ids.tobytes())
+        f.write(class_ids.tobytes())
+        f.write(source_file_ids.tobytes())
+        f.write(scope_offsets.tobytes())
+
+        f.write(string_table)
+
+
+# ----------------------------------------------------------------------
+def ConvertCsv(csv_filename, output_filename):
+    """Converts the output of CoverageToCsv.ps1 to the columnar format"""
+
+    results = CoverageResults()
+
+    with open(csv_filename, newline="") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+
+            if len(row) == 1:
+                raise Exception(row[0])
+
+            results.AppendRow(row)
+
+    Write(output_filename, results)
+
+
+# ----------------------------------------------------------------------
+class Reader(object):
+    """\
+    Memory-mapped reader of the columnar format.
+
+    Usage:
+
+        with Reader(filename) as reader:
+            covered, not_covered = reader.Totals("blocks", "Foo.exe")
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, filename):
+        self.Filename                       = filename
+
+        self._file                          = open(filename, "rb")
+
+        try:
+            self._mmap                      = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            self._file.close()
+            raise Exception("'{}' is not a valid coverage file".format(filename))
+
+        try:
+            self._Initialize()
+        except:
+            self.Close()
+            raise
+
+    # ----------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, *args):
+        self.Close()
+
+    # ----------------------------------------------------------------------
+    def Close(self):
+        """Closes the file; values returned by GetColumn are not valid after the file is closed"""
+
+        # Views must be released before the map can be closed
+        views = [
+            getattr(self, "_name_offsets", None),
+            getattr(self, "_namespace_ids", None),
+            getattr(self, "_class_ids", None),
+            getattr(self, "_source_file_ids", None),
+            getattr(self, "_scope_offsets", None),
+            getattr(self, "_strings", None),
+        ]
+        views += list(getattr(self, "_columns", {}).values())
+        views.append(getattr(self, "_buffer", None))
+
+        for view in views:
+            if isinstance(view, memoryview):
+                view.release()
+
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller is still holding a view; the map will be closed when the view
+            # is garbage collected.
+            pass
+
+        self._file.close()
+
+    # ----------------------------------------------------------------------
+    def __len__(self):
+        return self._num_rows
+
+    # ----------------------------------------------------------------------
+    @property
+    def Modules(self):
+        return list(self._modules.keys())
+
+    # ----------------------------------------------------------------------
+    def GetRowRange(self, module=None):
+        """Returns the (begin, end) rows associated with the module (or all rows if module is None)"""
+
+        if module is None:
+            return 0, self._num_rows
+
+        first_row, num_rows = self._modules.get(module, (0, 0))
+        return first_row, first_row + num_rows
+
+    # ----------------------------------------------------------------------
+    def GetName(self, index):
+        return self._GetNameBytes(index).decode("utf-8")
+
+    # ----------------------------------------------------------------------
+    def GetNamespace(self, index):
+        return self._GetScope(self._namespace_ids[index])
+
+    # ----------------------------------------------------------------------
+    def GetClass(self, index):
+        return self._GetScope(self._class_ids[index])
+
+    # ----------------------------------------------------------------------
+    def GetSourceFile(self, index):
+        return self._GetScope(self._source_file_ids[index])
+
+    # ----------------------------------------------------------------------
+    def GetNames(self, module=None):
+        """\
+        Returns the names of the methods in the module (or all methods if module is None);
+        this is much less expensive than calling GetName for each row.
+        """
+
+        begin, end = self.GetRowRange(module)
+        if begin == end:
+            return []
+
+        offsets = self._name_offsets[begin:end + 1]
+        base = offsets[0]
+
+        content = self._strings[base:offsets[-1]].tobytes()
+
+        if content.isascii():
+            # Byte offsets are character offsets, so the content can be decoded once
+            content = content.decode("ascii")
+
+            return [content[start - base:end - base] for start, end in zip(offsets, offsets[1:])]
+
+        return [content[start - base:end - base].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+
+    # ----------------------------------------------------------------------
+    def GetScopes(self):
+        """Returns the namespace, class and source file names, indexed by the values returned by Get*Ids"""
+
+        return [self._GetScope(scope_id) for scope_id in range(len(self._scope_offsets) - 1)]
+
+    # ----------------------------------------------------------------------
+    def GetNamespaceIds(self, module=None):
+        """Returns the namespace ids as a sequence of integers without copying (see GetScopes)"""
+
+        begin, end = self.GetRowRange(module)
+        return self._namespace_ids[begin:end]
+
+    # ----------------------------------------------------------------------
+    def GetClassIds(self, module=None):
+        """Returns the class ids as a sequence of integers without copying (see GetScopes)"""
+
+        begin, end = self.GetRowRange(module)
+        return self._class_ids[begin:end]
+
+    # ----------------------------------------------------------------------
+    def GetSourceFileIds(self, module=None):
+        """Returns the source file ids as a sequence of integers without copying (see GetScopes)"""
+
+        begin, end = self.GetRowRange(module)
+        return self._source_file_ids[begin:end]
+
+    # ----------------------------------------------------------------------
+    def GetModule(self, index):
+        for module, (first_row, num_rows) in self._modules.items():
+            if first_row <= index < first_row + num_rows:
+                return module
+
+        raise IndexError(index)
+
+    # ----------------------------------------------------------------------
+    def GetColumn(self, column_name, module=None):
+        """Returns the column values as a sequence of integers without copying"""
+
+        begin, end = self.GetRowRange(module)
+        return self._columns[column_name][begin:end]
+
+    # ----------------------------------------------------------------------
+    def EnumIncludedRows(self, module=None, should_include_func=None):
+        """Yields the index of each row in the module that should be included"""
+
+        begin, end = self.GetRowRange(module)
+
+        if should_include_func is None:
+            for index in range(begin, end):
+                yield index
+
+            return
+
+        for index in range(begin, end):
+            if should_include_func(self._GetNameBytes(index).decode("utf-8")):
+                yield index
+
+    # ----------------------------------------------------------------------
+    def Totals(self, units="blocks", module=None, should_include_func=None):
+        """Returns (covered, not_covered) for the specified units"""
+
+        if units == "blocks":
+            covered_columns = ["BlocksCovered"]
+            not_covered_columns = ["BlocksNotCovered"]
+        elif units == "lines":
+            # See CoverageResults.Totals
+            covered_columns = ["LinesCovered"]
+            not_covered_columns = ["LinesPartiallyCovered", "LinesNotCovered"]
+        else:
+            raise Exception("'{}' is not a valid unit ({})".format(units, ", ".join(UNITS)))
+
+        if should_include_func is None:
+            return (
+                sum(sum(self.GetColumn(column_name, module)) for column_name in covered_columns),
+                sum(sum(self.GetColumn(column_name, module)) for column_name in not_covered_columns),
+            )
+
+        covered_columns = [self._columns[column_name] for column_name in covered_columns]
+        not_covered_columns = [self._columns[column_name] for column_name in not_covered_columns]
+
+        covered = 0
+        not_covered = 0
+
+        for index in self.EnumIncludedRows(module, should_include_func):
+            for column in covered_columns:
+                covered += column[index]
+            for column in not_covered_columns:
+                not_covered += column[index]
+
+        return covered, not_covered
+
+    # ----------------------------------------------------------------------
+    def ToCoverageResults(self, module=None, should_include_func=None):
+        results = CoverageResults()
+
+        modules = [module] if module is not None else self.Modules
+        columns = [self._columns[column_name] for column_name in COLUMN_NAMES]
+
+        for module in modules:
+            for index in self.EnumIncludedRows(module, should_include_func):
+                results.Append(
+                    module,
+                    self.GetName(index),
+                    [column[index] for column in columns],
+                    self.GetNamespace(index),
+                    self.GetClass(index),
+                    self.GetSourceFile(index),
+                )
+
+        return results
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _Initialize(self):
+        self._buffer = memoryview(self._mmap)
+
+        if len(self._buffer) < _HEADER.size:
+            raise Exception("'{}' is not a valid coverage file".format(self.Filename))
+
+        (
+            magic,
+            version,
+            num_columns,
+            num_rows,
+            num_modules,
+            num_scopes,
+            name_offsets_offset,
+            columns_offset,
+            strings_offset,
+            strings_size,
+            scope_ids_offset,
+            scope_offsets_offset,
+        ) = _HEADER.unpack_from(self._buffer, 0)
+
+        if magic != MAGIC:
+            raise Exception("'{}' is not a valid coverage file".format(self.Filename))
+
+        if version != VERSION:
+            raise Exception("'{}' was written with an unsupported version ({})".format(self.Filename, version))
+
+        if num_columns != len(COLUMN_NAMES) or strings_offset + strings_size > len(self._buffer):
+            raise Exception("'{}' is not a valid coverage file".format(self.Filename))
+
+        self._num_rows = num_rows
+
+        self._name_offsets = self._CreateView(name_offsets_offset, num_rows + 1, _OFFSET_TYPECODE)
+        self._strings = self._buffer[strings_offset:strings_offset + strings_size]
+
+        self._columns = {}
+
+        column_size = num_rows * array(_COLUMN_TYPECODE).itemsize
+
+        for column_index, column_name in enumerate(COLUMN_NAMES):
+            self._columns[column_name] = self._CreateView(columns_offset + column_index * column_size, num_rows, _COLUMN_TYPECODE)
+
+        scope_ids_size = num_rows * array(_SCOPE_ID_TYPECODE).itemsize
+
+        self._namespace_ids = self._CreateView(scope_ids_offset, num_rows, _SCOPE_ID_TYPECODE)
+        self._class_ids = self._CreateView(scope_ids_offset + scope_ids_size, num_rows, _SCOPE_ID_TYPECODE)
+        self._source_file_ids = self._CreateView(scope_ids_offset + 2 * scope_ids_size, num_rows, _SCOPE_ID_TYPECODE)
+        self._scope_offsets = self._CreateView(scope_offsets_offset, num_scopes + 1, _OFFSET_TYPECODE)
+
+        self._scopes = {}
+
+        self._modules = {}
+
+        for module_index in range(num_modules):
+            name_offset, name_length, _, first_row, module_rows = _MODULE_ENTRY.unpack_from(
+                self._buffer,
+                _HEADER.size + module_index * _MODULE_ENTRY.size,
+            )
+
+            module = bytes(self._strings[name_offset:name_offset + name_length]).decode("utf-8")
+            self._modules[sys.intern(module)] = (first_row, module_rows)
+
+    # ----------------------------------------------------------------------
+    def _CreateView(self, offset, num_items, typecode):
+        data = self._buffer[offset:offset + num_items * array(typecode).itemsize]
+
+        if _IS_LITTLE_ENDIAN:
+            return data.cast(typecode)
+
+        # The data must be converted on big-endian machines
+        result = array(typecode)
+        result.frombytes(data)
+        result.byteswap()
+
+        data.release()
+
+        return result
+
+    # ----------------------------------------------------------------------
+    def _GetScope(self, scope_id):
+        # There are far fewer scopes than rows, so decoded scopes are cached
+        scope = self._scopes.get(scope_id)
+
+        if scope is None:
+            scope = sys.intern(
+                self._strings[self._scope_offsets[scope_id]:self._scope_offsets[scope_id + 1]].tobytes().decode("utf-8"),
+            )
+            self._scopes[scope_id] = scope
+
+        return scope
+
+    # ----------------------------------------------------------------------
+    def _GetNameBytes(self, index):
+        return self._strings[self._name_offsets[index]:self._name_offsets[index + 1]].tobytes()
@@ -0,0 +1,682 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageAggregation.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 22:56:40
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Server and client that aggregate per-method coverage from many sources.
+
+Build agents submit CoverageResults in batches; the server merges each batch into
+its in-memory state as it arrives (using the same rules as CoverageMerge) and
+maintains running totals, so merged totals and per-method values can be queried
+at any time without re-parsing coverage.
+
+Each submission is a single source: the client sums rows with the same module,
+namespace, class and name before the results are split into batches, and the
+server combines the sums with those of other submissions.
+
+Messages are framed as:
+
+    <uint32 length><uint8 type or status><payload>
+
+Batches are encoded as module, namespace and class tables, ids into those tables,
+counter columns and method names, and are compressed with zlib.
+
+The server only listens on the loopback interface.
+
+Usage:
+
+    with CoverageAggregationServer() as server:
+        with CoverageAggregationClient(server.Address) as client:
+            client.Submit(results)
+            covered, not_covered = client.Totals("blocks")
+"""
+
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import zlib
+
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import CommonEnvironment
+
+from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults, COLUMN_NAMES, UNITS, KEY_NAME, KEY_MODULE_AND_NAME, KEYS, CreateKey
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+DEFAULT_HOST                                = "127.0.0.1"
+
+DEFAULT_POOL_SIZE                           = 4
+
+# Rows per batch when submitting results
+DEFAULT_BATCH_SIZE                          = 64 * 1024
+
+# Message types
+MESSAGE_SUBMIT                              = 1
+MESSAGE_TOTALS                              = 2
+MESSAGE_METHOD                              = 3
+MESSAGE_RESET                               = 4
+
+# Response statuses
+STATUS_OK                                   = 0
+STATUS_ERROR                                = 1
+
+_FRAME_HEADER                               = struct.Struct("<IB")
+
+# num_rows, module_table_size, namespace_table_size, class_table_size, names_size
+_BATCH_HEADER                               = struct.Struct("<IIIII")
+
+# num_submitted, num_methods
+_SUBMIT_RESPONSE                            = struct.Struct("<QQ")
+
+# covered, not_covered
+_TOTALS_RESPONSE                            = struct.Struct("<qq")
+
+# Merged values for a method: blocks covered, blocks total, lines covered, lines touched
+# (covered or partially covered), lines total. Each value is at least as large as the values
+# that precede it in the same unit, so that the running totals match those of the results
+# produced by CoverageMerge.
+_STATE_SIZE                                 = 5
+
+_STRING_SEPARATOR                           = "\0"
+
+_COUNTER_TYPECODE                           = "q"
+_TABLE_ID_TYPECODE                          = "I"
+
+assert array(_COUNTER_TYPECODE).itemsize == 8
+assert array(_TABLE_ID_TYPECODE).itemsize == 4
+
+
+# ----------------------------------------------------------------------
+class AggregationError(Exception):
+    """Raised by the client when the server reports an error"""
+
+
+# ----------------------------------------------------------------------
+class CoverageAggregator(object):
+    """\
+    In-memory, incremental merge of per-method coverage (see CoverageMerge for
+    information on how counters are combined). Instances are thread-safe.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, key=KEY_NAME):
+        if key not in KEYS:
+            raise Exception("'{}' is not a valid key ({})".format(key, ", ".join(KEYS)))
+
+        self.Key                            = key
+
+        self._lock                          = threading.Lock()
+        self._Reset()
+
+    # ----------------------------------------------------------------------
+    @property
+    def NumMethods(self):
+        return len(self._methods)
+
+    # ----------------------------------------------------------------------
+    def Reset(self):
+        with self._lock:
+            self._Reset()
+
+    # ----------------------------------------------------------------------
+    def Add(self, modules, names, columns, namespaces=None, classes=None):
+        """\
+        Merges rows from a single source; `columns` is a dict of column name -> sequence
+        of values for each item in COLUMN_NAMES. Rows with the same scope are summed
+        before they are combined with rows from other sources.
+        """
+
+        scopes = _SumScopes(modules, names, columns, namespaces, classes)
+
+        with self._lock:
+            methods = self._methods
+            totals = self._totals
+
+            for (module, namespace, class_name, name), counters in scopes.items():
+                lines_covered, lines_partially_covered, lines_not_covered, blocks_covered, blocks_not_covered = counters
+
+                lines_touched = lines_covered + lines_partially_covered
+
+                values = (
+                    blocks_covered,
+                    max(blocks_covered + blocks_not_covered, blocks_covered),
+                    lines_covered,
+                    max(lines_touched, lines_covered),
+                    max(lines_touched + lines_not_covered, lines_touched, lines_covered),
+                )
+
+                key = CreateKey(self.Key, module, namespace, class_name, name)
+
+                state = methods.get(key)
+
+                if state is None:
+                    state = [0] * _STATE_SIZE
+                    methods[key] = state
+
+                    if self.Key == KEY_NAME:
+                        self._method_modules[key] = module
+
+                for value_index, value in enumerate(values):
+                    existing = state[value_index]
+
+                    if value > existing:
+                        totals[value_index] += value - existing
+                        state[value_index] = value
+
+            self._num_submitted += len(names)
+
+            return self._num_submitted
+
+    # ----------------------------------------------------------------------
+    def Totals(self, units="blocks"):
+        """Returns the merged (covered, not_covered) totals for the specified units"""
+
+        with self._lock:
+            return _GetTotals(self._totals, units)
+
+    # ----------------------------------------------------------------------
+    def GetMethod(self, name, module=None, namespace="", class_name=""):
+        """\
+        Returns the merged counters (ordered according to COLUMN_NAMES) for the method,
+        or None if the method hasn't been submitted. `module` is required when methods
+        are aligned by module and name.
+        """
+
+        key = CreateKey(self.Key, module, namespace, class_name, name)
+
+        with self._lock:
+            state = self._methods.get(key)
+            if state is None:
+                return None
+
+            return _ToCounters(state)
+
+    # ----------------------------------------------------------------------
+    def ToCoverageResults(self):
+        """Returns the merged results"""
+
+        results = CoverageResults()
+
+        with self._lock:
+            for key, state in self._methods.items():
+                if self.Key == KEY_MODULE_AND_NAME:
+                    module, namespace, class_name, name = key
+                else:
+                    module = self._method_modules[key]
+                    namespace, class_name, name = key
+
+                results.Append(module, name, _ToCounters(state), namespace, class_name)
+
+        return results
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _Reset(self):
+        self._methods                       = {}
+        self._method_modules                = {}
+        self._totals                        = [0] * _STATE_SIZE
+        self._num_submitted                 = 0
+
+
+# ----------------------------------------------------------------------
+class CoverageAggregationServer(object):
+    """\
+    Serves a CoverageAggregator on the loopback interface; each connection is
+    handled on its own thread and may send any number of messages.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        port=0,                             # 0 to use any available port
+        key=KEY_NAME,
+        host=DEFAULT_HOST,
+    ):
+        self.Aggregator                     = CoverageAggregator(key)
+
+        aggregator = self.Aggregator
+
+        # ----------------------------------------------------------------------
+        class Handler(socketserver.BaseRequestHandler):
+            # ----------------------------------------------------------------------
+            def handle(self):
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+                while True:
+                    try:
+                        message_type, payload = _ReadFrame(self.request)
+                    except EOFError:
+                        return
+
+                    try:
+                        response = _HandleMessage(aggregator, message_type, payload)
+                        status = STATUS_OK
+                    except Exception as ex:
+                        response = str(ex).encode("utf-8")
+                        status = STATUS_ERROR
+
+                    _WriteFrame(self.request, status, response)
+
+        # ----------------------------------------------------------------------
+
+        self._server                        = _ThreadingServer((host, port), Handler)
+        self._thread                        = None
+
+    # ----------------------------------------------------------------------
+    @property
+    def Address(self):
+        return self._server.server_address[:2]
+
+    # ----------------------------------------------------------------------
+    def __enter__(self):
+        self.Start()
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, *args):
+        self.Stop()
+
+    # ----------------------------------------------------------------------
+    def Start(self):
+        """Serves requests on a background thread"""
+
+        assert self._thread is None
+
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    # ----------------------------------------------------------------------
+    def ServeForever(self):
+        """Serves requests on the current thread"""
+
+        self._server.serve_forever()
+
+    # ----------------------------------------------------------------------
+    def Stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+
+
+# ----------------------------------------------------------------------
+class CoverageAggregationClient(object):
+    """\
+    Client of a CoverageAggregationServer.
+
+    Connections are pooled and reused across requests; the client may be used
+    from multiple threads, and requests are made concurrently when connections
+    are available.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        address,                            # (host, port)
+        pool_size=DEFAULT_POOL_SIZE,
+        timeout=None,
+    ):
+        self.Address                        = tuple(address)
+        self.Timeout                        = timeout
+
+        self._pool                          = queue.LifoQueue()
+        self._slots                         = threading.BoundedSemaphore(pool_size)
+
+    # ----------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, *args):
+        self.Close()
+
+    # ----------------------------------------------------------------------
+    def Close(self):
+        while True:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                break
+
+            connection.close()
+
+    # ----------------------------------------------------------------------
+    def Submit(self, results, batch_size=DEFAULT_BATCH_SIZE):
+        """\
+        Submits CoverageResults in batches of `batch_size` rows; returns the number of
+        distinct methods known to the server.
+        """
+
+        # Rows with the same scope are summed here, as they may be split across batches
+        results = _CreateSummedResults(results)
+
+        num_methods = 0
+
+        for begin in range(0, max(len(results), 1), batch_size):
+            _, num_methods = _SUBMIT_RESPONSE.unpack(
+                self._Request(MESSAGE_SUBMIT, EncodeBatch(results, begin, begin + batch_size)),
+            )
+
+        return num_methods
+
+    # ----------------------------------------------------------------------
+    def Totals(self, units="blocks"):
+        """Returns the merged (covered, not_covered) totals for the specified units"""
+
+        return _TOTALS_RESPONSE.unpack(self._Request(MESSAGE_TOTALS, units.encode("utf-8")))
+
+    # ----------------------------------------------------------------------
+    def GetMethod(self, name, module=None, namespace="", class_name=""):
+        """Returns the merged counters for the method (see CoverageAggregator.GetMethod)"""
+
+        response = self._Request(
+            MESSAGE_METHOD,
+            _STRING_SEPARATOR.join([module or "", namespace, class_name, name]).encode("utf-8"),
+        )
+
+        if not response:
+            return None
+
+        return list(array(_COUNTER_TYPECODE, response))
+
+    # ----------------------------------------------------------------------
+    def Reset(self):
+        self._Request(MESSAGE_RESET, b"")
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _Request(self, message_type, payload):
+        with self._Connection() as connection:
+            _WriteFrame(connection, message_type, payload)
+            status, response = _ReadFrame(connection)
+
+        if status != STATUS_OK:
+            raise AggregationError(response.decode("utf-8"))
+
+        return response
+
+    # ----------------------------------------------------------------------
+    @contextmanager
+    def _Connection(self):
+        self._slots.acquire()
+
+        try:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                connection = socket.create_connection(self.Address, self.Timeout)
+                connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            try:
+                yield connection
+            except:
+                # The state of the connection is unknown
+                connection.close()
+                raise
+
+            self._pool.put(connection)
+
+        finally:
+            self._slots.release()
+
+
+# ----------------------------------------------------------------------
+def EncodeBatch(results, begin=0, end=None):
+    """Encodes rows [begin, end) of the CoverageResults"""
+
+    end = len(results) if end is None else min(end, len(results))
+    begin = min(begin, end)
+
+    module_ids, module_table = _EncodeTable(results.Modules[begin:end])
+    namespace_ids, namespace_table = _EncodeTable(results.Namespaces[begin:end])
+    class_ids, class_table = _EncodeTable(results.Classes[begin:end])
+
+    names = _STRING_SEPARATOR.join(results.Names[begin:end]).encode("utf-8")
+
+    counters = array(_COUNTER_TYPECODE)
+
+    for column_name in COLUMN_NAMES:
+        counters += results.Columns[column_name][begin:end]
+
+    return zlib.compress(
+        b"".join(
+            [
+                _BATCH_HEADER.pack(end - begin, len(module_table), len(namespace_table), len(class_table), len(names)),
+                module_ids.tobytes(),
+                namespace_ids.tobytes(),
+                class_ids.tobytes(),
+                counters.tobytes(),
+                module_table,
+                namespace_table,
+                class_table,
+                names,
+            ],
+        ),
+    )
+
+
+# ----------------------------------------------------------------------
+def DecodeBatch(data):
+    """Returns (modules, names, columns, namespaces, classes) for a batch created by EncodeBatch"""
+
+    data = memoryview(zlib.decompress(data))
+
+    num_rows, module_table_size, namespace_table_size, class_table_size, names_size = _BATCH_HEADER.unpack_from(data, 0)
+    offset = _BATCH_HEADER.size
+
+    table_ids = []
+
+    for _ in range(3):
+        ids = array(_TABLE_ID_TYPECODE)
+        ids.frombytes(data[offset:offset + num_rows * ids.itemsize])
+        offset += num_rows * ids.itemsize
+
+        table_ids.append(ids)
+
+    module_ids, namespace_ids, class_ids = table_ids
+
+    columns = {}
+
+    for column_name in COLUMN_NAMES:
+        column = array(_COUNTER_TYPECODE)
+        column.frombytes(data[offset:offset + num_rows * column.itemsize])
+        offset += num_rows * column.itemsize
+
+        columns[column_name] = column
+
+    tables = []
+
+    for table_size in [module_table_size, namespace_table_size, class_table_size]:
+        tables.append(bytes(data[offset:offset + table_size]).decode("utf-8").split(_STRING_SEPARATOR))
+        offset += table_size
+
+    module_table, namespace_table, class_table = tables
+
+    names = bytes(data[offset:offset + names_size]).decode("utf-8").split(_STRING_SEPARATOR) if num_rows else []
+
+    if len(names) != num_rows:
+        raise Exception("The batch is not valid")
+
+    try:
+        return (
+            [module_table[module_id] for module_id in module_ids],
+            names,
+            columns,
+            [namespace_table[namespace_id] for namespace_id in namespace_ids],
+            [class_table[class_id] for class_id in class_ids],
+        )
+    except IndexError:
+        raise Exception("The batch is not valid")
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address                     = True
+    daemon_threads                          = True
+
+
+# ----------------------------------------------------------------------
+def _HandleMessage(aggregator, message_type, payload):
+    if message_type == MESSAGE_SUBMIT:
+        num_submitted = aggregator.Add(*DecodeBatch(payload))
+        return _SUBMIT_RESPONSE.pack(num_submitted, aggregator.NumMethods)
+
+    if message_type == MESSAGE_TOTALS:
+        return _TOTALS_RESPONSE.pack(*aggregator.Totals(bytes(payload).decode("utf-8")))
+
+    if message_type == MESSAGE_METHOD:
+        values = bytes(payload).decode("utf-8").split(_STRING_SEPARATOR)
+        if len(values) != 4:
+            raise Exception("The method is not valid")
+
+        module, namespace, class_name, name = values
+
+        counters = aggregator.GetMethod(name, module or None, namespace, class_name)
+        if counters is None:
+            return b""
+
+        return array(_COUNTER_TYPECODE, counters).tobytes()
+
+    if message_type == MESSAGE_RESET:
+        aggregator.Reset()
+        return b""
+
+    raise Exception("'{}' is not a valid message type".format(message_type))
+
+
+# ----------------------------------------------------------------------
+def _SumScopes(modules, names, columns, namespaces, classes):
+    """Returns an OrderedDict of (module, namespace, class, name) -> counters (ordered according to COLUMN_NAMES)"""
+
+    if namespaces is None:
+        namespaces = [""] * len(names)
+    if classes is None:
+        classes = [""] * len(names)
+
+    columns = [columns[column_name] for column_name in COLUMN_NAMES]
+
+    scopes = OrderedDict()
+
+    for index, scope in enumerate(zip(modules, namespaces, classes, names)):
+        counters = scopes.get(scope)
+
+        if counters is None:
+            scopes[scope] = [column[index] for column in columns]
+        else:
+            for column_index, column in enumerate(columns):
+                counters[column_index] += column[index]
+
+    return scopes
+
+
+# ----------------------------------------------------------------------
+def _CreateSummedResults(results):
+    scopes = _SumScopes(results.Modules, results.Names, results.Columns, results.Namespaces, results.Classes)
+
+    if len(scopes) == len(results):
+        return results
+
+    summed = CoverageResults()
+
+    for (module, namespace, class_name, name), counters in scopes.items():
+        summed.Append(module, name, counters, namespace, class_name)
+
+    return summed
+
+
+# ----------------------------------------------------------------------
+def _EncodeTable(values):
+    """Returns (ids, table) for the values"""
+
+    table = {}
+    ids = array(_TABLE_ID_TYPECODE)
+
+    for value in values:
+        ids.append(table.setdefault(value, len(table)))
+
+    return ids, _STRING_SEPARATOR.join(table.keys()).encode("utf-8")
+
+
+# ----------------------------------------------------------------------
+def _ReadFrame(connection):
+    header = _ReadExactly(connection, _FRAME_HEADER.size)
+    length, message_type = _FRAME_HEADER.unpack(header)
+
+    return message_type, _ReadExactly(connection, length)
+
+
+# ----------------------------------------------------------------------
+def _WriteFrame(connection, message_type, payload):
+    connection.sendall(_FRAME_HEADER.pack(len(payload), message_type) + payload)
+
+
+# ----------------------------------------------------------------------
+def _ReadExactly(connection, num_bytes):
+    buffer = bytearray(num_bytes)
+    view = memoryview(buffer)
+
+    offset = 0
+
+    while offset < num_bytes:
+        num_read = connection.recv_into(view[offset:])
+        if num_read == 0:
+            raise EOFError()
+
+        offset += num_read
+
+    return bytes(buffer)
+
+
+# ----------------------------------------------------------------------
+def _GetTotals(state, units):
+    blocks_covered, blocks_total, lines_covered, lines_touched, lines_total = state
+
+    if units == "blocks":
+        return blocks_covered, blocks_total - blocks_covered
+
+    if units == "lines":
+        # See CoverageResults.Totals
+        return lines_covered, lines_total - lines_covered
+
+    raise Exception("'{}' is not a valid unit ({})".format(units, ", ".join(UNITS)))
+
+
+# ----------------------------------------------------------------------
+def _ToCounters(state):
+    blocks_covered, blocks_total, lines_covered, lines_touched, lines_total = state
+
+    # Ordered according to COLUMN_NAMES
+    return [
+        lines_covered,
+        lines_touched - lines_covered,
+        lines_total - lines_touched,
+        blocks_covered,
+        blocks_total - blocks_covered,
+    ]
@@ -0,0 +1,322 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageCache.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 11:22:48
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains the CoverageCache object"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import CommonEnvironment
+
+from CppMSVCCommon.TestExecutorImpl import ColumnarCoverage
+from CppMSVCCommon.TestExecutorImpl import CoverageConverter
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Set this environment variable to enable caching for CodeCoverageExecutor
+CACHE_DIR_ENV_VAR                           = "CPP_MSVC_COMMON_COVERAGE_CACHE_DIR"
+
+# Optional environment variable that overrides the maximum cache size (in bytes)
+CACHE_MAX_SIZE_ENV_VAR                      = "CPP_MSVC_COMMON_COVERAGE_CACHE_MAX_SIZE"
+
+DEFAULT_MAX_SIZE                            = 512 * 1024 * 1024
+
+# Increment this value when the format of cached content changes
+_FORMAT_VERSION                             = 5
+
+_RESULTS_EXTENSION                          = ".columns"
+
+# Keys are "<hash id><separator><digest>", where the hash id identifies the file that stores
+# the content hash of the coverage file so that it can be evicted along with its entries.
+_KEY_SEPARATOR                              = "-"
+
+
+# ----------------------------------------------------------------------
+class CoverageCache(object):
+    """\
+    On-disk cache of extracted coverage results.
+
+    Entries are keyed by a hash of the coverage file's content, the module name,
+    the normalized include and exclude patterns, and the converter command line.
+    Entries are written atomically, so multiple processes can safely share a
+    cache directory; the least recently used entries are evicted when the cache
+    exceeds its maximum size, along with the content hash of their coverage file
+    once no other entry is associated with it.
+    """
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def GetDefault(cls):
+        """Returns the cache configured via environment variables (or None if caching is disabled)"""
+
+        cache_dir = os.getenv(CACHE_DIR_ENV_VAR)
+        if not cache_dir:
+            return None
+
+        max_size = os.getenv(CACHE_MAX_SIZE_ENV_VAR)
+        max_size = int(max_size) if max_size else DEFAULT_MAX_SIZE
+
+        return cls(cache_dir, max_size)
+
+    # ----------------------------------------------------------------------
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE):
+        self.CacheDir                       = cache_dir
+        self.MaxSize                        = max_size
+
+        self._hashes_dir                    = os.path.join(cache_dir, "hashes")
+
+        for directory in [self.CacheDir, self._hashes_dir]:
+            if not os.path.isdir(directory):
+                try:
+                    os.makedirs(directory)
+                except OSError:
+                    # Another process may have created the directory
+                    if not os.path.isdir(directory):
+                        raise
+
+    # ----------------------------------------------------------------------
+    def CreateKey(self, coverage_filename, module_name, includes, excludes):
+        """Returns the key for the provided values (or None if the coverage file can't be read)"""
+
+        try:
+            hash_id, content_hash = self._GetContentHash(coverage_filename)
+        except (IOError, OSError):
+            return None
+
+        hasher = hashlib.sha256()
+
+        hasher.update(
+            json.dumps(
+                [
+                    _FORMAT_VERSION,
+                    content_hash,
+                    module_name,
+                    _NormalizePatterns(includes),
+                    _NormalizePatterns(excludes),
+                    CoverageConverter.CreateCommandLine("{coverage}", "{module}"),
+                ],
+            ).encode("utf-8"),
+        )
+
+        return "{}{}{}".format(hash_id, _KEY_SEPARATOR, hasher.hexdigest())
+
+    # ----------------------------------------------------------------------
+    def Open(self, key):
+        """\
+        Returns a ColumnarCoverage.Reader for the cached results or None if the key
+        isn't in the cache; the caller is responsible for closing the reader.
+        """
+
+        filename = self._GetResultsFilename(key)
+
+        try:
+            reader = ColumnarCoverage.Reader(filename)
+        except Exception:
+            # The entry doesn't exist, was evicted, or is invalid
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(filename, None)
+        except OSError:
+            pass
+
+        return reader
+
+    # ----------------------------------------------------------------------
+    def Get(self, key):
+        """Returns the cached CoverageResults or None if the key isn't in the cache"""
+
+        reader = self.Open(key)
+        if reader is None:
+            return None
+
+        with reader:
+            return reader.ToCoverageResults()
+
+    # ----------------------------------------------------------------------
+    def GetTotals(self, key, units="blocks"):
+        """\
+        Returns the cached (covered, not_covered) totals without creating per-method
+        results, or None if the key isn't in the cache.
+        """
+
+        reader = self.Open(key)
+        if reader is None:
+            return None
+
+        with reader:
+            return reader.Totals(units)
+
+    # ----------------------------------------------------------------------
+    def Set(self, key, results):
+        _WriteAtomic(
+            self._GetResultsFilename(key),
+            lambda filename: ColumnarCoverage.Write(filename, results),
+        )
+
+        self._Evict()
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _GetResultsFilename(self, key):
+        return os.path.join(self.CacheDir, "{}{}".format(key, _RESULTS_EXTENSION))
+
+    # ----------------------------------------------------------------------
+    def _GetContentHash(self, filename):
+        """Returns (hash id, content hash)"""
+
+        # Hashing a large coverage file is expensive, so remember the hash for
+        # as long as the file's size and modification time remain the same.
+        filename = os.path.realpath(filename)
+        stat = os.stat(filename)
+
+        stat_info = [stat.st_size, stat.st_mtime_ns]
+
+        hash_id = hashlib.sha256(os.path.normcase(filename).encode("utf-8")).hexdigest()[:32]
+        hash_filename = self._GetHashFilename(hash_id)
+
+        try:
+            with open(hash_filename) as f:
+                content = json.load(f)
+
+            if content["stat"] == stat_info:
+                return hash_id, content["hash"]
+
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            pass
+
+        hasher = hashlib.sha256()
+
+        with open(filename, "rb") as f:
+            while True:
+                chunk = f.read(1024 * 1024)
+                if not chunk:
+                    break
+
+                hasher.update(chunk)
+
+        content_hash = hasher.hexdigest()
+
+        # ----------------------------------------------------------------------
+        def WriteHash(filename):
+            with open(filename, "w") as f:
+                json.dump({"stat": stat_info, "hash": content_hash}, f)
+
+        # ----------------------------------------------------------------------
+
+        _WriteAtomic(hash_filename, WriteHash)
+
+        return hash_id, content_hash
+
+    # ----------------------------------------------------------------------
+    def _GetHashFilename(self, hash_id):
+        return os.path.join(self._hashes_dir, hash_id)
+
+    # ----------------------------------------------------------------------
+    def _Evict(self):
+        entries = []
+        total_size = 0
+
+        for item in os.listdir(self.CacheDir):
+            if not item.endswith(_RESULTS_EXTENSION):
+                continue
+
+            fullpath = os.path.join(self.CacheDir, item)
+
+            try:
+                stat = os.stat(fullpath)
+            except OSError:
+                # Removed by another process
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, fullpath))
+            total_size += stat.st_size
+
+        if total_size <= self.MaxSize:
+            return
+
+        entries.sort()
+
+        evicted_hash_ids = set()
+        retained_hash_ids = set()
+
+        for _, size, fullpath in entries:
+            if total_size <= self.MaxSize:
+                retained_hash_ids.add(_GetHashId(fullpath))
+                continue
+
+            try:
+                os.remove(fullpath)
+            except OSError:
+                # Removed by another process or currently in use; it will be
+                # considered again during the next eviction.
+                retained_hash_ids.add(_GetHashId(fullpath))
+                continue
+
+            evicted_hash_ids.add(_GetHashId(fullpath))
+            total_size -= size
+
+        # Content hashes are only removed when they are no longer associated with an entry
+        for hash_id in evicted_hash_ids - retained_hash_ids:
+            try:
+                os.remove(self._GetHashFilename(hash_id))
+            except OSError:
+                pass
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetHashId(results_filename):
+    return os.path.basename(results_filename).partition(_KEY_SEPARATOR)[0]
+
+
+# ----------------------------------------------------------------------
+def _NormalizePatterns(patterns):
+    return sorted(set(os.path.normcase(pattern) for pattern in (patterns or [])))
+
+
+# ----------------------------------------------------------------------
+def _WriteAtomic(filename, write_func):
+    fd, temp_filename = tempfile.mkstemp(
+        dir=os.path.dirname(filename),
+        suffix=".tmp",
+    )
+
+    os.close(fd)
+
+    try:
+        write_func(temp_filename)
+
+        try:
+            os.replace(temp_filename, filename)
+        except OSError:
+            # The destination may be open in another process (Windows); the
+            # content would be identical, so the write can be safely skipped.
+            pass
+
+    finally:
+        if os.path.isfile(temp_filename):
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
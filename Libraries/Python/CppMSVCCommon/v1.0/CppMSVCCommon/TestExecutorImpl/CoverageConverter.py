@@ -0,0 +1,352 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageConverter.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 10:03:17
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Invokes CoverageToCsv.ps1 and streams the rows that it produces"""
+
+import asyncio
+import codecs
+import csv
+import io
+import locale
+import os
+import subprocess
+
+import CommonEnvironment
+
+from CppMSVCCommon.TestExecutorImpl import ProcessTree
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+_POWERSHELL                                 = r"{}\syswow64\WindowsPowerShell\v1.0\powershell.exe".format(
+    os.getenv("SystemRoot"),
+)
+
+# Set this environment variable to replace the PowerShell invocation with a different
+# command (for example, a stand-in script when running on Linux). The value is a template
+# populated with `{coverage}` and `{module}`.
+COMMAND_LINE_TEMPLATE_ENV_VAR               = "CPP_MSVC_COMMON_COVERAGE_CONVERTER"
+
+DEFAULT_COMMAND_LINE_TEMPLATE               = '"{powershell}" -ExecutionPolicy Bypass -NoProfile -File "{script}" "{{coverage}}" "{{module}}"'.format(
+    powershell=_POWERSHELL,
+    script=os.path.join(_script_dir, "CoverageToCsv.ps1"),
+)
+
+# Set this environment variable to replace the PowerShell invocation used to process
+# batches. The value is a template populated with `{batch}`.
+BATCH_COMMAND_LINE_TEMPLATE_ENV_VAR         = "CPP_MSVC_COMMON_COVERAGE_BATCH_CONVERTER"
+
+DEFAULT_BATCH_COMMAND_LINE_TEMPLATE         = '"{powershell}" -ExecutionPolicy Bypass -NoProfile -File "{script}" -batch_filename "{{batch}}"'.format(
+    powershell=_POWERSHELL,
+    script=os.path.join(_script_dir, "CoverageToCsv.ps1"),
+)
+
+_ASYNC_READ_SIZE                            = 256 * 1024
+
+# Frames written by CoverageToCsv.ps1 when processing a batch
+BATCH_BEGIN_FRAME                           = "##CoverageToCsv-begin"
+BATCH_END_FRAME                             = "##CoverageToCsv-end"
+BATCH_ERROR_FRAME                           = "##CoverageToCsv-error"
+
+
+# ----------------------------------------------------------------------
+class ConversionError(Exception):
+    """\
+    Raised when the converter reports an error (`Result` is None) or terminates
+    unsuccessfully (`Result` is the process' return code).
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, message, result=None):
+        super(ConversionError, self).__init__(message)
+        self.Result                         = result
+
+
+# ----------------------------------------------------------------------
+def CreateCommandLine(
+    coverage_filename,
+    module_name,
+    command_line_template=None,
+):
+    """Returns the command line used to convert the coverage file"""
+
+    command_line_template = (
+        command_line_template
+        or os.getenv(COMMAND_LINE_TEMPLATE_ENV_VAR)
+        or DEFAULT_COMMAND_LINE_TEMPLATE
+    )
+
+    return command_line_template.format(
+        coverage=coverage_filename,
+        module=module_name,
+    )
+
+
+# ----------------------------------------------------------------------
+def CreateBatchCommandLine(
+    batch_filename,
+    command_line_template=None,
+):
+    """Returns the command line used to convert all jobs in the batch file"""
+
+    command_line_template = (
+        command_line_template
+        or os.getenv(BATCH_COMMAND_LINE_TEMPLATE_ENV_VAR)
+        or DEFAULT_BATCH_COMMAND_LINE_TEMPLATE
+    )
+
+    return command_line_template.format(
+        batch=batch_filename,
+    )
+
+
+# ----------------------------------------------------------------------
+def WriteBatchFile(batch_filename, jobs):
+    """Writes (coverage_filename, module_name) jobs to a batch file"""
+
+    with open(batch_filename, "w") as f:
+        for coverage_filename, module_name in jobs:
+            assert "\t" not in coverage_filename, coverage_filename
+            assert "\t" not in module_name, module_name
+
+            f.write("{}\t{}\n".format(coverage_filename, module_name))
+
+
+# ----------------------------------------------------------------------
+def EnumRows(command_line, stats=None):
+    """\
+    Yields CSV rows as they are written by the converter.
+
+    Rows are parsed while the converter is still running, so memory usage is
+    bounded regardless of the amount of output. Errors emitted by the converter
+    (single-column rows) raise a ConversionError as soon as they are encountered;
+    the converter is terminated if the caller stops iterating early.
+
+    If `stats` is a dict, the number of bytes read (before decoding) is written to
+    stats["bytes_read"]; output is only measured when `stats` is provided.
+    """
+
+    process = subprocess.Popen(
+        command_line,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        **ProcessTree.GetCreateKwargs()
+    )
+
+    try:
+        if stats is None:
+            stream = process.stdout
+        else:
+            stats["bytes_read"] = 0
+            stream = io.BufferedReader(_MeasuredStream(process.stdout, stats))
+
+        # Decode in the same way as universal_newlines=True
+        lines = io.TextIOWrapper(stream, encoding=locale.getpreferredencoding(False))
+
+        for row in csv.reader(lines):
+            if not row:
+                continue
+
+            if len(row) == 1:
+                raise ConversionError(row[0])
+
+            yield row
+
+        result = process.wait()
+        if result != 0:
+            raise ConversionError(
+                "'{}' failed ({})".format(command_line, result),
+                result,
+            )
+
+    finally:
+        if process.poll() is None:
+            ProcessTree.Kill(process)
+            process.wait()
+
+        process.stdout.close()
+
+
+# ----------------------------------------------------------------------
+def ConvertToFile(command_line, output_filename):
+    """\
+    Writes the converter's output to a file rather than streaming it (see
+    CoverageShards); returns the converter's result code.
+
+    Errors emitted by the converter are written to the file like any other row.
+    """
+
+    with open(output_filename, "wb") as f:
+        process = subprocess.Popen(
+            command_line,
+            shell=True,
+            stdout=f,
+            stderr=subprocess.STDOUT,
+            **ProcessTree.GetCreateKwargs()
+        )
+
+        try:
+            return process.wait()
+
+        finally:
+            if process.poll() is None:
+                ProcessTree.Kill(process)
+                process.wait()
+
+
+# ----------------------------------------------------------------------
+async def EnumRowsAsync(command_line, create_subprocess_func=None, stats=None):
+    """\
+    Asynchronous version of EnumRows for use within an event loop.
+
+    `create_subprocess_func` has the same signature as asyncio.create_subprocess_shell,
+    which is used by default. When `stats` is provided, the number of bytes read is
+    written to stats["bytes_read"].
+    """
+
+    create_subprocess_func = create_subprocess_func or asyncio.create_subprocess_shell
+
+    process = await create_subprocess_func(
+        command_line,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        **ProcessTree.GetCreateKwargs()
+    )
+
+    decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace")
+    remainder = ""
+
+    if stats is not None:
+        stats["bytes_read"] = 0
+
+    try:
+        while True:
+            data = await process.stdout.read(_ASYNC_READ_SIZE)
+            is_complete = not data
+
+            if stats is not None:
+                stats["bytes_read"] += len(data)
+
+            lines = (remainder + decoder.decode(data, final=is_complete)).split("\n")
+
+            # The last line is incomplete until all of the output has been read
+            remainder = "" if is_complete else lines.pop()
+
+            for row in csv.reader(lines):
+                if not row:
+                    continue
+
+                if len(row) == 1:
+                    raise ConversionError(row[0])
+
+                yield row
+
+            if is_complete:
+                break
+
+        result = await process.wait()
+        if result != 0:
+            raise ConversionError(
+                "'{}' failed ({})".format(command_line, result),
+                result,
+            )
+
+    finally:
+        if process.returncode is None:
+            ProcessTree.Kill(process)
+            await process.wait()
+
+
+# ----------------------------------------------------------------------
+def EnumBatchRows(
+    command_line,
+    job_status,
+    stats=None,
+    on_job_begin_func=None,
+    on_job_end_func=None,
+):
+    """\
+    Yields (job_index, row) for each row written by a converter processing a batch.
+
+    `job_status` is populated with job_index -> error message (or None if the job
+    was successful) as each job completes; jobs that are not in `job_status` once
+    enumeration is complete did not run to completion. Errors that are not
+    associated with a job raise a ConversionError. `stats` is populated as
+    described in EnumRows.
+
+    `on_job_begin_func(job_index)` and `on_job_end_func(job_index, error)` (if
+    provided) are invoked as the converter begins and completes each job.
+    """
+
+    current_job_index = None
+
+    for row in EnumRows(command_line, stats):
+        frame = row[0]
+
+        if frame == BATCH_BEGIN_FRAME:
+            current_job_index = int(row[1])
+
+            if on_job_begin_func is not None:
+                on_job_begin_func(current_job_index)
+
+        elif frame == BATCH_END_FRAME:
+            job_index = int(row[1])
+
+            job_status.setdefault(job_index, None)
+            current_job_index = None
+
+            if on_job_end_func is not None:
+                on_job_end_func(job_index, job_status[job_index])
+
+        elif frame == BATCH_ERROR_FRAME:
+            job_index = int(row[1])
+
+            job_status[job_index] = row[2] if len(row) > 2 else "Unknown error"
+            current_job_index = None
+
+            if on_job_end_func is not None:
+                on_job_end_func(job_index, job_status[job_index])
+
+        elif current_job_index is None:
+            raise ConversionError("Unexpected output: {}".format(",".join(row)))
+
+        elif current_job_index not in job_status:
+            yield current_job_index, row
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+class _MeasuredStream(io.RawIOBase):
+    """Counts the bytes read from a binary stream"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, stream, stats):
+        self._stream                        = stream
+        self._stats                         = stats
+
+    # ----------------------------------------------------------------------
+    def readable(self):
+        return True
+
+    # ----------------------------------------------------------------------
+    def readinto(self, buffer):
+        num_read = self._stream.readinto(buffer)
+
+        self._stats["bytes_read"] += num_read
+        return num_read
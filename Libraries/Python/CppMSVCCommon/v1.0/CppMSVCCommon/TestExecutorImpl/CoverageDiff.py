@@ -0,0 +1,286 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageDiff.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 16:12:09
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Calculates per-method coverage differences between two sets of results"""
+
+import os
+
+from array import array
+from collections import namedtuple
+
+import CommonEnvironment
+
+from CppMSVCCommon.TestExecutorImpl.CoverageResults import CreateKey, KEY_NAME, KEY_MODULE_AND_NAME, KEYS
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Baseline values are None for methods that are not in the baseline; current values are
+# None for methods that have been removed.
+MethodDelta                                 = namedtuple(
+    "MethodDelta",
+    [
+        "Module",
+        "Name",
+        "BaselineCovered",
+        "BaselineNotCovered",
+        "CurrentCovered",
+        "CurrentNotCovered",
+        "Namespace",
+        "Class",
+    ],
+)
+
+
+# ----------------------------------------------------------------------
+def Diff(
+    baseline,
+    current,
+    units="blocks",
+    key=KEY_MODULE_AND_NAME,
+):
+    """\
+    Compares two CoverageResults objects (for example, baseline and pull request
+    results) in time proportional to the number of methods in both.
+    """
+
+    return CoverageDiff(baseline, current, units, key)
+
+
+# ----------------------------------------------------------------------
+class CoverageDiff(object):
+    """\
+    Per-method differences between two CoverageResults objects.
+
+    Methods are identified in the same way as they are when merging (see KEYS in
+    CoverageResults): on each side, the counters of rows with the same module, namespace,
+    class and name (for example, overloads) are summed, and when methods are aligned by
+    KEY_NAME, the same method in multiple modules is combined by taking the maximum of
+    its counters. Deltas report the module of the first row with the key.
+
+    Only indexes are stored; MethodDelta values are created on demand when enumerated.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, baseline, current, units="blocks", key=KEY_MODULE_AND_NAME):
+        if key not in KEYS:
+            raise Exception("'{}' is not a valid key ({})".format(key, ", ".join(KEYS)))
+
+        self.Units                          = units
+
+        self._baseline                      = baseline
+        self._current                       = current
+
+        # Dict keys reference the (interned) strings already held by the results, so the
+        # indexes only add the cost of the tables themselves.
+        baseline_rows, baseline_covered, baseline_not_covered, baseline_index = _Aggregate(baseline, units, key)
+        current_rows, current_covered, current_not_covered, current_index = _Aggregate(current, units, key)
+
+        self.BaselineTotals                 = (sum(baseline_covered), sum(baseline_not_covered))
+        self.CurrentTotals                  = (sum(current_covered), sum(current_not_covered))
+
+        # Compare
+        matched = bytearray(len(baseline_rows))
+
+        changed_current = array("q")
+        changed_baseline = array("q")
+        newly_uncovered_current = array("q")
+        newly_uncovered_baseline = array("q")
+
+        for current_group, this_key in enumerate(current_index):
+            covered = current_covered[current_group]
+
+            baseline_group = baseline_index.get(this_key, -1)
+
+            if baseline_group == -1:
+                changed_current.append(current_group)
+                changed_baseline.append(-1)
+
+                if covered == 0:
+                    newly_uncovered_current.append(current_group)
+                    newly_uncovered_baseline.append(-1)
+
+                continue
+
+            matched[baseline_group] = 1
+
+            if (
+                covered != baseline_covered[baseline_group]
+                or current_not_covered[current_group] != baseline_not_covered[baseline_group]
+            ):
+                changed_current.append(current_group)
+                changed_baseline.append(baseline_group)
+
+            if covered == 0 and baseline_covered[baseline_group] != 0:
+                newly_uncovered_current.append(current_group)
+                newly_uncovered_baseline.append(baseline_group)
+
+        del baseline_index
+        del current_index
+
+        self._baseline_rows                 = baseline_rows
+        self._baseline_covered              = baseline_covered
+        self._baseline_not_covered          = baseline_not_covered
+
+        self._current_rows                  = current_rows
+        self._current_covered               = current_covered
+        self._current_not_covered           = current_not_covered
+
+        self._changed                       = (changed_current, changed_baseline)
+        self._newly_uncovered               = (newly_uncovered_current, newly_uncovered_baseline)
+        self._removed                       = array("q", (index for index, value in enumerate(matched) if not value))
+
+    # ----------------------------------------------------------------------
+    @property
+    def NumChanged(self):
+        return len(self._changed[0])
+
+    # ----------------------------------------------------------------------
+    @property
+    def NumNewlyUncovered(self):
+        return len(self._newly_uncovered[0])
+
+    # ----------------------------------------------------------------------
+    @property
+    def NumRemoved(self):
+        return len(self._removed)
+
+    # ----------------------------------------------------------------------
+    def EnumChangedMethods(self):
+        """Yields a MethodDelta for each method whose coverage changed or that was added"""
+
+        for current_group, baseline_group in zip(*self._changed):
+            yield self._CreateDelta(current_group, baseline_group)
+
+    # ----------------------------------------------------------------------
+    def EnumNewlyUncoveredMethods(self):
+        """\
+        Yields a MethodDelta for each method that isn't covered in the current
+        results but was either covered in the baseline or isn't in the baseline.
+        """
+
+        for current_group, baseline_group in zip(*self._newly_uncovered):
+            yield self._CreateDelta(current_group, baseline_group)
+
+    # ----------------------------------------------------------------------
+    def EnumRemovedMethods(self):
+        """Yields a MethodDelta for each method in the baseline that isn't in the current results"""
+
+        for baseline_group in self._removed:
+            row = self._baseline_rows[baseline_group]
+
+            yield MethodDelta(
+                self._baseline.Modules[row],
+                self._baseline.Names[row],
+                self._baseline_covered[baseline_group],
+                self._baseline_not_covered[baseline_group],
+                None,
+                None,
+                self._baseline.Namespaces[row],
+                self._baseline.Classes[row],
+            )
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _CreateDelta(self, current_group, baseline_group):
+        row = self._current_rows[current_group]
+
+        if baseline_group == -1:
+            baseline_covered = None
+            baseline_not_covered = None
+        else:
+            baseline_covered = self._baseline_covered[baseline_group]
+            baseline_not_covered = self._baseline_not_covered[baseline_group]
+
+        return MethodDelta(
+            self._current.Modules[row],
+            self._current.Names[row],
+            baseline_covered,
+            baseline_not_covered,
+            self._current_covered[current_group],
+            self._current_not_covered[current_group],
+            self._current.Namespaces[row],
+            self._current.Classes[row],
+        )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Aggregate(results, units, key):
+    """\
+    Returns (first_rows, covered, not_covered, index) for the distinct keys in the
+    results, where `index` maps each key to its position within the arrays (in order
+    of first appearance).
+    """
+
+    first_rows = array("q")
+    covered = array("q")
+    not_covered = array("q")
+    index = {}
+
+    # Rows with the same scope are summed
+    for row, (namespace, class_name, (module, name, method_covered, method_not_covered)) in enumerate(
+        zip(results.Namespaces, results.Classes, results.MethodTotals(units)),
+    ):
+        scope = (module, namespace, class_name, name)
+
+        group = index.get(scope)
+
+        if group is None:
+            index[scope] = len(first_rows)
+
+            first_rows.append(row)
+            covered.append(method_covered)
+            not_covered.append(method_not_covered)
+        else:
+            covered[group] += method_covered
+            not_covered[group] += method_not_covered
+
+    if key == KEY_MODULE_AND_NAME:
+        return first_rows, covered, not_covered, index
+
+    # The same method in multiple modules is combined by taking the maximum of its counters
+    assert key == KEY_NAME, key
+
+    key_first_rows = array("q")
+    key_covered = array("q")
+    key_not_covered = array("q")
+    key_index = {}
+
+    for scope_group, scope in enumerate(index):
+        this_key = CreateKey(key, *scope)
+
+        group = key_index.get(this_key)
+
+        if group is None:
+            key_index[this_key] = len(key_first_rows)
+
+            key_first_rows.append(first_rows[scope_group])
+            key_covered.append(covered[scope_group])
+            key_not_covered.append(not_covered[scope_group])
+        else:
+            total = max(
+                key_covered[group] + key_not_covered[group],
+                covered[scope_group] + not_covered[scope_group],
+            )
+
+            key_covered[group] = max(key_covered[group], covered[scope_group])
+            key_not_covered[group] = total - key_covered[group]
+
+    return key_first_rows, key_covered, key_not_covered, key_index
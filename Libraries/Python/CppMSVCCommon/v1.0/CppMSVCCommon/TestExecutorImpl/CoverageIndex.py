@@ -0,0 +1,423 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageIndex.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 17:52:37
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Hierarchical index of per-method coverage.
+
+Methods are organized in a trie by module and then by each component of their
+namespace and class names (as written by CoverageToCsv.ps1):
+
+    Foo.exe
+        MyNamespace
+            Nested
+                MyClass
+                    <methods>
+
+Counters are rolled up at every node when the index is created, so totals for any
+namespace or class are available without visiting its methods, and include and
+exclude prefixes prune entire subtrees when filtering.
+
+Prefixes are matched component by component: "MyNamespace::Nested" matches
+"MyNamespace::Nested::MyClass" but not "MyNamespace::NestedOther". A prefix may also
+end with a method name ("MyNamespace::Nested::MyClass::Method").
+"""
+
+import os
+
+from array import array
+from collections import OrderedDict
+
+import CommonEnvironment
+
+from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults, COLUMN_NAMES, UNITS
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+SCOPE_SEPARATOR                             = "::"
+
+
+# ----------------------------------------------------------------------
+class Node(object):
+    """\
+    Node within the index; `Counters` are the rolled up values of all methods
+    within the node (ordered according to COLUMN_NAMES) and `Rows` are the
+    indexes of methods that are direct descendants of the node.
+    """
+
+    __slots__ = ("Name", "Children", "Rows", "Counters")
+
+    # ----------------------------------------------------------------------
+    def __init__(self, name):
+        self.Name                           = name
+        self.Children                       = OrderedDict()
+        self.Rows                           = array("q")
+        self.Counters                       = [0] * len(COLUMN_NAMES)
+
+    # ----------------------------------------------------------------------
+    def Totals(self, units="blocks"):
+        """Returns (covered, not_covered) for the specified units"""
+
+        return _GetTotals(self.Counters, units)
+
+
+# ----------------------------------------------------------------------
+class CoverageIndex(object):
+    """\
+    Index of CoverageResults by module, namespace and class.
+
+    Usage:
+
+        index = CoverageIndex(results)
+
+        covered, not_covered = index.Totals(
+            includes=["MyNamespace"],
+            excludes=["MyNamespace::Details"],
+        )
+
+        for namespace, (covered, not_covered) in index.NamespaceTotals().items():
+            ...
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, results):
+        self.Results                        = results
+        self.Root                           = Node("")
+
+        columns = [results.Columns[column_name] for column_name in COLUMN_NAMES]
+        scope_components = {}
+
+        # Counters for each distinct (module, namespace, class)
+        self._scope_counters                = OrderedDict()
+
+        scope_nodes = {}
+
+        for index, scope in enumerate(zip(results.Modules, results.Namespaces, results.Classes)):
+            node = scope_nodes.get(scope)
+
+            if node is None:
+                module, namespace, class_name = scope
+
+                node = _GetOrCreateChild(self.Root, module)
+
+                for value in [namespace, class_name]:
+                    components = scope_components.get(value)
+                    if components is None:
+                        components = _SplitScope(value)
+                        scope_components[value] = components
+
+                    for component in components:
+                        node = _GetOrCreateChild(node, component)
+
+                scope_nodes[scope] = node
+                self._scope_counters[scope] = [0] * len(columns)
+
+            node.Rows.append(index)
+
+            counters = self._scope_counters[scope]
+
+            for column_index, column in enumerate(columns):
+                counters[column_index] += column[index]
+
+        for scope, node in scope_nodes.items():
+            _AddCounters(node.Counters, self._scope_counters[scope])
+
+        _RollUp(self.Root)
+
+    # ----------------------------------------------------------------------
+    @property
+    def Modules(self):
+        return list(self.Root.Children.keys())
+
+    # ----------------------------------------------------------------------
+    def GetNode(self, module, scope=None):
+        """Returns the node for the namespace or class prefix within the module (or None if it doesn't exist)"""
+
+        node = self.Root.Children.get(module)
+
+        for component in _SplitScope(scope or ""):
+            if node is None:
+                break
+
+            node = node.Children.get(component)
+
+        return node
+
+    # ----------------------------------------------------------------------
+    def Totals(
+        self,
+        units="blocks",
+        module=None,
+        includes=None,
+        excludes=None,
+    ):
+        """\
+        Returns (covered, not_covered) for methods within the module (or all
+        modules) that match the include and exclude prefixes.
+        """
+
+        counters = [0] * len(COLUMN_NAMES)
+        columns = None
+
+        for node, row in self._EnumSelected(module, includes, excludes):
+            if node is not None:
+                _AddCounters(counters, node.Counters)
+                continue
+
+            if columns is None:
+                columns = [self.Results.Columns[column_name] for column_name in COLUMN_NAMES]
+
+            for column_index, column in enumerate(columns):
+                counters[column_index] += column[row]
+
+        return _GetTotals(counters, units)
+
+    # ----------------------------------------------------------------------
+    def EnumRows(
+        self,
+        module=None,
+        includes=None,
+        excludes=None,
+    ):
+        """Yields the index of each method within the module (or all modules) that matches the include and exclude prefixes"""
+
+        for node, row in self._EnumSelected(module, includes, excludes):
+            if node is None:
+                yield row
+                continue
+
+            for row in _EnumNodeRows(node):
+                yield row
+
+    # ----------------------------------------------------------------------
+    def Filter(
+        self,
+        module=None,
+        includes=None,
+        excludes=None,
+    ):
+        """Returns CoverageResults that only contain methods that match the include and exclude prefixes"""
+
+        results = CoverageResults()
+
+        for index in sorted(self.EnumRows(module, includes, excludes)):
+            values = self.Results[index]
+
+            results.Append(
+                values.Module,
+                values.Name,
+                [getattr(values, column_name) for column_name in COLUMN_NAMES],
+                values.Namespace,
+                values.Class,
+                values.SourceFile,
+            )
+
+        return results
+
+    # ----------------------------------------------------------------------
+    def NamespaceTotals(self, units="blocks", module=None):
+        """Returns an OrderedDict of namespace -> (covered, not_covered) for methods directly within each namespace"""
+
+        return self._ScopeTotals(units, module, lambda namespace, class_name: namespace)
+
+    # ----------------------------------------------------------------------
+    def ClassTotals(self, units="blocks", module=None):
+        """Returns an OrderedDict of (namespace, class) -> (covered, not_covered)"""
+
+        return self._ScopeTotals(units, module, lambda namespace, class_name: (namespace, class_name))
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _EnumSelected(self, module, includes, excludes):
+        """\
+        Yields (node, None) for each node whose methods are all selected and
+        (None, row) for individually selected methods.
+        """
+
+        if module is None:
+            module_nodes = list(self.Root.Children.values())
+        else:
+            module_nodes = [self.Root.Children[module]] if module in self.Root.Children else []
+
+        include_paths, include_prefixes = _CreatePathSets(includes)
+        exclude_paths, exclude_prefixes = _CreatePathSets(excludes)
+
+        names = self.Results.Names
+
+        # ----------------------------------------------------------------------
+        def Impl(node, path, is_included):
+            if path in exclude_paths:
+                return
+
+            if path in include_paths:
+                is_included = True
+
+            if is_included and path not in exclude_prefixes:
+                # Everything within this subtree is included
+                yield node, None
+                return
+
+            if not is_included and path not in include_prefixes:
+                # Nothing within this subtree can be included
+                return
+
+            for row in node.Rows:
+                row_path = path + (names[row],)
+
+                if row_path in exclude_paths:
+                    continue
+
+                if is_included or row_path in include_paths:
+                    yield None, row
+
+            for child in node.Children.values():
+                for result in Impl(child, path + (child.Name,), is_included):
+                    yield result
+
+        # ----------------------------------------------------------------------
+
+        for module_node in module_nodes:
+            for result in Impl(module_node, (), not includes):
+                yield result
+
+    # ----------------------------------------------------------------------
+    def _ScopeTotals(self, units, module, key_func):
+        counters = OrderedDict()
+
+        for (scope_module, namespace, class_name), scope_counters in self._scope_counters.items():
+            if module is not None and scope_module != module:
+                continue
+
+            key = key_func(namespace, class_name)
+
+            existing_counters = counters.get(key)
+            if existing_counters is None:
+                existing_counters = [0] * len(COLUMN_NAMES)
+                counters[key] = existing_counters
+
+            _AddCounters(existing_counters, scope_counters)
+
+        return OrderedDict((key, _GetTotals(value, units)) for key, value in counters.items())
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _SplitScope(value):
+    """Splits the value by SCOPE_SEPARATOR, ignoring separators within template or function arguments"""
+
+    if not value:
+        return ()
+
+    if SCOPE_SEPARATOR not in value:
+        return (value,)
+
+    components = []
+
+    depth = 0
+    start = 0
+    index = 0
+
+    while index < len(value):
+        c = value[index]
+
+        if c in "<([":
+            depth += 1
+        elif c in ">)]":
+            depth = max(0, depth - 1)
+        elif depth == 0 and value.startswith(SCOPE_SEPARATOR, index):
+            components.append(value[start:index])
+
+            index += len(SCOPE_SEPARATOR)
+            start = index
+            continue
+
+        index += 1
+
+    components.append(value[start:])
+
+    return tuple(components)
+
+
+# ----------------------------------------------------------------------
+def _CreatePathSets(values):
+    """Returns a set of component paths and a set of their proper prefixes"""
+
+    paths = set()
+    prefixes = set()
+
+    for value in values or []:
+        path = _SplitScope(value)
+        paths.add(path)
+
+        for length in range(len(path)):
+            prefixes.add(path[:length])
+
+    return paths, prefixes
+
+
+# ----------------------------------------------------------------------
+def _GetOrCreateChild(node, name):
+    child = node.Children.get(name)
+
+    if child is None:
+        child = Node(name)
+        node.Children[name] = child
+
+    return child
+
+
+# ----------------------------------------------------------------------
+def _RollUp(node):
+    for child in node.Children.values():
+        _RollUp(child)
+        _AddCounters(node.Counters, child.Counters)
+
+
+# ----------------------------------------------------------------------
+def _AddCounters(counters, values):
+    for index, value in enumerate(values):
+        counters[index] += value
+
+
+# ----------------------------------------------------------------------
+def _EnumNodeRows(node):
+    for row in node.Rows:
+        yield row
+
+    for child in node.Children.values():
+        for row in _EnumNodeRows(child):
+            yield row
+
+
+# ----------------------------------------------------------------------
+def _GetTotals(counters, units):
+    if units == "blocks":
+        return (
+            counters[COLUMN_NAMES.index("BlocksCovered")],
+            counters[COLUMN_NAMES.index("BlocksNotCovered")],
+        )
+
+    if units == "lines":
+        # See CoverageResults.Totals
+        return (
+            counters[COLUMN_NAMES.index("LinesCovered")],
+            counters[COLUMN_NAMES.index("LinesPartiallyCovered")] + counters[COLUMN_NAMES.index("LinesNotCovered")],
+        )
+
+    raise Exception("'{}' is not a valid unit ({})".format(units, ", ".join(UNITS)))
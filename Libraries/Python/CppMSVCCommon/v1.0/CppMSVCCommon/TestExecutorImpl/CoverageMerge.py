@@ -0,0 +1,261 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageMerge.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 15:31:44
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Merges per-method coverage from multiple runs and/or binaries.
+
+The same method may be present in multiple sources (for example, code in a static
+library that is linked into many test binaries, or the same binary executed multiple
+times). Summing counters for these methods would count the same blocks multiple
+times, so methods are aligned by key (see KEYS in CoverageResults) and combined in
+two steps:
+
+    1) Rows with the same module, namespace, class and name within a source are
+       summed.
+
+    2) The resulting counters for the same method in different sources (or in
+       different modules, when methods are aligned by KEY_NAME) are combined:
+
+        - The total number of blocks (or lines) is the maximum total seen for the method.
+        - The number of covered blocks (or lines) is the maximum number covered in any
+          source; this is a lower bound for the true union of covered blocks, which
+          can't be calculated without block-level data.
+        - The number of not covered blocks (or lines) is the difference of the two.
+
+When methods are aligned by KEY_NAME, the merged results associate each method with the
+first module in which it was encountered. Source file names are also taken from the
+first source in which the method was encountered.
+
+Counters are combined with NumPy, so tens of millions of rows can be merged quickly.
+"""
+
+import os
+
+from collections import defaultdict
+
+import numpy as np
+
+import CommonEnvironment
+
+from CppMSVCCommon.TestExecutorImpl import ColumnarCoverage
+from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults, COLUMN_NAMES, KEY_NAME, KEYS
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# ----------------------------------------------------------------------
+def Merge(sources, key=KEY_NAME):
+    """\
+    Merges CoverageResults and/or ColumnarCoverage.Reader objects; returns
+    CoverageResults.
+    """
+
+    if key not in KEYS:
+        raise Exception("'{}' is not a valid key ({})".format(key, ", ".join(KEYS)))
+
+    # Assigns a stable integer id to each distinct scope (module, namespace, class and
+    # name) in the order in which it was first encountered
+    scope_ids = defaultdict()
+    scope_ids.default_factory = scope_ids.__len__
+
+    # Populated with information for each scope; counters are populated at the end
+    results = CoverageResults()
+
+    id_arrays = []
+    column_arrays = {column_name: [] for column_name in COLUMN_NAMES}
+
+    for source in sources:
+        modules, names, namespaces, classes, source_files, columns = _GetSourceData(source)
+
+        if not names:
+            continue
+
+        num_scopes = len(scope_ids)
+
+        # Ids are assigned without executing Python code for each row
+        ids = np.fromiter(
+            map(scope_ids.__getitem__, zip(modules, namespaces, classes, names)),
+            dtype=np.int64,
+            count=len(names),
+        )
+
+        # Information is only collected for the first row associated with each new scope
+        # (new ids are in order of first appearance, as are their first rows).
+        new_indexes = np.flatnonzero(ids >= num_scopes)
+        _, first_indexes = np.unique(ids[new_indexes], return_index=True)
+
+        first_rows = new_indexes[first_indexes].tolist()
+
+        for values, source_values in [
+            (results.Modules, modules),
+            (results.Names, names),
+            (results.Namespaces, namespaces),
+            (results.Classes, classes),
+            (results.SourceFiles, source_files),
+        ]:
+            values += map(source_values.__getitem__, first_rows)
+
+        # Rows with the same scope are summed within a source
+        ids, columns = _SumGroups(ids, columns)
+
+        id_arrays.append(ids)
+
+        for column_name in COLUMN_NAMES:
+            column_arrays[column_name].append(columns[column_name])
+
+    if not scope_ids:
+        return results
+
+    ids = np.concatenate(id_arrays)
+    columns = {
+        column_name: np.concatenate(arrays).astype(np.int64, copy=False)
+        for column_name, arrays in column_arrays.items()
+    }
+
+    if key == KEY_NAME:
+        # The same method in different modules is combined in the same way as the same method
+        # in different sources. Keys (see CreateKey) are assigned ids in the order in which
+        # their first scope was encountered, and that scope provides the method's information.
+        key_ids = defaultdict()
+        key_ids.default_factory = key_ids.__len__
+
+        scope_key_ids = np.fromiter(
+            map(key_ids.__getitem__, zip(results.Namespaces, results.Classes, results.Names)),
+            dtype=np.int64,
+            count=len(results.Names),
+        )
+
+        if len(key_ids) != len(scope_key_ids):
+            _, first_scopes = np.unique(scope_key_ids, return_index=True)
+            first_scopes = first_scopes.tolist()
+
+            for values in [
+                results.Modules,
+                results.Names,
+                results.Namespaces,
+                results.Classes,
+                results.SourceFiles,
+            ]:
+                values[:] = map(values.__getitem__, first_scopes)
+
+            ids = scope_key_ids[ids]
+
+    # Group the rows by id
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+
+    group_starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+
+    # ----------------------------------------------------------------------
+    def GroupMax(values):
+        return np.maximum.reduceat(values[order], group_starts)
+
+    # ----------------------------------------------------------------------
+
+    blocks_covered = GroupMax(columns["BlocksCovered"])
+    blocks_total = GroupMax(columns["BlocksCovered"] + columns["BlocksNotCovered"])
+
+    lines_covered = GroupMax(columns["LinesCovered"])
+    lines_touched = np.maximum(
+        GroupMax(columns["LinesCovered"] + columns["LinesPartiallyCovered"]),
+        lines_covered,
+    )
+    lines_total = np.maximum(
+        GroupMax(columns["LinesCovered"] + columns["LinesPartiallyCovered"] + columns["LinesNotCovered"]),
+        lines_touched,
+    )
+
+    merged_columns = {
+        "LinesCovered": lines_covered,
+        "LinesPartiallyCovered": lines_touched - lines_covered,
+        "LinesNotCovered": lines_total - lines_touched,
+        "BlocksCovered": blocks_covered,
+        "BlocksNotCovered": np.maximum(blocks_total, blocks_covered) - blocks_covered,
+    }
+
+    # Ids were assigned in order of first appearance, so groups are already in that order
+    assert len(group_starts) == len(results.Names)
+
+    for column_name in COLUMN_NAMES:
+        results.Columns[column_name].frombytes(merged_columns[column_name].astype(np.int64).tobytes())
+
+    return results
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetSourceData(source):
+    if isinstance(source, CoverageResults):
+        return (
+            source.Modules,
+            source.Names,
+            source.Namespaces,
+            source.Classes,
+            source.SourceFiles,
+            {
+                column_name: np.frombuffer(source.Columns[column_name], dtype=np.int64) if len(source) else np.zeros(0, dtype=np.int64)
+                for column_name in COLUMN_NAMES
+            },
+        )
+
+    if isinstance(source, ColumnarCoverage.Reader):
+        modules = []
+
+        for module in sorted(source.Modules, key=lambda module: source.GetRowRange(module)[0]):
+            begin, end = source.GetRowRange(module)
+            modules += [module] * (end - begin)
+
+        # Scope names are part of each row's scope, so they are resolved for every row (this
+        # only creates references to the reader's cached scope names). Counters are copied
+        # so that the results remain valid after the reader is closed.
+        scopes = source.GetScopes()
+
+        return (
+            modules,
+            source.GetNames(),
+            list(map(scopes.__getitem__, source.GetNamespaceIds())),
+            list(map(scopes.__getitem__, source.GetClassIds())),
+            list(map(scopes.__getitem__, source.GetSourceFileIds())),
+            {
+                column_name: np.array(source.GetColumn(column_name), dtype=np.int64)
+                for column_name in COLUMN_NAMES
+            },
+        )
+
+    raise Exception("'{}' is not a supported source".format(type(source).__name__))
+
+
+# ----------------------------------------------------------------------
+def _SumGroups(ids, columns):
+    """Returns the distinct ids and the sum of the column values associated with each"""
+
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+
+    group_starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+
+    if len(group_starts) == len(ids):
+        return ids, columns
+
+    return (
+        sorted_ids[group_starts],
+        {
+            column_name: np.add.reduceat(values[order], group_starts)
+            for column_name, values in columns.items()
+        },
+    )
@@ -0,0 +1,564 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoveragePipeline.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 18:31:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Instruments, runs and extracts coverage for multiple binaries with overlapping stages.
+
+Each binary passes through these stages:
+
+    instrument      Instrument the binary with vsinstr (skipped if already instrumented)
+    run             Start the coverage monitor, run the binary and stop the monitor
+    extract         Convert and parse the coverage file
+
+Stages are scheduled with asyncio and each stage has its own concurrency limit, so the
+next binary can be instrumented and the previous binary's coverage extracted while the
+current binary is running. Each binary's coverage is written to its own coverage file.
+
+The coverage monitor is machine-wide, so the run stage's limit should only be greater
+than 1 when the monitor commands have been replaced with ones that support concurrent
+sessions.
+"""
+
+import asyncio
+import io
+import locale
+import os
+import threading
+
+from collections import namedtuple
+
+import CommonEnvironment
+from CommonEnvironment.Shell.All import CurrentShell
+
+from CppMSVCCommon.SourceCoverageIndex import SourceCoverageIndex
+from CppMSVCCommon.TestExecutorImpl import CoverageConverter
+from CppMSVCCommon.TestExecutorImpl.CoverageCache import CoverageCache
+from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults, ROW_NAME_INDEX, ROW_BLOCKS_COVERED_INDEX, ROW_BLOCKS_NOT_COVERED_INDEX
+from CppMSVCCommon.TestExecutorImpl import CoverageSession
+from CppMSVCCommon.TestExecutorImpl import InstrumentationManifest
+from CppMSVCCommon.TestExecutorImpl.PatternMatcher import PatternMatcher
+from CppMSVCCommon.TestExecutorImpl import ProcessTree
+from CppMSVCCommon.TestExecutorImpl import Timing
+from CppMSVCCommon.TestExecutorImpl import WatchdogProcess
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+STAGE_INSTRUMENT                            = "instrument"
+STAGE_RUN                                   = "run"
+STAGE_EXTRACT                               = "extract"
+
+STAGES                                      = (STAGE_INSTRUMENT, STAGE_RUN, STAGE_EXTRACT)
+
+CANCELLED_ERROR                             = "Cancelled"
+
+# ----------------------------------------------------------------------
+PipelineResult                              = namedtuple(
+    "PipelineResult",
+    [
+        "BinaryFilename",
+        "CoverageFilename",
+        "Result",                           # (covered, not_covered) on success, a non-zero result code or None on failure
+        "Stage",                            # Stage that failed or was cancelled (None on success)
+        "Error",                            # Error message if an exception was raised or the binary was cancelled
+        "Output",
+    ],
+)
+
+
+# ----------------------------------------------------------------------
+class CoveragePipeline(object):
+    """\
+    Usage:
+
+        pipeline = CoveragePipeline(includes, excludes)
+
+        for result in pipeline.Execute(binary_filenames, output_stream):
+            ...
+
+    `create_subprocess_func` has the same signature as asyncio.create_subprocess_shell
+    (which is used by default) and is used to launch every process, so the scheduler
+    can be exercised with stand-in commands.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        includes,
+        excludes,
+        max_instrument=None,
+        max_runs=1,
+        max_extract=None,
+        cancel_on_failure=True,
+        create_subprocess_func=None,
+        instrument_command_line_template=None,
+        start_command_line_template=None,
+        stop_command_line=None,
+        start_timeout=None,
+        stop_timeout=None,
+    ):
+        default_limit = os.cpu_count() or 1
+
+        self.Includes                       = includes
+        self.Excludes                       = excludes
+        self.CancelOnFailure                = cancel_on_failure
+
+        self.Limits                         = {
+            STAGE_INSTRUMENT: max_instrument or default_limit,
+            STAGE_RUN: max_runs or 1,
+            STAGE_EXTRACT: max_extract or default_limit,
+        }
+
+        self._create_subprocess_func        = create_subprocess_func or asyncio.create_subprocess_shell
+
+        # The source coverage index isn't safe for concurrent writers
+        self._index_lock                    = threading.Lock()
+        self._instrument_command_line_template = instrument_command_line_template
+
+        self._start_command_line_template   = (
+            start_command_line_template
+            or os.getenv(CoverageSession.START_COMMAND_LINE_TEMPLATE_ENV_VAR)
+            or CoverageSession.DEFAULT_START_COMMAND_LINE_TEMPLATE
+        )
+
+        self._stop_command_line             = (
+            stop_command_line
+            or os.getenv(CoverageSession.STOP_COMMAND_LINE_ENV_VAR)
+            or CoverageSession.DEFAULT_STOP_COMMAND_LINE
+        )
+
+        # The same timeouts are used by CoverageSession
+        self._start_timeout                 = CoverageSession._GetTimeout(
+            start_timeout,
+            CoverageSession.START_TIMEOUT_ENV_VAR,
+            CoverageSession.DEFAULT_START_TIMEOUT,
+        )
+
+        self._stop_timeout                  = CoverageSession._GetTimeout(
+            stop_timeout,
+            CoverageSession.STOP_TIMEOUT_ENV_VAR,
+            CoverageSession.DEFAULT_STOP_TIMEOUT,
+        )
+
+    # ----------------------------------------------------------------------
+    def Execute(self, binary_filenames, output_stream, command_lines=None):
+        """\
+        Processes the binaries within a new event loop; returns a PipelineResult for
+        each binary (in the same order as `binary_filenames`).
+
+        `command_lines` (if provided) contains the command line used to run each binary
+        (or None to run the binary directly).
+        """
+
+        if CurrentShell.CategoryName == "Windows":
+            # Subprocesses are only supported by the proactor event loop on Windows
+            loop = asyncio.ProactorEventLoop()
+        else:
+            loop = asyncio.new_event_loop()
+
+        # Child processes are monitored by the current event loop on some platforms
+        asyncio.set_event_loop(loop)
+
+        try:
+            return loop.run_until_complete(self.ExecuteAsync(binary_filenames, output_stream, command_lines))
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+            asyncio.set_event_loop(None)
+
+    # ----------------------------------------------------------------------
+    async def ExecuteAsync(self, binary_filenames, output_stream, command_lines=None):
+        """Coroutine version of Execute"""
+
+        binary_filenames = list(binary_filenames)
+        command_lines = list(command_lines) if command_lines is not None else [None] * len(binary_filenames)
+
+        if len(command_lines) != len(binary_filenames):
+            raise Exception("A command line must be provided for each binary")
+
+        semaphores = {stage: asyncio.Semaphore(limit) for stage, limit in self.Limits.items()}
+
+        tasks = []
+
+        # ----------------------------------------------------------------------
+        def CancelTasks(except_index=None):
+            for index, task in enumerate(tasks):
+                if index != except_index and not task.done():
+                    task.cancel()
+
+        # ----------------------------------------------------------------------
+        def OnFailure(index):
+            if self.CancelOnFailure:
+                CancelTasks(except_index=index)
+
+        # ----------------------------------------------------------------------
+
+        for index, (binary_filename, command_line) in enumerate(zip(binary_filenames, command_lines)):
+            tasks.append(
+                asyncio.ensure_future(
+                    self._ProcessBinary(
+                        binary_filename,
+                        command_line,
+                        semaphores,
+                        lambda index=index: OnFailure(index),
+                    ),
+                ),
+            )
+
+        # Results (and their output) are provided in order as soon as all of the previous
+        # binaries have completed.
+        results = []
+
+        try:
+            for binary_filename, task in zip(binary_filenames, tasks):
+                try:
+                    result = await task
+
+                except asyncio.CancelledError:
+                    if not task.cancelled():
+                        raise
+
+                    # The task was cancelled before it started
+                    result = PipelineResult(
+                        binary_filename,
+                        _GetCoverageFilename(binary_filename),
+                        None,
+                        STAGE_INSTRUMENT,
+                        CANCELLED_ERROR,
+                        "",
+                    )
+
+                output_stream.write(result.Output)
+                results.append(result)
+
+        except asyncio.CancelledError:
+            CancelTasks()
+            await asyncio.wait(tasks)
+
+            raise
+
+        return results
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    async def _ProcessBinary(self, binary_filename, command_line, semaphores, on_failure_func):
+        coverage_filename = _GetCoverageFilename(binary_filename)
+        sink = io.StringIO()
+
+        stage = STAGE_INSTRUMENT
+
+        try:
+            async with semaphores[STAGE_INSTRUMENT]:
+                result = await self._Instrument(binary_filename, sink)
+
+            if result == 0:
+                stage = STAGE_RUN
+
+                async with semaphores[STAGE_RUN]:
+                    result = await self._Run(binary_filename, coverage_filename, command_line, sink)
+
+            if result == 0:
+                stage = STAGE_EXTRACT
+
+                async with semaphores[STAGE_EXTRACT]:
+                    result = await self._Extract(coverage_filename, binary_filename, sink)
+
+            if isinstance(result, tuple):
+                return PipelineResult(binary_filename, coverage_filename, result, None, None, sink.getvalue())
+
+            error = None
+
+        except asyncio.CancelledError:
+            return PipelineResult(binary_filename, coverage_filename, None, stage, CANCELLED_ERROR, sink.getvalue())
+
+        except Exception as ex:
+            result = None
+            error = str(ex)
+
+        on_failure_func()
+
+        return PipelineResult(binary_filename, coverage_filename, result, stage, error, sink.getvalue())
+
+    # ----------------------------------------------------------------------
+    async def _Instrument(self, binary_filename, output_stream):
+        loop = asyncio.get_event_loop()
+
+        with Timing.Phase("PreprocessBinary", binary_filename) as phase:
+            # Hashing large binaries is expensive, so it happens on another thread
+            pending = await loop.run_in_executor(
+                None,
+                InstrumentationManifest.PrepareInstrumentation,
+                binary_filename,
+                self._instrument_command_line_template,
+            )
+
+            if pending is None:
+                output_stream.write("'{}' is already instrumented.\n".format(binary_filename))
+
+                phase.SetCounter("skipped", 1)
+                return 0
+
+            phase.SetCounter("skipped", 0)
+
+            result, output = await self._Execute(pending.CommandLine)
+            output_stream.write(output)
+
+            if result == 0:
+                await loop.run_in_executor(
+                    None,
+                    InstrumentationManifest.CompleteInstrumentation,
+                    binary_filename,
+                    pending,
+                )
+
+            phase.SetResult(result)
+
+        return result
+
+    # ----------------------------------------------------------------------
+    async def _Run(self, binary_filename, coverage_filename, command_line, output_stream):
+        # Shutdown any existing monitors (as CoverageSession does). The monitor commands
+        # support concurrent sessions when more than 1 run is allowed, so a running
+        # monitor may belong to another binary in that case.
+        if self.Limits[STAGE_RUN] == 1:
+            with Timing.Phase("StopCoverage", binary_filename) as phase:
+                stop_result, output = await self._ExecuteWithoutStreams(
+                    self._stop_command_line,
+                    self._stop_timeout,
+                )
+                output_stream.write(output)
+
+                phase.SetResult(stop_result)
+
+        with Timing.Phase("StartCoverage", binary_filename) as phase:
+            result, output = await self._ExecuteWithoutStreams(
+                self._start_command_line_template.format(
+                    coverage=coverage_filename,
+                ),
+                self._start_timeout,
+            )
+            output_stream.write(output)
+
+            phase.SetResult(result)
+
+        if result != 0:
+            return result
+
+        try:
+            with Timing.Phase("Run", binary_filename) as phase:
+                result, output = await self._Execute(command_line or '"{}"'.format(binary_filename))
+                output_stream.write(output)
+
+                phase.SetResult(result)
+
+        finally:
+            # The monitor must be stopped even if the run was cancelled
+            with Timing.Phase("StopCoverage", binary_filename) as phase:
+                stop_result, output = await self._ExecuteWithoutStreams(
+                    self._stop_command_line,
+                    self._stop_timeout,
+                )
+                output_stream.write(output)
+
+                phase.SetResult(stop_result)
+
+        return result or stop_result
+
+    # ----------------------------------------------------------------------
+    async def _Extract(self, coverage_filename, binary_filename, output_stream):
+        loop = asyncio.get_event_loop()
+
+        source_index = SourceCoverageIndex.GetDefault()
+
+        cache = CoverageCache.GetDefault()
+        cache_key = None
+
+        if cache is not None:
+            cache_key = await loop.run_in_executor(
+                None,
+                cache.CreateKey,
+                coverage_filename,
+                os.path.basename(binary_filename),
+                self.Includes,
+                self.Excludes,
+            )
+
+            if cache_key is not None:
+                if source_index is None or await loop.run_in_executor(
+                    None,
+                    source_index.IsRecorded,
+                    binary_filename,
+                    coverage_filename,
+                    self.Includes,
+                    self.Excludes,
+                ):
+                    totals = await loop.run_in_executor(None, cache.GetTotals, cache_key)
+                    if totals is not None:
+                        return totals
+
+                else:
+                    # Per-method results are required to populate the index
+                    results = await loop.run_in_executor(None, cache.Get, cache_key)
+                    if results is not None:
+                        await loop.run_in_executor(None, self._Record, source_index, coverage_filename, binary_filename, results)
+                        return results.Totals("blocks")
+
+        with Timing.Phase("ExtractCoverageInfo", binary_filename) as phase:
+            should_include_func = PatternMatcher(self.Includes, self.Excludes)
+            stats = {} if phase.IsEnabled else None
+
+            results = CoverageResults() if cache_key is not None or source_index is not None else None
+            counts = [0, 0]
+
+            num_rows = 0
+            num_included = 0
+
+            rows = CoverageConverter.EnumRowsAsync(
+                CoverageConverter.CreateCommandLine(
+                    coverage_filename,
+                    os.path.basename(binary_filename),
+                ),
+                self._create_subprocess_func,
+                stats,
+            )
+
+            try:
+                async for row in rows:
+                    num_rows += 1
+
+                    if not should_include_func(row[ROW_NAME_INDEX]):
+                        continue
+
+                    num_included += 1
+
+                    counts[0] += int(row[ROW_BLOCKS_COVERED_INDEX])
+                    counts[1] += int(row[ROW_BLOCKS_NOT_COVERED_INDEX])
+
+                    if results is not None:
+                        results.AppendRow(row)
+
+            except CoverageConverter.ConversionError as ex:
+                if ex.Result is None:
+                    raise
+
+                output_stream.write("{}\n".format(ex))
+
+                phase.SetResult(ex.Result)
+                return ex.Result
+
+            finally:
+                # Terminate the converter if parsing was interrupted
+                await rows.aclose()
+
+                phase.SetCounter("rows_parsed", num_rows)
+                phase.SetCounter("rows_filtered", num_rows - num_included)
+
+                if stats is not None:
+                    phase.SetCounter("bytes_read", stats.get("bytes_read", 0))
+
+        if cache_key is not None:
+            await loop.run_in_executor(None, cache.Set, cache_key, results)
+
+        if source_index is not None:
+            await loop.run_in_executor(None, self._Record, source_index, coverage_filename, binary_filename, results)
+
+        return tuple(counts)
+
+    # ----------------------------------------------------------------------
+    def _Record(self, source_index, coverage_filename, binary_filename, results):
+        with self._index_lock:
+            source_index.Record(binary_filename, coverage_filename, self.Includes, self.Excludes, results)
+
+    # ----------------------------------------------------------------------
+    async def _Execute(self, command_line):
+        """Returns (result, output)"""
+
+        process = await self._create_subprocess_func(
+            command_line,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            **ProcessTree.GetCreateKwargs()
+        )
+
+        try:
+            output, _ = await process.communicate()
+        finally:
+            await _Terminate(process)
+
+        return process.returncode, output.decode(locale.getpreferredencoding(False), "replace")
+
+    # ----------------------------------------------------------------------
+    async def _ExecuteWithoutStreams(self, command_line, timeout):
+        """\
+        Returns (result, output) for processes that don't close their output streams
+        before exiting (see WatchdogProcess). The result is WatchdogProcess.TIMEOUT_RESULT
+        if the process didn't complete within `timeout` seconds (disabled when None).
+        """
+
+        temp_filename = CurrentShell.CreateTempFilename(WatchdogProcess.OUTPUT_FILE_SUFFIX)
+
+        process = await self._create_subprocess_func(
+            '{} > "{}" 2>&1'.format(command_line, temp_filename),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            **ProcessTree.GetCreateKwargs()
+        )
+
+        timeout_message = None
+
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+
+        except asyncio.TimeoutError:
+            timeout_message = "'{}' did not complete within {} seconds; the process was terminated.\n".format(command_line, timeout)
+
+        finally:
+            await _Terminate(process)
+
+        output = ""
+
+        if os.path.isfile(temp_filename):
+            with open(temp_filename) as f:
+                output = f.read()
+
+            # The file may still be in use; removal is deferred if necessary
+            WatchdogProcess.RemoveFile(temp_filename)
+
+        if timeout_message is not None:
+            return WatchdogProcess.TIMEOUT_RESULT, output + timeout_message
+
+        return process.returncode, output
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetCoverageFilename(binary_filename):
+    return "{}.coverage".format(binary_filename)
+
+
+# ----------------------------------------------------------------------
+async def _Terminate(process):
+    """Kills the process and its descendants if it is still running (for example, when the task was cancelled)"""
+
+    if process.returncode is not None:
+        return
+
+    ProcessTree.Kill(process)
+    await process.wait()
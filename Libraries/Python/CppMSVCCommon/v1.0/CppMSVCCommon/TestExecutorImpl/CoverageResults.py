@@ -0,0 +1,197 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageResults.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 10:41:05
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains the CoverageResults and MethodCoverage objects"""
+
+import os
+import sys
+
+from array import array
+from collections import namedtuple
+
+import CommonEnvironment
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Counter columns, in the order that they are written by CoverageToCsv.ps1
+COLUMN_NAMES                                = (
+    "LinesCovered",
+    "LinesPartiallyCovered",
+    "LinesNotCovered",
+    "BlocksCovered",
+    "BlocksNotCovered",
+)
+
+# Indexes of values within rows written by CoverageToCsv.ps1. Namespace, class and source
+# file names were added after the counters so that the counters remain at fixed positions;
+# rows written by earlier versions of the script don't have them.
+ROW_MODULE_INDEX                            = 0
+ROW_NAME_INDEX                              = 1
+ROW_COUNTERS_INDEX                          = 2
+ROW_BLOCKS_COVERED_INDEX                    = ROW_COUNTERS_INDEX + COLUMN_NAMES.index("BlocksCovered")
+ROW_BLOCKS_NOT_COVERED_INDEX                = ROW_COUNTERS_INDEX + COLUMN_NAMES.index("BlocksNotCovered")
+ROW_NAMESPACE_INDEX                         = ROW_COUNTERS_INDEX + len(COLUMN_NAMES)
+ROW_CLASS_INDEX                             = ROW_NAMESPACE_INDEX + 1
+ROW_SOURCE_FILE_INDEX                       = ROW_CLASS_INDEX + 1
+
+UNITS                                       = ("blocks", "lines")
+
+# Keys used to identify the same method across results (see CreateKey, CoverageMerge and
+# CoverageDiff). The scope of a method is its module, namespace, class and name:
+#
+#   - Rows with the same scope within one set of results (for example, overloads, which
+#     share a name) are summed.
+#   - The same method in different sets of results (or in different modules, when methods
+#     are identified by KEY_NAME) is combined by taking the maximum of its counters, as
+#     summing them would count the same blocks multiple times.
+#
+KEY_NAME                                    = "name"                # namespace, class and name
+KEY_MODULE_AND_NAME                         = "module_and_name"     # module, namespace, class and name
+
+KEYS                                        = (KEY_NAME, KEY_MODULE_AND_NAME)
+
+# ----------------------------------------------------------------------
+MethodCoverage                              = namedtuple("MethodCoverage", ("Module", "Name") + COLUMN_NAMES + ("Namespace", "Class", "SourceFile"))
+
+
+# ----------------------------------------------------------------------
+class CoverageResults(object):
+    """\
+    Per-method coverage information.
+
+    Module, namespace, class, source file and method names are interned and
+    counters are stored in array-backed columns (one per value in COLUMN_NAMES),
+    which keeps the memory footprint small for binaries with hundreds of thousands
+    of methods. Namespace, class and source file names are empty strings when they
+    aren't known.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        self.Modules                        = []
+        self.Names                          = []
+        self.Namespaces                     = []
+        self.Classes                        = []
+        self.SourceFiles                    = []
+        self.Columns                        = {column_name: array("q") for column_name in COLUMN_NAMES}
+
+        self._columns                       = [self.Columns[column_name] for column_name in COLUMN_NAMES]
+
+    # ----------------------------------------------------------------------
+    def __len__(self):
+        return len(self.Names)
+
+    # ----------------------------------------------------------------------
+    def __iter__(self):
+        for index in range(len(self.Names)):
+            yield self[index]
+
+    # ----------------------------------------------------------------------
+    def __getitem__(self, index):
+        return MethodCoverage(
+            self.Modules[index],
+            self.Names[index],
+            *([column[index] for column in self._columns] + [self.Namespaces[index], self.Classes[index], self.SourceFiles[index]])
+        )
+
+    # ----------------------------------------------------------------------
+    def Append(self, module, name, counts, namespace="", class_name="", source_file=""):
+        """Appends a method; `counts` are ordered according to COLUMN_NAMES"""
+
+        assert len(counts) == len(self._columns), counts
+
+        self.Modules.append(sys.intern(module))
+        self.Names.append(sys.intern(name))
+        self.Namespaces.append(sys.intern(namespace))
+        self.Classes.append(sys.intern(class_name))
+        self.SourceFiles.append(sys.intern(source_file))
+
+        for column, count in zip(self._columns, counts):
+            column.append(count)
+
+    # ----------------------------------------------------------------------
+    def AppendRow(self, row):
+        """Appends a row as written by CoverageToCsv.ps1"""
+
+        self.Append(
+            row[ROW_MODULE_INDEX],
+            row[ROW_NAME_INDEX],
+            [int(value) for value in row[ROW_COUNTERS_INDEX:ROW_COUNTERS_INDEX + len(COLUMN_NAMES)]],
+            row[ROW_NAMESPACE_INDEX] if len(row) > ROW_NAMESPACE_INDEX else "",
+            row[ROW_CLASS_INDEX] if len(row) > ROW_CLASS_INDEX else "",
+            row[ROW_SOURCE_FILE_INDEX] if len(row) > ROW_SOURCE_FILE_INDEX else "",
+        )
+
+    # ----------------------------------------------------------------------
+    def Totals(self, units="blocks"):
+        """Returns (covered, not_covered) for the specified units"""
+
+        if units == "blocks":
+            return (
+                sum(self.Columns["BlocksCovered"]),
+                sum(self.Columns["BlocksNotCovered"]),
+            )
+
+        if units == "lines":
+            # Partially covered lines are not considered to be covered (this is consistent
+            # with the line coverage percentages reported by Visual Studio).
+            return (
+                sum(self.Columns["LinesCovered"]),
+                sum(self.Columns["LinesPartiallyCovered"]) + sum(self.Columns["LinesNotCovered"]),
+            )
+
+        raise Exception("'{}' is not a valid unit ({})".format(units, ", ".join(UNITS)))
+
+    # ----------------------------------------------------------------------
+    def MethodTotals(self, units="blocks"):
+        """Yields (module, name, covered, not_covered) for each method"""
+
+        if units == "blocks":
+            for values in zip(
+                self.Modules,
+                self.Names,
+                self.Columns["BlocksCovered"],
+                self.Columns["BlocksNotCovered"],
+            ):
+                yield values
+
+        elif units == "lines":
+            for module, name, covered, partially_covered, not_covered in zip(
+                self.Modules,
+                self.Names,
+                self.Columns["LinesCovered"],
+                self.Columns["LinesPartiallyCovered"],
+                self.Columns["LinesNotCovered"],
+            ):
+                yield module, name, covered, partially_covered + not_covered
+
+        else:
+            raise Exception("'{}' is not a valid unit ({})".format(units, ", ".join(UNITS)))
+
+
+# ----------------------------------------------------------------------
+def CreateKey(key, module, namespace, class_name, name):
+    """Returns the value that identifies a method across results (see KEYS)"""
+
+    if key == KEY_NAME:
+        return namespace, class_name, name
+
+    if key == KEY_MODULE_AND_NAME:
+        return module, namespace, class_name, name
+
+    raise Exception("'{}' is not a valid key ({})".format(key, ", ".join(KEYS)))
@@ -0,0 +1,219 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageSession.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 13:48:52
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains the CoverageSession object and functionality to start and stop the coverage monitor"""
+
+import io
+import os
+
+from collections import namedtuple
+
+import CommonEnvironment
+from CommonEnvironment import Process
+
+from CppMSVCCommon.TestExecutorImpl import Timing
+from CppMSVCCommon.TestExecutorImpl import WatchdogProcess
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Set these environment variables to replace the VSPerfCmd invocations with different
+# commands (for example, stand-in scripts when running on Linux). The start command is
+# a template populated with `{coverage}`.
+START_COMMAND_LINE_TEMPLATE_ENV_VAR         = "CPP_MSVC_COMMON_COVERAGE_START_COMMAND"
+STOP_COMMAND_LINE_ENV_VAR                   = "CPP_MSVC_COMMON_COVERAGE_STOP_COMMAND"
+
+DEFAULT_START_COMMAND_LINE_TEMPLATE         = 'VSPerfCmd.exe /WAITSTART /START:COVERAGE "/OUTPUT:{coverage}"'
+DEFAULT_STOP_COMMAND_LINE                   = "VSPerfCmd.exe /SHUTDOWN"
+
+# Optional environment variables that override the number of seconds that starting or
+# stopping the monitor may take before VSPerfCmd is killed (0 disables the timeout).
+START_TIMEOUT_ENV_VAR                       = "CPP_MSVC_COMMON_COVERAGE_START_TIMEOUT"
+STOP_TIMEOUT_ENV_VAR                        = "CPP_MSVC_COMMON_COVERAGE_STOP_TIMEOUT"
+
+DEFAULT_START_TIMEOUT                       = 120
+DEFAULT_STOP_TIMEOUT                        = 120
+
+
+# ----------------------------------------------------------------------
+SessionRun                                  = namedtuple("SessionRun", ["BinaryFilename", "Result", "Output"])
+
+
+# ----------------------------------------------------------------------
+class CoverageSession(object):
+    """\
+    Starts the coverage monitor once, runs any number of binaries while it is active,
+    and stops the monitor once upon exit.
+
+    Usage:
+
+        with CoverageSession("code.coverage", output_stream) as session:
+            session.Run("Test1.exe")
+            session.Run("Test2.exe")
+
+        results = CodeCoverageExecutor.ExtractSessionCoverageInfo(session, includes, excludes, output_stream)
+
+    Coverage data for all binaries is written to a single coverage file; the data for
+    each binary is identified by its module name (the binary's basename).
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        coverage_filename,
+        output_stream,
+        start_command_line_template=None,
+        stop_command_line=None,
+    ):
+        self.CoverageFilename               = coverage_filename
+        self.Runs                           = []
+
+        self._output_stream                 = output_stream
+        self._start_command_line_template   = start_command_line_template
+        self._stop_command_line             = stop_command_line
+
+        self._module_names                  = {}
+        self._is_active                     = False
+
+    # ----------------------------------------------------------------------
+    def __enter__(self):
+        # Shutdown any existing monitors
+        StopMonitor(self._output_stream, self._stop_command_line)
+
+        result = StartMonitor(
+            self.CoverageFilename,
+            self._output_stream,
+            self._start_command_line_template,
+        )
+        if result != 0:
+            raise Exception("The coverage monitor could not be started ({})".format(result))
+
+        self._is_active = True
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._is_active = False
+
+        result = StopMonitor(self._output_stream, self._stop_command_line)
+
+        if result != 0 and exc_type is None:
+            raise Exception("The coverage monitor could not be stopped ({})".format(result))
+
+    # ----------------------------------------------------------------------
+    @property
+    def BinaryFilenames(self):
+        return [run.BinaryFilename for run in self.Runs]
+
+    # ----------------------------------------------------------------------
+    def Run(self, binary_filename, command_line=None):
+        """Runs the binary (or `command_line`, if provided) under the monitor; returns the result code"""
+
+        if not self._is_active:
+            raise Exception("The coverage session is not active")
+
+        module_name = os.path.normcase(os.path.basename(binary_filename))
+        existing_binary_filename = self._module_names.setdefault(module_name, binary_filename)
+
+        if existing_binary_filename != binary_filename:
+            raise Exception(
+                "'{}' and '{}' have the same module name and can't be distinguished within a session".format(
+                    existing_binary_filename,
+                    binary_filename,
+                ),
+            )
+
+        sink = io.StringIO()
+
+        with Timing.Phase("Run", binary_filename) as phase:
+            result = Process.Execute(command_line or '"{}"'.format(binary_filename), sink)
+            phase.SetResult(result)
+
+        output = sink.getvalue()
+        self._output_stream.write(output)
+
+        self.Runs.append(SessionRun(binary_filename, result, output))
+
+        return result
+
+
+# ----------------------------------------------------------------------
+def StartMonitor(
+    coverage_filename,
+    output_stream,
+    start_command_line_template=None,
+    timeout=None,
+):
+    """\
+    Starts the coverage monitor; returns a result code (WatchdogProcess.TIMEOUT_RESULT
+    if VSPerfCmd didn't complete within the timeout).
+    """
+
+    start_command_line_template = (
+        start_command_line_template
+        or os.getenv(START_COMMAND_LINE_TEMPLATE_ENV_VAR)
+        or DEFAULT_START_COMMAND_LINE_TEMPLATE
+    )
+
+    with Timing.Phase("StartCoverage") as phase:
+        # VSPerfCmd doesn't send an EOF before terminating during startup, so its output
+        # can't be read through pipes (see WatchdogProcess).
+        result, _ = WatchdogProcess.Execute(
+            start_command_line_template.format(
+                coverage=coverage_filename,
+            ),
+            output_stream,
+            timeout=_GetTimeout(timeout, START_TIMEOUT_ENV_VAR, DEFAULT_START_TIMEOUT),
+        )
+        phase.SetResult(result)
+
+    return result
+
+
+# ----------------------------------------------------------------------
+def StopMonitor(
+    output_stream,
+    stop_command_line=None,
+    timeout=None,
+):
+    """\
+    Stops the coverage monitor; returns a result code (WatchdogProcess.TIMEOUT_RESULT
+    if VSPerfCmd didn't complete within the timeout).
+    """
+
+    with Timing.Phase("StopCoverage") as phase:
+        result, _ = WatchdogProcess.Execute(
+            stop_command_line
+            or os.getenv(STOP_COMMAND_LINE_ENV_VAR)
+            or DEFAULT_STOP_COMMAND_LINE,
+            output_stream,
+            timeout=_GetTimeout(timeout, STOP_TIMEOUT_ENV_VAR, DEFAULT_STOP_TIMEOUT),
+        )
+        phase.SetResult(result)
+
+    return result
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetTimeout(timeout, env_var, default_value):
+    if timeout is None:
+        value = os.getenv(env_var)
+        timeout = float(value) if value else default_value
+
+    return timeout or None
@@ -0,0 +1,280 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageShards.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 20:14:36
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Parses a single (large) CSV file written by CoverageToCsv.ps1 in parallel.
+
+The file is memory-mapped and divided into byte ranges that each begin at the
+start of a record. Method names are quoted and may contain commas (and, in
+theory, quotes and newlines), so a newline only ends a record when an even
+number of quote characters precede it; escaped quotes ("") don't change the
+parity. Counting quotes is a single pass over the file in C, which is much
+less expensive than parsing it.
+
+Each shard is filtered and summed on a process pool and the partial counters
+are reduced in order, so the results are identical to those produced when
+parsing the converter's output sequentially. Each shard is timed as a
+"ParseShard" phase, which is reported to the parent process' sink.
+"""
+
+import csv
+import io
+import locale
+import math
+import mmap
+import os
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import CommonEnvironment
+
+from CppMSVCCommon.TestExecutorImpl.CoverageResults import ROW_NAME_INDEX, ROW_BLOCKS_COVERED_INDEX, ROW_BLOCKS_NOT_COVERED_INDEX
+from CppMSVCCommon.TestExecutorImpl.PatternMatcher import PatternMatcher
+from CppMSVCCommon.TestExecutorImpl import Timing
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Set this environment variable to the number of worker processes used to parse the
+# converter's output within CodeCoverageExecutor.ExtractCoverageInfo (the output is
+# written to a temporary file rather than streamed when this value is set). It is
+# ignored while the source coverage index is enabled, as the index requires per-method
+# results.
+WORKERS_ENV_VAR                             = "CPP_MSVC_COMMON_COVERAGE_SHARD_WORKERS"
+
+# Shards smaller than this aren't worth the cost of sending them to another process
+MIN_SHARD_SIZE                              = 4 * 1024 * 1024
+
+_QUOTE_COUNT_CHUNK_SIZE                     = 16 * 1024 * 1024
+
+# ----------------------------------------------------------------------
+ShardResult                                 = namedtuple(
+    "ShardResult",
+    [
+        "NumRows",
+        "NumIncluded",
+        "Covered",                          # Blocks covered by included rows
+        "NotCovered",                       # Blocks not covered by included rows
+        "Error",                            # Error written by the converter (or None)
+    ],
+)
+
+
+# ----------------------------------------------------------------------
+def GetDefaultWorkers():
+    """Returns the number of workers configured via the environment variable (or None if sharding is disabled)"""
+
+    value = os.getenv(WORKERS_ENV_VAR)
+    if not value:
+        return None
+
+    value = int(value)
+    if value < 1:
+        return None
+
+    return value
+
+
+# ----------------------------------------------------------------------
+def CreateShards(filename, num_shards):
+    """\
+    Returns up to `num_shards` (start, end) byte ranges that cover the file, where
+    each range begins at the start of a record.
+    """
+
+    size = os.path.getsize(filename)
+    if size == 0:
+        return []
+
+    shard_size = max(MIN_SHARD_SIZE, int(math.ceil(size / float(num_shards or 1))))
+    if shard_size >= size:
+        return [(0, size)]
+
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            starts = [0]
+
+            position = 0
+            num_quotes = 0
+
+            while True:
+                target = starts[-1] + shard_size
+                if target >= size:
+                    break
+
+                num_quotes += _CountQuotes(mm, position, target)
+                position = target
+
+                # Move to the byte after the next newline that isn't within a quoted value
+                while True:
+                    newline = mm.find(b"\n", position)
+                    if newline == -1:
+                        position = size
+                        break
+
+                    num_quotes += _CountQuotes(mm, position, newline)
+                    position = newline + 1
+
+                    if num_quotes % 2 == 0:
+                        break
+
+                if position >= size:
+                    break
+
+                starts.append(position)
+
+    return list(zip(starts, starts[1:] + [size]))
+
+
+# ----------------------------------------------------------------------
+def ParseShard(filename, start, end, includes, excludes, binary_filename=None):
+    """Returns a ShardResult for the rows within the byte range"""
+
+    with Timing.Phase("ParseShard", binary_filename) as phase:
+        result = _ParseShard(filename, start, end, includes, excludes)
+
+        phase.SetCounter("rows_parsed", result.NumRows)
+        phase.SetCounter("rows_filtered", result.NumRows - result.NumIncluded)
+        phase.SetCounter("bytes_read", end - start)
+
+        if result.Error is not None:
+            phase.SetResult(-1)
+
+    return result
+
+
+# ----------------------------------------------------------------------
+def ParseFile(filename, includes, excludes, max_workers=None, binary_filename=None):
+    """\
+    Parses the file in shards on a process pool and returns the reduced ShardResult.
+
+    When a shard contains an error, the result includes the counters of all rows
+    that precede the error and the error itself.
+    """
+
+    max_workers = max_workers or os.cpu_count() or 1
+
+    shards = CreateShards(filename, max_workers)
+
+    if max_workers == 1 or len(shards) < 2:
+        shard_results = (
+            ParseShard(filename, start, end, includes, excludes, binary_filename)
+            for start, end in shards
+        )
+
+        return _Reduce(shard_results)
+
+    is_timing_enabled = Timing.IsEnabled()
+
+    with ProcessPoolExecutor(min(max_workers, len(shards))) as executor:
+        futures = [
+            executor.submit(
+                Timing.CollectPhases,
+                is_timing_enabled,
+                ParseShard,
+                filename,
+                start,
+                end,
+                includes,
+                excludes,
+                binary_filename,
+            )
+            for start, end in shards
+        ]
+
+        shard_results = []
+
+        for future in futures:
+            shard_result, phases = future.result()
+
+            Timing.Replay(phases)
+            shard_results.append(shard_result)
+
+    return _Reduce(shard_results)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _ParseShard(filename, start, end, includes, excludes):
+    should_include_func = PatternMatcher(includes, excludes)
+
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Decode in the same way as the converter output is decoded when streamed
+            # (see CoverageConverter.EnumRows): with the preferred encoding and universal
+            # newlines.
+            content = io.StringIO(
+                mm[start:end].decode(locale.getpreferredencoding(False)),
+                newline=None,
+            )
+
+    num_rows = 0
+    num_included = 0
+    covered = 0
+    not_covered = 0
+
+    for row in csv.reader(content):
+        if not row:
+            continue
+
+        if len(row) == 1:
+            return ShardResult(num_rows, num_included, covered, not_covered, row[0])
+
+        num_rows += 1
+
+        if should_include_func(row[ROW_NAME_INDEX]):
+            num_included += 1
+
+            covered += int(row[ROW_BLOCKS_COVERED_INDEX])
+            not_covered += int(row[ROW_BLOCKS_NOT_COVERED_INDEX])
+
+    return ShardResult(num_rows, num_included, covered, not_covered, None)
+
+
+# ----------------------------------------------------------------------
+def _CountQuotes(mm, start, end):
+    num_quotes = 0
+
+    while start < end:
+        chunk_end = min(end, start + _QUOTE_COUNT_CHUNK_SIZE)
+
+        num_quotes += mm[start:chunk_end].count(b'"')
+        start = chunk_end
+
+    return num_quotes
+
+
+# ----------------------------------------------------------------------
+def _Reduce(shard_results):
+    num_rows = 0
+    num_included = 0
+    covered = 0
+    not_covered = 0
+
+    for shard_result in shard_results:
+        num_rows += shard_result.NumRows
+        num_included += shard_result.NumIncluded
+        covered += shard_result.Covered
+        not_covered += shard_result.NotCovered
+
+        if shard_result.Error is not None:
+            # Rows after the error would not have been parsed sequentially
+            return ShardResult(num_rows, num_included, covered, not_covered, shard_result.Error)
+
+    return ShardResult(num_rows, num_included, covered, not_covered, None)
@@ -1,33 +1,112 @@
+# Each row is written as:
+#
+#   "<module>","<method>",<lines covered>,<lines partially covered>,<lines not covered>,<blocks covered>,<blocks not covered>,"<namespace>","<class>","<source file>"
+#
+# The source file is the file that contains the method's first line (or empty if the
+# method doesn't have line information).
+#
 # Usage
-#   %SystemRoot%\syswow64\WindowsPowerShell\v1.0\powershell.exe -ExecutionPolicy Bypass -NoProfile -File CoverageToCsv.ps1
+#   %SystemRoot%\syswow64\WindowsPowerShell\v1.0\powershell.exe -ExecutionPolicy Bypass -NoProfile -File CoverageToCsv.ps1 <coverage_filename> [<module_name>]
+#   %SystemRoot%\syswow64\WindowsPowerShell\v1.0\powershell.exe -ExecutionPolicy Bypass -NoProfile -File CoverageToCsv.ps1 -batch_filename <batch_filename>
+#
+# Batch files contain one job per line in the form "<coverage_filename>`t<module_name>". The
+# output for each job is framed so that it can be split by the caller:
+#
+#   ##CoverageToCsv-begin,<job_index>
+#   <rows>
+#   ##CoverageToCsv-end,<job_index>
+#
+# If a job fails, the end frame is replaced by:
+#
+#   ##CoverageToCsv-error,<job_index>,"<message>"
 
 param(
-    [Parameter(Mandatory=$true)]
     [string]
     $coverage_filename,
     [string]
-    $module_name
+    $module_name,
+    [string]
+    $batch_filename
 )
-    $coverage_filename = Resolve-Path -Path "$coverage_filename"
-    $coverage_dirname = Split-Path -Path "$coverage_filename" -Parent
-    
-    Add-Type -Path "${env:DevEnvDir}Extensions\TestPlatform\Microsoft.VisualStudio.Coverage.Analysis.dll"
+    function WriteCoverage([string] $coverage_filename, [string] $module_name) {
+        $coverage_filename = Resolve-Path -Path "$coverage_filename"
+        $coverage_dirname = Split-Path -Path "$coverage_filename" -Parent
+
+        $executable_paths = New-Object "System.Collections.Generic.List[String]"
+        $symbol_paths = New-Object "System.Collections.Generic.List[String]"
+        $symbol_paths.Add($coverage_dirname)
+
+        $ci = [Microsoft.VisualStudio.Coverage.Analysis.CoverageInfo]::CreateFromFile($coverage_filename, $executable_paths, $symbol_paths)
+        $data = $ci.BuildDataSet()
+
+        $source_files = @{}
+
+        ForEach($source_file in $data.SourceFileNames) {
+            $source_files[$source_file.SourceFileID] = $source_file.SourceFileName -replace '"', '""'
+        }
 
-    $executable_paths = New-Object "System.Collections.Generic.List[String]"
-    $symbol_paths = New-Object "System.Collections.Generic.List[String]"
-    $symbol_paths.Add($coverage_dirname)
+        ForEach($module in $data.Module) {
+            if(!$module_name -or $module_name -eq $module.ModuleName) {
+                # Embedded quotes are escaped in every quoted column so that rows (and the record
+                # boundaries used when parsing in shards) remain valid CSV.
+                $escaped_module_name = $module.ModuleName -replace '"', '""'
 
-    $ci = [Microsoft.VisualStudio.Coverage.Analysis.CoverageInfo]::CreateFromFile($coverage_filename, $executable_paths, $symbol_paths)
-    $data = $ci.BuildDataSet()
+                ForEach($namespace in $module.GetNamespaceTableRows()) {
+                    $namespace_name = $namespace.NamespaceName -replace '"', '""'
 
-    ForEach($module in $data.Module) {
-        if(!$module_name -or $module_name -eq $module.ModuleName) {
-            ForEach($namespace in $module.GetNamespaceTableRows()) {
-                ForEach($class in $namespace.GetClassRows()) {
-                    ForEach($method in $class.GetMethodRows()) {
-                        Write-Host "`"$module_name`",`"$($method.MethodName)`",$($method.LinesCovered),$($method.LinesPartiallyCovered),$($method.LinesNotCovered),$($method.BlocksCovered),$($method.BlocksNotCovered)"
+                    ForEach($class in $namespace.GetClassRows()) {
+                        $class_name = $class.ClassName -replace '"', '""'
+
+                        ForEach($method in $class.GetMethodRows()) {
+                            $method_name = $method.MethodName -replace '"', '""'
+                            $source_file_name = ""
+
+                            ForEach($line in $method.GetLinesRows()) {
+                                $source_file_name = $source_files[$line.SourceFileID]
+                                break
+                            }
+
+                            Write-Host "`"$escaped_module_name`",`"$method_name`",$($method.LinesCovered),$($method.LinesPartiallyCovered),$($method.LinesNotCovered),$($method.BlocksCovered),$($method.BlocksNotCovered),`"$namespace_name`",`"$class_name`",`"$source_file_name`""
+                        }
                     }
                 }
             }
         }
     }
+
+    Add-Type -Path "${env:DevEnvDir}Extensions\TestPlatform\Microsoft.VisualStudio.Coverage.Analysis.dll"
+
+    if($batch_filename) {
+        # Errors must be terminating so that they are reported for the job that caused them
+        $ErrorActionPreference = "Stop"
+
+        $job_index = 0
+
+        ForEach($line in Get-Content -Path "$batch_filename") {
+            if(!$line) {
+                continue
+            }
+
+            $parts = $line.Split("`t")
+
+            Write-Host "##CoverageToCsv-begin,$job_index"
+
+            try {
+                WriteCoverage $parts[0] $parts[1]
+                Write-Host "##CoverageToCsv-end,$job_index"
+            }
+            catch {
+                $message = $_.Exception.Message -replace '"', '""'
+                Write-Host "##CoverageToCsv-error,$job_index,`"$message`""
+            }
+
+            $job_index += 1
+        }
+    }
+    else {
+        if(!$coverage_filename) {
+            throw "A coverage filename or batch filename must be provided"
+        }
+
+        WriteCoverage $coverage_filename $module_name
+    }
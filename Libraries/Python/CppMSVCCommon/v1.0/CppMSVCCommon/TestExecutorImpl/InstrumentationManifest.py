@@ -0,0 +1,273 @@
+# ----------------------------------------------------------------------
+# |
+# |  InstrumentationManifest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 13:07:26
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Instruments binaries for code coverage, skipping those that are already instrumented"""
+
+import hashlib
+import io
+import json
+import os
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import CommonEnvironment
+from CommonEnvironment import FileSystem
+from CommonEnvironment import Process
+
+from CppMSVCCommon.TestExecutorImpl import Timing
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Set this environment variable to replace the vsinstr invocation with a different
+# command (for example, a stand-in tool when running on Linux). The value is a template
+# populated with `{binary}`.
+COMMAND_LINE_TEMPLATE_ENV_VAR               = "CPP_MSVC_COMMON_INSTRUMENT_COMMAND"
+
+DEFAULT_COMMAND_LINE_TEMPLATE               = 'vsinstr "{binary}" /COVERAGE'
+
+MANIFEST_EXTENSION                          = ".instrumented"
+
+# Increment this value when the format of the manifest changes
+_FORMAT_VERSION                             = 1
+
+
+# ----------------------------------------------------------------------
+PendingInstrumentation                      = namedtuple("PendingInstrumentation", ["CommandLine", "OriginalInfo"])
+
+
+# ----------------------------------------------------------------------
+def GetManifestFilename(binary_filename):
+    return "{}{}".format(binary_filename, MANIFEST_EXTENSION)
+
+
+# ----------------------------------------------------------------------
+def IsInstrumented(
+    binary_filename,
+    command_line_template=None,
+):
+    """\
+    Returns True if the binary was instrumented by InstrumentBinary and neither
+    the instrumented binary nor the original binary have changed since then.
+    """
+
+    command_line = _CreateCommandLine(binary_filename, command_line_template)
+
+    try:
+        with open(GetManifestFilename(binary_filename)) as f:
+            manifest = json.load(f)
+
+        if (
+            manifest["version"] != _FORMAT_VERSION
+            or manifest["command_line"] != command_line
+        ):
+            return False
+
+        return (
+            _IsUnchanged(binary_filename, manifest["instrumented"])
+            and _IsUnchanged(_GetOriginalFilename(binary_filename), manifest["original"])
+        )
+
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return False
+
+
+# ----------------------------------------------------------------------
+def InstrumentBinary(
+    binary_filename,
+    output_stream,
+    command_line_template=None,
+):
+    """Instruments the binary if necessary; returns a result code"""
+
+    with Timing.Phase("PreprocessBinary", binary_filename) as phase:
+        result = _InstrumentBinaryImpl(binary_filename, output_stream, command_line_template, phase)
+        phase.SetResult(result)
+
+    return result
+
+
+# ----------------------------------------------------------------------
+def PrepareInstrumentation(
+    binary_filename,
+    command_line_template=None,
+):
+    """\
+    Returns a PendingInstrumentation object with the command line that instruments
+    the binary, or None if the binary is already instrumented.
+
+    Use this function and CompleteInstrumentation when the command line is invoked
+    by the caller (InstrumentBinary invokes it synchronously).
+    """
+
+    if IsInstrumented(binary_filename, command_line_template):
+        return None
+
+    FileSystem.RemoveFile(GetManifestFilename(binary_filename))
+    FileSystem.RemoveFile(_GetOriginalFilename(binary_filename))
+
+    return PendingInstrumentation(
+        _CreateCommandLine(binary_filename, command_line_template),
+        _CreateFileInfo(binary_filename),
+    )
+
+
+# ----------------------------------------------------------------------
+def CompleteInstrumentation(binary_filename, pending):
+    """Writes the manifest once the command line returned by PrepareInstrumentation has succeeded"""
+
+    original_filename = _GetOriginalFilename(binary_filename)
+
+    if not os.path.isfile(original_filename):
+        # The manifest can't be validated without the original binary
+        return
+
+    # The original binary is renamed by vsinstr, so its modification time may have been
+    # updated; record its current state (the content has already been hashed).
+    original_info = _CreateFileInfo(original_filename, content_hash=pending.OriginalInfo["hash"])
+
+    with open(GetManifestFilename(binary_filename), "w") as f:
+        json.dump(
+            {
+                "version": _FORMAT_VERSION,
+                "command_line": pending.CommandLine,
+                "original": original_info,
+                "instrumented": _CreateFileInfo(binary_filename),
+            },
+            f,
+        )
+
+
+# ----------------------------------------------------------------------
+def InstrumentBinaries(
+    binary_filenames,
+    output_stream,
+    max_workers=None,
+    command_line_template=None,
+):
+    """\
+    Instruments multiple binaries concurrently.
+
+    Returns a result code for each binary (in the same order as `binary_filenames`);
+    output for each binary is written to `output_stream` in order.
+    """
+
+    binary_filenames = list(binary_filenames)
+
+    # ----------------------------------------------------------------------
+    def Impl(binary_filename):
+        sink = io.StringIO()
+
+        try:
+            result = InstrumentBinary(binary_filename, sink, command_line_template)
+        except Exception as ex:
+            sink.write("{}\n".format(ex))
+            result = -1
+
+        return result, sink.getvalue()
+
+    # ----------------------------------------------------------------------
+
+    with ThreadPoolExecutor(max_workers or os.cpu_count() or 1) as executor:
+        results = list(executor.map(Impl, binary_filenames))
+
+    for _, output in results:
+        output_stream.write(output)
+
+    return [result for result, _ in results]
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _InstrumentBinaryImpl(binary_filename, output_stream, command_line_template, phase):
+    pending = PrepareInstrumentation(binary_filename, command_line_template)
+
+    if pending is None:
+        output_stream.write("'{}' is already instrumented.\n".format(binary_filename))
+
+        phase.SetCounter("skipped", 1)
+        return 0
+
+    phase.SetCounter("skipped", 0)
+
+    result = Process.Execute(pending.CommandLine, output_stream)
+    if result != 0:
+        return result
+
+    CompleteInstrumentation(binary_filename, pending)
+
+    return 0
+
+
+# ----------------------------------------------------------------------
+def _CreateCommandLine(binary_filename, command_line_template):
+    command_line_template = (
+        command_line_template
+        or os.getenv(COMMAND_LINE_TEMPLATE_ENV_VAR)
+        or DEFAULT_COMMAND_LINE_TEMPLATE
+    )
+
+    return command_line_template.format(
+        binary=binary_filename,
+    )
+
+
+# ----------------------------------------------------------------------
+def _GetOriginalFilename(binary_filename):
+    return "{}.orig".format(binary_filename)
+
+
+# ----------------------------------------------------------------------
+def _CreateFileInfo(filename, content_hash=None):
+    stat = os.stat(filename)
+
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": content_hash or _HashFile(filename),
+    }
+
+
+# ----------------------------------------------------------------------
+def _IsUnchanged(filename, file_info):
+    stat = os.stat(filename)
+
+    if stat.st_size != file_info["size"]:
+        return False
+
+    # Avoid hashing when the file hasn't been touched
+    if stat.st_mtime_ns == file_info["mtime_ns"]:
+        return True
+
+    return _HashFile(filename) == file_info["hash"]
+
+
+# ----------------------------------------------------------------------
+def _HashFile(filename):
+    hasher = hashlib.sha256()
+
+    with open(filename, "rb") as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                break
+
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
@@ -0,0 +1,125 @@
+# ----------------------------------------------------------------------
+# |
+# |  PatternMatcher.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 09:12:41
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains the PatternMatcher object"""
+
+import fnmatch
+import functools
+import os
+import re
+
+import CommonEnvironment
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# ----------------------------------------------------------------------
+class PatternMatcher(object):
+    """\
+    Determines if a method name should be included based on include and exclude
+    glob patterns.
+
+    All include patterns are compiled into a single regular expression (as are all
+    exclude patterns), and decisions are cached per distinct method name. Results
+    are identical to those produced by invoking `fnmatch.fnmatch` for each pattern.
+    """
+
+    DEFAULT_CACHE_SIZE                      = 64 * 1024
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        includes,
+        excludes,
+        cache_size=DEFAULT_CACHE_SIZE,
+    ):
+        self.Includes                       = tuple(includes or [])
+        self.Excludes                       = tuple(excludes or [])
+
+        include_regex = _Compile(self.Includes)
+        exclude_regex = _Compile(self.Excludes)
+
+        normcase = os.path.normcase
+
+        if include_regex is None and exclude_regex is None:
+            # ----------------------------------------------------------------------
+            def ShouldInclude(method_name):
+                return True
+
+            # ----------------------------------------------------------------------
+
+        elif include_regex is None:
+            exclude_match = exclude_regex.match
+
+            # ----------------------------------------------------------------------
+            def ShouldInclude(method_name):
+                return exclude_match(normcase(method_name)) is None
+
+            # ----------------------------------------------------------------------
+
+        elif exclude_regex is None:
+            include_match = include_regex.match
+
+            # ----------------------------------------------------------------------
+            def ShouldInclude(method_name):
+                return include_match(normcase(method_name)) is not None
+
+            # ----------------------------------------------------------------------
+
+        else:
+            include_match = include_regex.match
+            exclude_match = exclude_regex.match
+
+            # ----------------------------------------------------------------------
+            def ShouldInclude(method_name):
+                method_name = normcase(method_name)
+                return exclude_match(method_name) is None and include_match(method_name) is not None
+
+            # ----------------------------------------------------------------------
+
+        if (include_regex is not None or exclude_regex is not None) and cache_size:
+            ShouldInclude = functools.lru_cache(cache_size)(ShouldInclude)
+
+        self._should_include_func           = ShouldInclude
+
+    # ----------------------------------------------------------------------
+    def __call__(self, method_name):
+        return self._should_include_func(method_name)
+
+    # ----------------------------------------------------------------------
+    @property
+    def IsPassthrough(self):
+        """True if the matcher includes everything"""
+        return not self.Includes and not self.Excludes
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Compile(patterns):
+    if not patterns:
+        return None
+
+    # `fnmatch.fnmatch` normalizes the case of both the name and the pattern
+    # (this is a no-op on case-sensitive file systems); do the same here so that
+    # results are consistent with the original implementation.
+    return re.compile(
+        "|".join(
+            "(?:{})".format(fnmatch.translate(os.path.normcase(pattern)))
+            for pattern in patterns
+        ),
+    )
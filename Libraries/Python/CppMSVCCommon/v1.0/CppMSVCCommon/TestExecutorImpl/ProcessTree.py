@@ -0,0 +1,72 @@
+# ----------------------------------------------------------------------
+# |
+# |  ProcessTree.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 18:58:40
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Terminates processes along with their descendants.
+
+Commands are invoked through a shell, so killing the process that was created
+only kills the shell; the command itself (and anything that it launched) keeps
+running and keeps the output pipes open.
+"""
+
+import os
+import signal
+import subprocess
+
+import CommonEnvironment
+from CommonEnvironment.Shell.All import CurrentShell
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# ----------------------------------------------------------------------
+def GetCreateKwargs():
+    """\
+    Returns keyword arguments for subprocess.Popen (or asyncio.create_subprocess_shell)
+    that create the process in its own process group so that Kill can terminate the
+    entire tree.
+    """
+
+    if CurrentShell.CategoryName == "Windows":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+
+    return {"start_new_session": True}
+
+
+# ----------------------------------------------------------------------
+def Kill(process):
+    """Kills the process (a subprocess.Popen or asyncio.subprocess.Process object) and its descendants"""
+
+    if CurrentShell.CategoryName == "Windows":
+        subprocess.call(
+            "taskkill /T /F /PID {}".format(process.pid),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    else:
+        try:
+            # The process is the leader of its process group when it was created with GetCreateKwargs
+            if os.getpgid(process.pid) == process.pid:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    try:
+        process.kill()
+    except (ProcessLookupError, OSError):
+        # The process has already exited
+        pass
@@ -0,0 +1,402 @@
+# ----------------------------------------------------------------------
+# |
+# |  Timing.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 16:55:30
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Phase-level timing for the code coverage pipeline.
+
+Phases (vsinstr, starting and stopping the monitor, conversion and parsing, etc.)
+are timed per binary and reported to a sink along with counters such as the
+number of rows parsed. When a sink hasn't been configured, `Phase` returns a
+shared no-op object, so the overhead is a single global lookup per phase.
+
+Sinks are configured per process. Functions that execute within process pool
+workers are invoked with `CollectPhases`, which returns the phases completed by
+the worker along with the function's result; the parent process reports them to
+its sink with `Replay`.
+
+Usage:
+
+    with Timing.UseSink(Timing.ChromeTraceSink("trace.json")):
+        ...
+
+    with Timing.Phase("MyPhase", binary_filename) as phase:
+        ...
+        phase.SetCounter("rows_parsed", num_rows)
+        phase.SetResult(result)
+
+    future = executor.submit(Timing.CollectPhases, Timing.IsEnabled(), MyFunc, arg1, arg2)
+
+    result, phases = future.result()
+    Timing.Replay(phases)
+"""
+
+import json
+import os
+import threading
+import time
+
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
+
+import CommonEnvironment
+from CommonEnvironment import Interface
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# ----------------------------------------------------------------------
+PhaseInfo                                   = namedtuple(
+    "PhaseInfo",
+    [
+        "Name",
+        "BinaryFilename",
+        "StartTime",                        # Seconds since the epoch
+        "Duration",                         # Seconds
+        "ProcessId",
+        "ThreadId",
+        "Succeeded",
+        "Counters",                         # OrderedDict
+    ],
+)
+
+
+# ----------------------------------------------------------------------
+class Sink(Interface.Interface):
+    """Receives information about completed phases"""
+
+    # ----------------------------------------------------------------------
+    @Interface.abstractmethod
+    def OnPhase(self, phase_info):
+        """Called when a phase completes; may be called from multiple threads"""
+        raise Exception("Abstract method")
+
+    # ----------------------------------------------------------------------
+    @Interface.abstractmethod
+    def Close(self):
+        """Called when the sink is no longer in use"""
+        raise Exception("Abstract method")
+
+
+# ----------------------------------------------------------------------
+_sink                                       = None
+
+
+# ----------------------------------------------------------------------
+def SetSink(sink):
+    """Sets the sink for the current process (or disables timing if None); returns the previous sink"""
+
+    global _sink
+
+    previous = _sink
+    _sink = sink
+
+    return previous
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def UseSink(sink):
+    """Uses the sink for the duration of the context and closes it upon exit"""
+
+    previous = SetSink(sink)
+
+    try:
+        yield sink
+    finally:
+        SetSink(previous)
+        sink.Close()
+
+
+# ----------------------------------------------------------------------
+def IsEnabled():
+    """Returns True if a sink has been configured for the current process"""
+
+    return _sink is not None
+
+
+# ----------------------------------------------------------------------
+def CollectPhases(is_enabled, func, *args, **kwargs):
+    """\
+    Invokes the function and returns (result, phases), where `phases` is a list of
+    PhaseInfo for the phases completed during the invocation (empty if `is_enabled`
+    is False). This function is intended to be invoked within process pool workers.
+    """
+
+    if not is_enabled:
+        return func(*args, **kwargs), []
+
+    sink = _CollectingSink()
+
+    previous = SetSink(sink)
+
+    try:
+        return func(*args, **kwargs), sink.Phases
+    finally:
+        SetSink(previous)
+
+
+# ----------------------------------------------------------------------
+def Replay(phases):
+    """Reports phases collected by CollectPhases to the sink for the current process"""
+
+    sink = _sink
+    if sink is None:
+        return
+
+    for phase_info in phases:
+        sink.OnPhase(phase_info)
+
+
+# ----------------------------------------------------------------------
+def Phase(name, binary_filename=None):
+    """Returns a context manager that times the phase"""
+
+    sink = _sink
+    if sink is None:
+        return _NULL_PHASE
+
+    return _Phase(sink, name, binary_filename)
+
+
+# ----------------------------------------------------------------------
+class ChromeTraceSink(Sink):
+    """\
+    Writes phases as Chrome trace events (viewable with chrome://tracing or
+    https://ui.perfetto.dev) when closed.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, output_filename):
+        self.OutputFilename                 = output_filename
+
+        self._events                        = []
+        self._lock                          = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    @Interface.override
+    def OnPhase(self, phase_info):
+        args = OrderedDict()
+
+        if phase_info.BinaryFilename is not None:
+            args["binary"] = phase_info.BinaryFilename
+
+        args["succeeded"] = phase_info.Succeeded
+        args.update(phase_info.Counters)
+
+        event = {
+            "name": phase_info.Name,
+            "cat": "coverage",
+            "ph": "X",
+            "ts": int(phase_info.StartTime * 1000000),
+            "dur": int(phase_info.Duration * 1000000),
+            "pid": phase_info.ProcessId,
+            "tid": phase_info.ThreadId,
+            "args": args,
+        }
+
+        with self._lock:
+            self._events.append(event)
+
+    # ----------------------------------------------------------------------
+    @Interface.override
+    def Close(self):
+        with self._lock:
+            events = list(self._events)
+
+        with open(self.OutputFilename, "w") as f:
+            json.dump(
+                {
+                    "traceEvents": events,
+                    "displayTimeUnit": "ms",
+                },
+                f,
+            )
+
+
+# ----------------------------------------------------------------------
+class SummarySink(Sink):
+    """Writes a table summarizing each phase to the output stream when closed"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, output_stream):
+        self._output_stream                 = output_stream
+
+        self._phases                        = OrderedDict()
+        self._lock                          = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    @Interface.override
+    def OnPhase(self, phase_info):
+        with self._lock:
+            info = self._phases.get(phase_info.Name)
+            if info is None:
+                info = {
+                    "count": 0,
+                    "failures": 0,
+                    "total": 0.0,
+                    "min": None,
+                    "max": 0.0,
+                    "counters": OrderedDict(),
+                }
+
+                self._phases[phase_info.Name] = info
+
+            info["count"] += 1
+            info["total"] += phase_info.Duration
+            info["max"] = max(info["max"], phase_info.Duration)
+            info["min"] = phase_info.Duration if info["min"] is None else min(info["min"], phase_info.Duration)
+
+            if not phase_info.Succeeded:
+                info["failures"] += 1
+
+            for counter_name, value in phase_info.Counters.items():
+                info["counters"][counter_name] = info["counters"].get(counter_name, 0) + value
+
+    # ----------------------------------------------------------------------
+    @Interface.override
+    def Close(self):
+        with self._lock:
+            phases = list(self._phases.items())
+
+        if not phases:
+            return
+
+        header = ["Phase", "Count", "Failures", "Total (s)", "Average (s)", "Min (s)", "Max (s)", "Counters"]
+
+        rows = []
+
+        for name, info in phases:
+            rows.append(
+                [
+                    name,
+                    str(info["count"]),
+                    str(info["failures"]),
+                    "{:.3f}".format(info["total"]),
+                    "{:.3f}".format(info["total"] / info["count"]),
+                    "{:.3f}".format(info["min"]),
+                    "{:.3f}".format(info["max"]),
+                    ", ".join("{}={}".format(k, v) for k, v in info["counters"].items()),
+                ],
+            )
+
+        widths = [
+            max(len(row[index]) for row in [header] + rows)
+            for index in range(len(header))
+        ]
+
+        row_template = "  ".join("{{:<{}}}".format(width) for width in widths)
+
+        self._output_stream.write(row_template.format(*header).rstrip() + "\n")
+        self._output_stream.write(row_template.format(*["-" * width for width in widths]).rstrip() + "\n")
+
+        for row in rows:
+            self._output_stream.write(row_template.format(*row).rstrip() + "\n")
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+class _CollectingSink(Sink):
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        self.Phases                         = []
+
+        self._lock                          = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    @Interface.override
+    def OnPhase(self, phase_info):
+        with self._lock:
+            self.Phases.append(phase_info)
+
+    # ----------------------------------------------------------------------
+    @Interface.override
+    def Close(self):
+        pass
+
+
+# ----------------------------------------------------------------------
+class _NullPhase(object):
+    IsEnabled                               = False
+
+    # ----------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, *args):
+        pass
+
+    # ----------------------------------------------------------------------
+    def SetCounter(self, name, value):
+        pass
+
+    # ----------------------------------------------------------------------
+    def SetResult(self, result):
+        pass
+
+
+_NULL_PHASE                                 = _NullPhase()
+
+
+# ----------------------------------------------------------------------
+class _Phase(object):
+    IsEnabled                               = True
+
+    # ----------------------------------------------------------------------
+    def __init__(self, sink, name, binary_filename):
+        self._sink                          = sink
+        self._name                          = name
+        self._binary_filename               = binary_filename
+        self._counters                      = OrderedDict()
+        self._result                        = 0
+
+        self._start_time                    = None
+        self._start_counter                 = None
+
+    # ----------------------------------------------------------------------
+    def __enter__(self):
+        self._start_time = time.time()
+        self._start_counter = time.perf_counter()
+
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self._start_counter
+
+        self._sink.OnPhase(
+            PhaseInfo(
+                self._name,
+                self._binary_filename,
+                self._start_time,
+                duration,
+                os.getpid(),
+                threading.current_thread().ident,
+                exc_type is None and self._result == 0,
+                self._counters,
+            ),
+        )
+
+    # ----------------------------------------------------------------------
+    def SetCounter(self, name, value):
+        self._counters[name] = value
+
+    # ----------------------------------------------------------------------
+    def SetResult(self, result):
+        """Marks the phase as failed if the result code is not 0"""
+        self._result = result
@@ -0,0 +1,149 @@
+# ----------------------------------------------------------------------
+# |
+# |  CodeCoverageExecutor_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 14:28:16
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CodeCoverageExecutor.py"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon import SourceCoverageIndex
+    from CppMSVCCommon.TestExecutorImpl.CodeCoverageExecutor import CodeCoverageExecutor
+    from CppMSVCCommon.TestExecutorImpl import CoverageCache
+    from CppMSVCCommon.TestExecutorImpl import CoverageShards
+
+# The benchmark creates synthetic coverage data and stand-ins for CoverageToCsv.ps1
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", "..", "..", "..", "..", "..", "Scripts"))
+with CallOnExit(lambda: sys.path.pop(0)):
+    import CoverageBenchmark
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+        self._context = CoverageBenchmark.BenchmarkContext(
+            self._temp_dir,
+            num_methods=100,
+            num_binaries=2,
+            name_length=40,
+            num_include_patterns=0,
+            num_exclude_patterns=0,
+            pattern_shape="mixed",
+            max_workers=2,
+        )
+
+        self._index_dir = os.path.join(self._temp_dir, "index")
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    # ----------------------------------------------------------------------
+    def test_ExtractCoverageInfo(self):
+        expected = self._ExtractAll()
+
+        for env_values in [
+            {CoverageShards.WORKERS_ENV_VAR: "2"},
+            {CoverageCache.CACHE_DIR_ENV_VAR: os.path.join(self._temp_dir, "cache")},
+            {SourceCoverageIndex.INDEX_DIR_ENV_VAR: self._index_dir},
+        ]:
+            self.assertEqual(self._ExtractAll(env_values), expected)
+
+    # ----------------------------------------------------------------------
+    def test_IndexWithShards(self):
+        # Sharded extraction only calculates totals, so it isn't used while the index is enabled
+        expected = self._ExtractAll()
+
+        self.assertEqual(
+            self._ExtractAll(
+                {
+                    CoverageShards.WORKERS_ENV_VAR: "2",
+                    SourceCoverageIndex.INDEX_DIR_ENV_VAR: self._index_dir,
+                },
+            ),
+            expected,
+        )
+
+        index = SourceCoverageIndex.SourceCoverageIndex(self._index_dir)
+
+        for binary_filename, coverage_filename in zip(self._context.BinaryFilenames, self._context.CoverageFilenames):
+            self.assertTrue(index.IsRecorded(binary_filename, coverage_filename, None, None))
+
+        # Every method in the synthetic data is associated with a source file
+        source_files = set()
+
+        for coverage_filename in self._context.CoverageFilenames:
+            with open(coverage_filename) as f:
+                for line in f:
+                    source_files.add(line.rstrip().rsplit(",", 1)[-1].strip('"'))
+
+        file_coverage_items = index.GetFileCoverage(sorted(source_files))
+
+        self.assertEqual(len(file_coverage_items), len(source_files))
+        self.assertTrue(sum(item.CurrentCovered + item.CurrentNotCovered for item in file_coverage_items) > 0)
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _ExtractAll(self, env_values=None):
+        env_values = env_values or {}
+
+        with CoverageBenchmark.StubEnvironment(self._context):
+            os.environ.update(env_values)
+
+            try:
+                return [
+                    CodeCoverageExecutor.ExtractCoverageInfo(
+                        coverage_filename,
+                        binary_filename,
+                        None,
+                        None,
+                        io.StringIO(),
+                    )
+                    for binary_filename, coverage_filename in zip(self._context.BinaryFilenames, self._context.CoverageFilenames)
+                ]
+            finally:
+                for key in env_values:
+                    os.environ.pop(key)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
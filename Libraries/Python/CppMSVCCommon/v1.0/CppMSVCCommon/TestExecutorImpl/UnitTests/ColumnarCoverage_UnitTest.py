@@ -0,0 +1,235 @@
+# ----------------------------------------------------------------------
+# |
+# |  ColumnarCoverage_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 10:31:47
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for ColumnarCoverage.py"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl import ColumnarCoverage
+    from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults, COLUMN_NAMES
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._filename = os.path.join(self._temp_dir, "results.columns")
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    # ----------------------------------------------------------------------
+    def test_Roundtrip(self):
+        results = _CreateResults()
+        ColumnarCoverage.Write(self._filename, results)
+
+        with ColumnarCoverage.Reader(self._filename) as reader:
+            self.assertEqual(len(reader), len(results))
+            self.assertEqual(reader.Modules, ["One.exe", "Two.exe"])
+
+            # Rows are grouped by module, but are otherwise in their original order
+            self.assertEqual(
+                list(reader.ToCoverageResults()),
+                [item for item in results if item.Module == "One.exe"] + [item for item in results if item.Module == "Two.exe"],
+            )
+
+            self.assertEqual(
+                list(reader.ToCoverageResults("Two.exe")),
+                [item for item in results if item.Module == "Two.exe"],
+            )
+
+            self.assertEqual(list(reader.ToCoverageResults("Unknown.exe")), [])
+
+    # ----------------------------------------------------------------------
+    def test_Names(self):
+        results = _CreateResults()
+        ColumnarCoverage.Write(self._filename, results)
+
+        with ColumnarCoverage.Reader(self._filename) as reader:
+            # The names in One.exe are ASCII, while Two.exe contains a name that isn't
+            for module in ["One.exe", "Two.exe"]:
+                expected = [item.Name for item in results if item.Module == module]
+
+                self.assertEqual(reader.GetNames(module), expected)
+
+                begin, end = reader.GetRowRange(module)
+                self.assertEqual([reader.GetName(index) for index in range(begin, end)], expected)
+                self.assertEqual(set(reader.GetModule(index) for index in range(begin, end)), set([module]))
+
+            self.assertEqual(reader.GetNames("Unknown.exe"), [])
+
+    # ----------------------------------------------------------------------
+    def test_Scopes(self):
+        results = _CreateResults()
+        ColumnarCoverage.Write(self._filename, results)
+
+        with ColumnarCoverage.Reader(self._filename) as reader:
+            scopes = reader.GetScopes()
+
+            # Scope 0 is always the empty string
+            self.assertEqual(scopes[0], "")
+            self.assertEqual(len(scopes), len(set(scopes)))
+
+            begin, end = reader.GetRowRange("One.exe")
+            expected = [item for item in results if item.Module == "One.exe"]
+
+            self.assertEqual([scopes[scope_id] for scope_id in reader.GetNamespaceIds("One.exe")], [item.Namespace for item in expected])
+            self.assertEqual([scopes[scope_id] for scope_id in reader.GetClassIds("One.exe")], [item.Class for item in expected])
+            self.assertEqual([scopes[scope_id] for scope_id in reader.GetSourceFileIds("One.exe")], [item.SourceFile for item in expected])
+
+            self.assertEqual([reader.GetNamespace(index) for index in range(begin, end)], [item.Namespace for item in expected])
+
+    # ----------------------------------------------------------------------
+    def test_Totals(self):
+        results = _CreateResults()
+        ColumnarCoverage.Write(self._filename, results)
+
+        # ----------------------------------------------------------------------
+        def ShouldInclude(name):
+            return name.startswith("Foo")
+
+        # ----------------------------------------------------------------------
+
+        with ColumnarCoverage.Reader(self._filename) as reader:
+            for units in ["blocks", "lines"]:
+                self.assertEqual(reader.Totals(units), results.Totals(units))
+                self.assertEqual(
+                    reader.Totals(units, "Two.exe"),
+                    reader.ToCoverageResults("Two.exe").Totals(units),
+                )
+                self.assertEqual(
+                    reader.Totals(units, should_include_func=ShouldInclude),
+                    reader.ToCoverageResults(should_include_func=ShouldInclude).Totals(units),
+                )
+
+            self.assertEqual(reader.Totals("blocks", should_include_func=ShouldInclude), (4 + 10, 5 + 11))
+            self.assertEqual(
+                list(reader.GetColumn("BlocksCovered", "One.exe")),
+                [item.BlocksCovered for item in results if item.Module == "One.exe"],
+            )
+
+            self.assertRaises(Exception, lambda: reader.Totals("invalid"))
+
+    # ----------------------------------------------------------------------
+    def test_Empty(self):
+        ColumnarCoverage.Write(self._filename, CoverageResults())
+
+        with ColumnarCoverage.Reader(self._filename) as reader:
+            self.assertEqual(len(reader), 0)
+            self.assertEqual(reader.Modules, [])
+            self.assertEqual(reader.GetNames(), [])
+            self.assertEqual(reader.Totals("blocks"), (0, 0))
+            self.assertEqual(reader.Totals("lines"), (0, 0))
+
+    # ----------------------------------------------------------------------
+    def test_ConvertCsv(self):
+        csv_filename = os.path.join(self._temp_dir, "results.csv")
+
+        with open(csv_filename, "w", newline="") as f:
+            f.write('"One.exe","Foo(int, char)",1,2,3,4,5,"Namespace","Class","File.cpp"\r\n')
+            f.write('"One.exe","Bar(""quoted"")",6,7,8,9,10\r\n')
+
+        ColumnarCoverage.ConvertCsv(csv_filename, self._filename)
+
+        with ColumnarCoverage.Reader(self._filename) as reader:
+            self.assertEqual(
+                list(reader.ToCoverageResults()),
+                list(_CreateResultsFromRows([
+                    ("One.exe", "Foo(int, char)", [1, 2, 3, 4, 5], "Namespace", "Class", "File.cpp"),
+                    ("One.exe", 'Bar("quoted")', [6, 7, 8, 9, 10], "", "", ""),
+                ])),
+            )
+
+        # Single values are errors written by the script
+        with open(csv_filename, "w") as f:
+            f.write("The coverage file is invalid\n")
+
+        self.assertRaises(Exception, lambda: ColumnarCoverage.ConvertCsv(csv_filename, self._filename))
+
+    # ----------------------------------------------------------------------
+    def test_InvalidFiles(self):
+        open(self._filename, "wb").close()
+        self.assertRaises(Exception, lambda: ColumnarCoverage.Reader(self._filename))
+
+        with open(self._filename, "wb") as f:
+            f.write(b"x" * 1024)
+
+        self.assertRaises(Exception, lambda: ColumnarCoverage.Reader(self._filename))
+
+        # Truncated
+        ColumnarCoverage.Write(self._filename, _CreateResults())
+
+        with open(self._filename, "rb") as f:
+            content = f.read()
+
+        with open(self._filename, "wb") as f:
+            f.write(content[:-10])
+
+        self.assertRaises(Exception, lambda: ColumnarCoverage.Reader(self._filename))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CreateResults():
+    # Rows for the modules are interleaved
+    return _CreateResultsFromRows([
+        ("One.exe", "Foo()", [1, 2, 3, 4, 5], "Namespace", "Class", "File.cpp"),
+        ("Two.exe", "Bar()", [6, 7, 8, 9, 0], "", "", ""),
+        ("One.exe", "Baz(int, char)", [2, 0, 1, 3, 3], "Namespace", "Other", "File.cpp"),
+        ("Two.exe", "Café()", [5, 5, 5, 7, 8], "Nämespace", "Class", "Other.cpp"),
+        ("One.exe", "FooBar()", [0, 0, 9, 10, 11], "", "Class", ""),
+    ])
+
+
+# ----------------------------------------------------------------------
+def _CreateResultsFromRows(rows):
+    results = CoverageResults()
+
+    for module, name, counts, namespace, class_name, source_file in rows:
+        assert len(counts) == len(COLUMN_NAMES), counts
+        results.Append(module, name, counts, namespace, class_name, source_file)
+
+    return results
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
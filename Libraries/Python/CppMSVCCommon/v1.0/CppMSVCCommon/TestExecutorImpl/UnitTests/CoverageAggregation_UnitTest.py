@@ -0,0 +1,296 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageAggregation_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 17:20:36
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CoverageAggregation.py"""
+
+import os
+import sys
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl.CoverageAggregation import AggregationError, CoverageAggregator, CoverageAggregationClient, CoverageAggregationServer, DecodeBatch, EncodeBatch
+    from CppMSVCCommon.TestExecutorImpl.CoverageMerge import Merge
+    from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults, KEY_NAME, KEY_MODULE_AND_NAME, KEYS
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def test_SingleSubmission(self):
+        # Methods with the same name in different classes are different methods, and
+        # overloads (rows with the same scope) are summed; aggregating a single submission
+        # doesn't change its totals.
+        results = _CreateResults([
+            ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+            ("One.exe", "Namespace", "Class2", "Init()", 2, 4),
+            ("One.exe", "Namespace", "Class2", "Method()", 5, 0),
+            ("One.exe", "Namespace", "Class2", "Method()", 1, 3),
+        ])
+
+        for key in KEYS:
+            aggregator = _Aggregate([results], key)
+
+            self.assertEqual(aggregator.NumMethods, 3)
+            self.assertEqual(aggregator.Totals("blocks"), results.Totals("blocks"))
+            self.assertEqual(aggregator.Totals("lines"), results.Totals("lines"))
+
+            self.assertEqual(
+                _GetMethods(aggregator.ToCoverageResults()),
+                [
+                    ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+                    ("One.exe", "Namespace", "Class2", "Init()", 2, 4),
+                    ("One.exe", "Namespace", "Class2", "Method()", 6, 3),
+                ],
+            )
+
+            self.assertEqual(aggregator.GetMethod("Method()", "One.exe", "Namespace", "Class2"), [6, 0, 3, 6, 3])
+            self.assertEqual(aggregator.GetMethod("Method()", "One.exe"), None)
+
+    # ----------------------------------------------------------------------
+    def test_MultipleSubmissions(self):
+        # Overloads are summed within each submission before the maximum is taken across submissions
+        results1 = _CreateResults([
+            ("One.exe", "", "Class", "Method()", 2, 0),
+            ("One.exe", "", "Class", "Method()", 1, 1),
+            ("One.exe", "", "Class", "Other()", 0, 2),
+        ])
+
+        results2 = _CreateResults([
+            ("One.exe", "", "Class", "Method()", 1, 5),
+            ("One.exe", "", "Other", "Method()", 4, 0),
+        ])
+
+        aggregator = _Aggregate([results1, results2])
+
+        self.assertEqual(
+            _GetMethods(aggregator.ToCoverageResults()),
+            [
+                ("One.exe", "", "Class", "Method()", 3, 3),
+                ("One.exe", "", "Class", "Other()", 0, 2),
+                ("One.exe", "", "Other", "Method()", 4, 0),
+            ],
+        )
+
+        self.assertEqual(aggregator.Totals("blocks"), (7, 5))
+
+        # Submitting the same results multiple times doesn't change them
+        for key in KEYS:
+            self.assertEqual(
+                _GetMethods(_Aggregate([results2, results2, results2], key).ToCoverageResults()),
+                _GetMethods(results2),
+            )
+
+    # ----------------------------------------------------------------------
+    def test_Modules(self):
+        results = _CreateResults([
+            ("One.exe", "Namespace", "Class", "Init()", 1, 2),
+            ("Two.exe", "Namespace", "Class", "Init()", 2, 4),
+            ("Two.exe", "Namespace", "Class", "Init()", 1, 0),
+        ])
+
+        # Modules are distinct
+        self.assertEqual(_Aggregate([results], KEY_MODULE_AND_NAME).Totals("blocks"), results.Totals("blocks"))
+
+        # The method in both modules is the same method
+        aggregator = _Aggregate([results], KEY_NAME)
+
+        self.assertEqual(
+            _GetMethods(aggregator.ToCoverageResults()),
+            [("One.exe", "Namespace", "Class", "Init()", 3, 4)],
+        )
+
+        self.assertEqual(aggregator.GetMethod("Init()", None, "Namespace", "Class"), [3, 0, 4, 3, 4])
+
+    # ----------------------------------------------------------------------
+    def test_Merge(self):
+        results1 = _CreateResults([
+            ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+            ("Two.exe", "Namespace", "Class1", "Init()", 2, 1),
+            ("One.exe", "Namespace", "Class2", "Init()", 2, 4),
+            ("One.exe", "Namespace", "Class2", "Init()", 1, 1),
+        ])
+
+        results2 = _CreateResults([
+            ("One.exe", "Namespace", "Class2", "Init()", 4, 0),
+            ("Two.exe", "", "", "Init()", 1, 1),
+        ])
+
+        results3 = CoverageResults()
+        results3.Append("One.exe", "Init()", [4, 1, 5, 1, 2], "Namespace", "Class2")
+        results3.Append("One.exe", "Init()", [2, 6, 0, 3, 0], "Namespace", "Class2")
+
+        sources = [results1, results2, results3]
+
+        for key in KEYS:
+            aggregator = _Aggregate(sources, key)
+            merged = Merge(sources, key)
+
+            self.assertEqual(_GetMethods(aggregator.ToCoverageResults()), _GetMethods(merged))
+
+            for units in ["blocks", "lines"]:
+                self.assertEqual(aggregator.Totals(units), merged.Totals(units))
+
+    # ----------------------------------------------------------------------
+    def test_Reset(self):
+        aggregator = _Aggregate([_CreateResults([("One.exe", "", "", "Method()", 1, 2)])])
+
+        aggregator.Reset()
+
+        self.assertEqual(aggregator.NumMethods, 0)
+        self.assertEqual(aggregator.Totals("blocks"), (0, 0))
+
+    # ----------------------------------------------------------------------
+    def test_Invalid(self):
+        self.assertRaises(Exception, lambda: CoverageAggregator("invalid"))
+        self.assertRaises(Exception, lambda: CoverageAggregator().Totals("invalid"))
+
+    # ----------------------------------------------------------------------
+    def test_BatchRoundtrip(self):
+        results = _CreateResults([
+            ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+            ("Two.exe", "Namespace", "Class1", "Init()", 2, 1),
+            ("One.exe", "", "Class2", "Méthode()", 2, 4),
+            ("One.exe", "Namespace", "", "Init()", 1, 1),
+        ])
+
+        modules, names, columns, namespaces, classes = DecodeBatch(EncodeBatch(results))
+
+        self.assertEqual(modules, results.Modules)
+        self.assertEqual(names, results.Names)
+        self.assertEqual(namespaces, results.Namespaces)
+        self.assertEqual(classes, results.Classes)
+        self.assertEqual({k: list(v) for k, v in columns.items()}, {k: list(v) for k, v in results.Columns.items()})
+
+        # Ranges
+        modules, names, columns, namespaces, classes = DecodeBatch(EncodeBatch(results, 1, 3))
+
+        self.assertEqual(modules, results.Modules[1:3])
+        self.assertEqual(names, results.Names[1:3])
+        self.assertEqual(namespaces, results.Namespaces[1:3])
+        self.assertEqual(classes, results.Classes[1:3])
+
+        # Empty
+        modules, names, columns, namespaces, classes = DecodeBatch(EncodeBatch(results, 10, 20))
+
+        self.assertEqual((modules, names, namespaces, classes), ([], [], [], []))
+
+    # ----------------------------------------------------------------------
+    def test_InvalidBatch(self):
+        self.assertRaises(Exception, lambda: DecodeBatch(b"invalid"))
+
+    # ----------------------------------------------------------------------
+    def test_ClientServer(self):
+        results1 = _CreateResults([
+            ("One.exe", "Namespace", "Class", "Method()", 2, 0),
+            ("One.exe", "Namespace", "Other", "Method()", 1, 1),
+            ("Two.exe", "", "", "Init()", 0, 2),
+            ("One.exe", "Namespace", "Class", "Method()", 1, 1),
+        ])
+
+        results2 = _CreateResults([
+            ("One.exe", "Namespace", "Class", "Method()", 1, 5),
+            ("Two.exe", "", "", "Init()", 1, 1),
+        ])
+
+        for key in KEYS:
+            with CoverageAggregationServer(key=key) as server:
+                with CoverageAggregationClient(server.Address) as client:
+                    # Overloads are split across batches
+                    self.assertEqual(client.Submit(results1, batch_size=1), 3)
+                    self.assertEqual(client.Submit(results2, batch_size=1), 3)
+
+                    merged = Merge([results1, results2], key)
+
+                    for units in ["blocks", "lines"]:
+                        self.assertEqual(client.Totals(units), merged.Totals(units))
+
+                    self.assertEqual(_GetMethods(server.Aggregator.ToCoverageResults()), _GetMethods(merged))
+
+                    self.assertEqual(client.GetMethod("Method()", "One.exe", "Namespace", "Class"), [3, 0, 3, 3, 3])
+                    self.assertEqual(client.GetMethod("Method()", "One.exe", "Namespace", "Unknown"), None)
+                    self.assertEqual(client.GetMethod("Init()", "Two.exe"), [1, 0, 1, 1, 1])
+
+                    self.assertRaises(AggregationError, lambda: client.Totals("invalid"))
+
+                    client.Reset()
+
+                    self.assertEqual(client.Totals("blocks"), (0, 0))
+
+    # ----------------------------------------------------------------------
+    def test_ClientServerSingleSubmission(self):
+        results = _CreateResults([
+            ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+            ("One.exe", "Namespace", "Class2", "Init()", 2, 4),
+            ("One.exe", "Namespace", "Class2", "Init()", 5, 0),
+        ])
+
+        with CoverageAggregationServer() as server:
+            with CoverageAggregationClient(server.Address) as client:
+                client.Submit(results, batch_size=2)
+
+                self.assertEqual(client.Totals("blocks"), results.Totals("blocks"))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CreateResults(methods):
+    results = CoverageResults()
+
+    for module, namespace, class_name, name, covered, not_covered in methods:
+        results.Append(module, name, [covered, 0, not_covered, covered, not_covered], namespace, class_name)
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def _Aggregate(sources, key=KEY_NAME):
+    aggregator = CoverageAggregator(key)
+
+    for results in sources:
+        aggregator.Add(results.Modules, results.Names, results.Columns, results.Namespaces, results.Classes)
+
+    return aggregator
+
+
+# ----------------------------------------------------------------------
+def _GetMethods(results):
+    return [
+        (item.Module, item.Namespace, item.Class, item.Name, item.BlocksCovered, item.BlocksNotCovered)
+        for item in results
+    ]
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,163 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageCache_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 09:12:40
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CoverageCache.py"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl.CoverageCache import CoverageCache
+    from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    # ----------------------------------------------------------------------
+    def test_Roundtrip(self):
+        cache = CoverageCache(os.path.join(self._temp_dir, "cache"))
+
+        key = cache.CreateKey(self._CreateCoverageFile("one"), "one.exe", None, None)
+        self.assertEqual(cache.Get(key), None)
+
+        cache.Set(key, _CreateResults("one.exe", 10))
+
+        self.assertEqual(list(cache.Get(key)), list(_CreateResults("one.exe", 10)))
+        self.assertEqual(cache.GetTotals(key), (10 * 2, 10 * 3))
+
+    # ----------------------------------------------------------------------
+    def test_KeyChangesWithContent(self):
+        cache = CoverageCache(os.path.join(self._temp_dir, "cache"))
+
+        coverage_filename = self._CreateCoverageFile("one")
+        key = cache.CreateKey(coverage_filename, "one.exe", None, None)
+
+        self.assertEqual(cache.CreateKey(coverage_filename, "one.exe", None, None), key)
+        self.assertNotEqual(cache.CreateKey(coverage_filename, "two.exe", None, None), key)
+        self.assertNotEqual(cache.CreateKey(coverage_filename, "one.exe", ["*Foo*"], None), key)
+
+        with open(coverage_filename, "w") as f:
+            f.write("different content")
+
+        self.assertNotEqual(cache.CreateKey(coverage_filename, "one.exe", None, None), key)
+
+    # ----------------------------------------------------------------------
+    def test_Eviction(self):
+        cache_dir = os.path.join(self._temp_dir, "cache")
+        cache = CoverageCache(cache_dir)
+
+        keys = []
+
+        for index, name in enumerate(["one", "two", "three", "four"]):
+            key = cache.CreateKey(self._CreateCoverageFile(name), "{}.exe".format(name), None, None)
+            cache.Set(key, _CreateResults("{}.exe".format(name), 100))
+
+            # Entries are evicted in order of last use
+            os.utime(cache._GetResultsFilename(key), (1000000 + index, 1000000 + index))
+
+            keys.append(key)
+
+        # A second entry for the first coverage file shares its content hash
+        shared_key = cache.CreateKey(self._CreateCoverageFile("one"), "other.exe", None, None)
+        cache.Set(shared_key, _CreateResults("other.exe", 100))
+
+        entry_size = os.path.getsize(cache._GetResultsFilename(keys[-1]))
+
+        self.assertEqual(len(self._GetHashFilenames(cache_dir)), 4)
+
+        # Allow for 2 entries
+        cache.MaxSize = entry_size * 2 + entry_size // 2
+        cache._Evict()
+
+        results_filenames = [item for item in os.listdir(cache_dir) if item.endswith(".columns")]
+
+        self.assertEqual(len(results_filenames), 2)
+        self.assertTrue(sum(os.path.getsize(os.path.join(cache_dir, item)) for item in results_filenames) <= cache.MaxSize)
+
+        self.assertEqual(cache.Get(keys[0]), None)
+        self.assertEqual(cache.Get(keys[1]), None)
+        self.assertEqual(cache.Get(keys[2]), None)
+        self.assertNotEqual(cache.Get(keys[3]), None)
+        self.assertNotEqual(cache.Get(shared_key), None)
+
+        # The content hash of the first coverage file is still used by the shared entry, while
+        # the content hashes of the second and third coverage files were evicted.
+        self.assertEqual(
+            self._GetHashFilenames(cache_dir),
+            sorted(set(key.partition("-")[0] for key in [keys[3], shared_key])),
+        )
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _CreateCoverageFile(self, name):
+        filename = os.path.join(self._temp_dir, "{}.coverage".format(name))
+
+        if not os.path.isfile(filename):
+            with open(filename, "w") as f:
+                f.write(name)
+
+        return filename
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _GetHashFilenames(cache_dir):
+        return sorted(os.listdir(os.path.join(cache_dir, "hashes")))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CreateResults(module, num_methods):
+    results = CoverageResults()
+
+    for index in range(num_methods):
+        results.Append(module, "Method{}()".format(index), [1, 0, 1, 2, 3], "Namespace", "Class", "File.cpp")
+
+    return results
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
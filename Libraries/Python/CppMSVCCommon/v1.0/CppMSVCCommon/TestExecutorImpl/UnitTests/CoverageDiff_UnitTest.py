@@ -0,0 +1,195 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageDiff_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 11:40:53
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CoverageDiff.py"""
+
+import os
+import sys
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl.CoverageDiff import Diff, MethodDelta
+    from CppMSVCCommon.TestExecutorImpl.CoverageMerge import Merge
+    from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults, KEY_NAME, KEY_MODULE_AND_NAME, KEYS
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def test_Unchanged(self):
+        results = _CreateResults([
+            ("One.exe", "Namespace", "Class", "Method()", 1, 2),
+            ("One.exe", "Namespace", "Class", "Other()", 0, 3),
+        ])
+
+        diff = Diff(results, results)
+
+        self.assertEqual(diff.BaselineTotals, (1, 5))
+        self.assertEqual(diff.CurrentTotals, (1, 5))
+        self.assertEqual(diff.NumChanged, 0)
+        self.assertEqual(diff.NumNewlyUncovered, 0)
+        self.assertEqual(diff.NumRemoved, 0)
+
+    # ----------------------------------------------------------------------
+    def test_Changes(self):
+        baseline = _CreateResults([
+            ("One.exe", "Namespace", "Class", "Changed()", 1, 2),
+            ("One.exe", "Namespace", "Class", "Uncovered()", 3, 0),
+            ("One.exe", "Namespace", "Class", "Removed()", 1, 1),
+            ("One.exe", "Namespace", "Class", "Same()", 0, 4),
+        ])
+
+        current = _CreateResults([
+            ("One.exe", "Namespace", "Class", "Changed()", 2, 1),
+            ("One.exe", "Namespace", "Class", "Uncovered()", 0, 3),
+            ("One.exe", "Namespace", "Class", "Same()", 0, 4),
+            ("One.exe", "Namespace", "Class", "Added()", 0, 5),
+        ])
+
+        diff = Diff(baseline, current)
+
+        self.assertEqual(
+            list(diff.EnumChangedMethods()),
+            [
+                MethodDelta("One.exe", "Changed()", 1, 2, 2, 1, "Namespace", "Class"),
+                MethodDelta("One.exe", "Uncovered()", 3, 0, 0, 3, "Namespace", "Class"),
+                MethodDelta("One.exe", "Added()", None, None, 0, 5, "Namespace", "Class"),
+            ],
+        )
+
+        self.assertEqual(
+            list(diff.EnumNewlyUncoveredMethods()),
+            [
+                MethodDelta("One.exe", "Uncovered()", 3, 0, 0, 3, "Namespace", "Class"),
+                MethodDelta("One.exe", "Added()", None, None, 0, 5, "Namespace", "Class"),
+            ],
+        )
+
+        self.assertEqual(
+            list(diff.EnumRemovedMethods()),
+            [MethodDelta("One.exe", "Removed()", 1, 1, None, None, "Namespace", "Class")],
+        )
+
+    # ----------------------------------------------------------------------
+    def test_Scopes(self):
+        # Methods with the same name in different classes are different methods, while
+        # overloads are summed.
+        baseline = _CreateResults([
+            ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+            ("One.exe", "Namespace", "Class2", "Init()", 2, 4),
+            ("One.exe", "Namespace", "Class2", "Method()", 1, 0),
+            ("One.exe", "Namespace", "Class2", "Method()", 0, 1),
+        ])
+
+        current = _CreateResults([
+            ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+            ("One.exe", "Namespace", "Class2", "Init()", 6, 0),
+            ("One.exe", "Namespace", "Class2", "Method()", 1, 1),
+        ])
+
+        for key in KEYS:
+            diff = Diff(baseline, current, key=key)
+
+            self.assertEqual(diff.BaselineTotals, (4, 7))
+            self.assertEqual(diff.CurrentTotals, (8, 3))
+
+            self.assertEqual(
+                list(diff.EnumChangedMethods()),
+                [MethodDelta("One.exe", "Init()", 2, 4, 6, 0, "Namespace", "Class2")],
+            )
+
+    # ----------------------------------------------------------------------
+    def test_Modules(self):
+        baseline = _CreateResults([
+            ("One.exe", "", "Class", "Method()", 1, 3),
+            ("Two.exe", "", "Class", "Method()", 2, 2),
+        ])
+
+        current = _CreateResults([
+            ("One.exe", "", "Class", "Method()", 1, 3),
+            ("Two.exe", "", "Class", "Method()", 0, 4),
+        ])
+
+        # Modules are distinct
+        diff = Diff(baseline, current, key=KEY_MODULE_AND_NAME)
+
+        self.assertEqual(
+            list(diff.EnumChangedMethods()),
+            [MethodDelta("Two.exe", "Method()", 2, 2, 0, 4, "", "Class")],
+        )
+
+        # The method in both modules is the same method
+        diff = Diff(baseline, current, key=KEY_NAME)
+
+        self.assertEqual(diff.BaselineTotals, (2, 2))
+        self.assertEqual(diff.CurrentTotals, (1, 3))
+        self.assertEqual(
+            list(diff.EnumChangedMethods()),
+            [MethodDelta("One.exe", "Method()", 2, 2, 1, 3, "", "Class")],
+        )
+
+    # ----------------------------------------------------------------------
+    def test_ConsistentWithMerge(self):
+        results = _CreateResults([
+            ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+            ("Two.exe", "Namespace", "Class1", "Init()", 3, 0),
+            ("One.exe", "Namespace", "Class2", "Init()", 2, 4),
+            ("One.exe", "Namespace", "Class2", "Init()", 1, 1),
+            ("Two.exe", "", "", "Init()", 0, 6),
+        ])
+
+        for key in KEYS:
+            for units in ["blocks", "lines"]:
+                diff = Diff(results, results, units, key)
+                self.assertEqual(diff.BaselineTotals, Merge([results], key).Totals(units))
+
+    # ----------------------------------------------------------------------
+    def test_InvalidKey(self):
+        self.assertRaises(Exception, lambda: Diff(CoverageResults(), CoverageResults(), key="invalid"))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CreateResults(methods):
+    results = CoverageResults()
+
+    for module, namespace, class_name, name, covered, not_covered in methods:
+        results.Append(module, name, [covered, 0, not_covered, covered, not_covered], namespace, class_name)
+
+    return results
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
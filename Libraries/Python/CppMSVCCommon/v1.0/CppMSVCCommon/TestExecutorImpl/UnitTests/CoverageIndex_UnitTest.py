@@ -0,0 +1,152 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageIndex_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 12:35:02
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CoverageIndex.py"""
+
+import os
+import sys
+import unittest
+
+from collections import OrderedDict
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl.CoverageIndex import CoverageIndex, _SplitScope
+    from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        self._results = CoverageResults()
+
+        for module, namespace, class_name, name, covered, not_covered, source_file in [
+            ("One.exe", "Outer", "Class", "Method1()", 1, 2, "Outer.cpp"),
+            ("One.exe", "Outer::Nested", "Class", "Method2()", 3, 4, "Nested.cpp"),
+            ("One.exe", "Outer::NestedOther", "Class", "Method3()", 5, 6, "NestedOther.cpp"),
+            ("One.exe", "Outer::Nested", "Other<int, std::pair<a::b, c>>", "Method4()", 7, 8, "Nested.cpp"),
+            ("Two.exe", "Outer", "Class", "Method1()", 10, 20, "Outer.cpp"),
+            ("Two.exe", "", "", "Free()", 30, 40, ""),
+        ]:
+            self._results.Append(
+                module,
+                name,
+                [covered, 0, not_covered, covered, not_covered],
+                namespace,
+                class_name,
+                source_file,
+            )
+
+        self._index = CoverageIndex(self._results)
+
+    # ----------------------------------------------------------------------
+    def test_Structure(self):
+        self.assertEqual(self._index.Modules, ["One.exe", "Two.exe"])
+
+        node = self._index.GetNode("One.exe", "Outer::Nested")
+        self.assertEqual(list(node.Children.keys()), ["Class", "Other<int, std::pair<a::b, c>>"])
+        self.assertEqual(node.Totals(), (3 + 7, 4 + 8))
+
+        self.assertEqual(self._index.GetNode("One.exe", "Outer::Missing"), None)
+        self.assertEqual(self._index.GetNode("Missing.exe"), None)
+
+        self.assertEqual(self._index.GetNode("One.exe").Totals(), (16, 20))
+        self.assertEqual(self._index.Root.Totals("lines"), self._results.Totals("lines"))
+
+    # ----------------------------------------------------------------------
+    def test_Totals(self):
+        self.assertEqual(self._index.Totals(), self._results.Totals())
+        self.assertEqual(self._index.Totals(module="Two.exe"), (40, 60))
+
+        # Prefixes are matched component by component
+        self.assertEqual(self._index.Totals(includes=["Outer::Nested"]), (10, 12))
+        self.assertEqual(self._index.Totals(includes=["Outer"], excludes=["Outer::Nested"]), (1 + 5 + 10, 2 + 6 + 20))
+
+        # Prefixes may end with a method name
+        self.assertEqual(self._index.Totals(includes=["Outer::Class::Method1()"]), (11, 22))
+        self.assertEqual(self._index.Totals(module="One.exe", excludes=["Outer::Nested::Class::Method2()"]), (13, 16))
+        self.assertEqual(self._index.Totals(includes=["Free()"]), (30, 40))
+
+    # ----------------------------------------------------------------------
+    def test_Filter(self):
+        filtered = self._index.Filter(includes=["Outer::Nested"])
+
+        self.assertEqual(
+            [(item.Module, item.Name, item.Namespace, item.Class, item.SourceFile) for item in filtered],
+            [
+                ("One.exe", "Method2()", "Outer::Nested", "Class", "Nested.cpp"),
+                ("One.exe", "Method4()", "Outer::Nested", "Other<int, std::pair<a::b, c>>", "Nested.cpp"),
+            ],
+        )
+
+        # Rows are filtered in their original order and retain all of their values
+        self.assertEqual(list(self._index.Filter()), list(self._results))
+        self.assertEqual(list(self._index.Filter(module="Two.exe")), list(self._results)[4:])
+
+    # ----------------------------------------------------------------------
+    def test_ScopeTotals(self):
+        self.assertEqual(
+            self._index.NamespaceTotals(),
+            OrderedDict(
+                [
+                    ("Outer", (11, 22)),
+                    ("Outer::Nested", (10, 12)),
+                    ("Outer::NestedOther", (5, 6)),
+                    ("", (30, 40)),
+                ],
+            ),
+        )
+
+        self.assertEqual(
+            self._index.ClassTotals(module="One.exe"),
+            OrderedDict(
+                [
+                    (("Outer", "Class"), (1, 2)),
+                    (("Outer::Nested", "Class"), (3, 4)),
+                    (("Outer::NestedOther", "Class"), (5, 6)),
+                    (("Outer::Nested", "Other<int, std::pair<a::b, c>>"), (7, 8)),
+                ],
+            ),
+        )
+
+    # ----------------------------------------------------------------------
+    def test_SplitScope(self):
+        self.assertEqual(_SplitScope(""), ())
+        self.assertEqual(_SplitScope("One"), ("One",))
+        self.assertEqual(_SplitScope("One::Two::Three"), ("One", "Two", "Three"))
+        self.assertEqual(_SplitScope("One<a::b>::Two(c::d)"), ("One<a::b>", "Two(c::d)"))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,199 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageMerge_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 11:02:26
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CoverageMerge.py"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl import ColumnarCoverage
+    from CppMSVCCommon.TestExecutorImpl.CoverageMerge import Merge
+    from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults, KEY_NAME, KEY_MODULE_AND_NAME, KEYS
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def test_SingleSource(self):
+        # Methods with the same name in different classes are different methods, and
+        # overloads (rows with the same scope) are summed; merging a single source doesn't
+        # change its totals.
+        results = _CreateResults([
+            ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+            ("One.exe", "Namespace", "Class2", "Init()", 2, 4),
+            ("One.exe", "Namespace", "Class2", "Method()", 5, 0),
+            ("One.exe", "Namespace", "Class2", "Method()", 1, 3),
+        ])
+
+        for key in KEYS:
+            merged = Merge([results], key)
+
+            self.assertEqual(merged.Totals("blocks"), (9, 9))
+            self.assertEqual(merged.Totals("lines"), results.Totals("lines"))
+
+            self.assertEqual(
+                _GetMethods(merged),
+                [
+                    ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+                    ("One.exe", "Namespace", "Class2", "Init()", 2, 4),
+                    ("One.exe", "Namespace", "Class2", "Method()", 6, 3),
+                ],
+            )
+
+    # ----------------------------------------------------------------------
+    def test_SingleSourceMultipleModules(self):
+        results = _CreateResults([
+            ("One.exe", "Namespace", "Class", "Init()", 1, 2),
+            ("Two.exe", "Namespace", "Class", "Init()", 2, 4),
+            ("Two.exe", "Namespace", "Class", "Init()", 1, 0),
+        ])
+
+        # Modules are distinct
+        self.assertEqual(Merge([results], KEY_MODULE_AND_NAME).Totals("blocks"), results.Totals("blocks"))
+
+        # The method in both modules is the same method
+        self.assertEqual(
+            _GetMethods(Merge([results], KEY_NAME)),
+            [("One.exe", "Namespace", "Class", "Init()", 3, 4)],
+        )
+
+    # ----------------------------------------------------------------------
+    def test_MultipleSources(self):
+        # Overloads are summed within each source before the maximum is taken across sources
+        results1 = _CreateResults([
+            ("One.exe", "", "Class", "Method()", 2, 0),
+            ("One.exe", "", "Class", "Method()", 1, 1),
+            ("One.exe", "", "Class", "Other()", 0, 2),
+        ])
+
+        results2 = _CreateResults([
+            ("One.exe", "", "Class", "Method()", 1, 5),
+            ("One.exe", "", "Other", "Method()", 4, 0),
+        ])
+
+        merged = Merge([results1, results2])
+
+        self.assertEqual(
+            _GetMethods(merged),
+            [
+                ("One.exe", "", "Class", "Method()", 3, 3),
+                ("One.exe", "", "Class", "Other()", 0, 2),
+                ("One.exe", "", "Other", "Method()", 4, 0),
+            ],
+        )
+
+        # Merging the same results multiple times doesn't change them
+        for key in KEYS:
+            self.assertEqual(_GetMethods(Merge([results2, results2, results2], key)), _GetMethods(results2))
+
+    # ----------------------------------------------------------------------
+    def test_Lines(self):
+        results1 = CoverageResults()
+        results1.Append("One.exe", "Method()", [4, 1, 5, 0, 0], "", "Class")
+
+        results2 = CoverageResults()
+        results2.Append("One.exe", "Method()", [2, 6, 0, 0, 0], "", "Class")
+
+        merged = Merge([results1, results2])
+
+        self.assertEqual(list(merged[0])[2:7], [4, 4, 2, 0, 0])
+        self.assertEqual(merged.Totals("lines"), (4, 6))
+
+    # ----------------------------------------------------------------------
+    def test_Reader(self):
+        results1 = _CreateResults([
+            ("One.exe", "Namespace", "Class1", "Init()", 1, 2),
+            ("Two.exe", "Namespace", "Class1", "Init()", 2, 1),
+            ("One.exe", "Namespace", "Class2", "Init()", 2, 4),
+            ("One.exe", "Namespace", "Class2", "Init()", 1, 1),
+        ])
+
+        results2 = _CreateResults([
+            ("One.exe", "Namespace", "Class2", "Init()", 4, 0),
+            ("Two.exe", "", "", "Init()", 1, 1),
+        ])
+
+        temp_dir = tempfile.mkdtemp()
+
+        with CallOnExit(lambda: shutil.rmtree(temp_dir)):
+            filename = os.path.join(temp_dir, "results.columns")
+
+            ColumnarCoverage.Write(filename, results1)
+
+            with ColumnarCoverage.Reader(filename) as reader:
+                for key in KEYS:
+                    self.assertEqual(
+                        _GetMethods(Merge([reader, results2], key)),
+                        _GetMethods(Merge([reader.ToCoverageResults(), results2], key)),
+                    )
+
+    # ----------------------------------------------------------------------
+    def test_Empty(self):
+        self.assertEqual(len(Merge([])), 0)
+        self.assertEqual(len(Merge([CoverageResults(), CoverageResults()])), 0)
+
+        results = _CreateResults([("One.exe", "", "", "Method()", 1, 2)])
+        self.assertEqual(_GetMethods(Merge([CoverageResults(), results])), _GetMethods(results))
+
+    # ----------------------------------------------------------------------
+    def test_InvalidKey(self):
+        self.assertRaises(Exception, lambda: Merge([], "invalid"))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CreateResults(methods):
+    results = CoverageResults()
+
+    for module, namespace, class_name, name, covered, not_covered in methods:
+        results.Append(module, name, [covered, 0, not_covered, covered, not_covered], namespace, class_name)
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def _GetMethods(results):
+    return [
+        (item.Module, item.Namespace, item.Class, item.Name, item.BlocksCovered, item.BlocksNotCovered)
+        for item in results
+    ]
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,332 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoveragePipeline_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 13:04:51
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CoveragePipeline.py"""
+
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl.CodeCoverageExecutor import CodeCoverageExecutor
+    from CppMSVCCommon.TestExecutorImpl import CoveragePipeline
+    from CppMSVCCommon.TestExecutorImpl import CoverageSession
+    from CppMSVCCommon.TestExecutorImpl import InstrumentationManifest
+    from CppMSVCCommon.TestExecutorImpl import WatchdogProcess
+
+# The benchmark creates synthetic coverage data and stand-ins for vsinstr, VSPerfCmd and CoverageToCsv.ps1
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", "..", "..", "..", "..", "..", "Scripts"))
+with CallOnExit(lambda: sys.path.pop(0)):
+    import CoverageBenchmark
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+        self._context = CoverageBenchmark.BenchmarkContext(
+            self._temp_dir,
+            num_methods=50,
+            num_binaries=3,
+            name_length=40,
+            num_include_patterns=0,
+            num_exclude_patterns=0,
+            pattern_shape="mixed",
+            max_workers=2,
+        )
+
+        # The stand-in monitor doesn't write coverage files, so they are written in advance
+        for binary_filename, csv_filename in zip(self._context.BinaryFilenames, self._context.CoverageFilenames):
+            shutil.copyfile(csv_filename, CoveragePipeline._GetCoverageFilename(binary_filename))
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    # ----------------------------------------------------------------------
+    def test_Execute(self):
+        binary_filenames = self._context.BinaryFilenames
+
+        with CoverageBenchmark.StubEnvironment(self._context):
+            results = CodeCoverageExecutor.ExecutePipeline(
+                binary_filenames,
+                None,
+                None,
+                io.StringIO(),
+                command_lines=[self._context.Stubs["NoOp"]] * len(binary_filenames),
+                max_instrument=2,
+                max_extract=2,
+            )
+
+            for binary_filename in binary_filenames:
+                self.assertTrue(InstrumentationManifest.IsInstrumented(binary_filename))
+
+        self.assertEqual([result.BinaryFilename for result in results], binary_filenames)
+
+        for result, csv_filename in zip(results, self._context.CoverageFilenames):
+            self.assertEqual(result.Stage, None)
+            self.assertEqual(result.Error, None)
+            self.assertEqual(result.Result, _GetTotals(csv_filename))
+
+        # Instrumentation is skipped when the binaries are processed again
+        output_stream = io.StringIO()
+
+        with CoverageBenchmark.StubEnvironment(self._context):
+            results = CodeCoverageExecutor.ExecutePipeline(
+                binary_filenames,
+                None,
+                None,
+                output_stream,
+                command_lines=[self._context.Stubs["NoOp"]] * len(binary_filenames),
+            )
+
+        self.assertEqual([result.Stage for result in results], [None] * len(binary_filenames))
+        self.assertEqual(output_stream.getvalue().count("is already instrumented"), len(binary_filenames))
+
+    # ----------------------------------------------------------------------
+    def test_Filters(self):
+        with CoverageBenchmark.StubEnvironment(self._context):
+            results = CodeCoverageExecutor.ExecutePipeline(
+                self._context.BinaryFilenames[:1],
+                ["Namespace1::*"],
+                ["*::Class17::*"],
+                io.StringIO(),
+                command_lines=[self._context.Stubs["NoOp"]],
+            )
+
+        self.assertEqual(
+            results[0].Result,
+            _GetTotals(
+                self._context.CoverageFilenames[0],
+                lambda name: name.startswith("Namespace1::") and "::Class17::" not in name,
+            ),
+        )
+
+    # ----------------------------------------------------------------------
+    def test_RunFailure(self):
+        binary_filenames = self._context.BinaryFilenames
+
+        with CoverageBenchmark.StubEnvironment(self._context):
+            results = CoveragePipeline.CoveragePipeline(
+                None,
+                None,
+                cancel_on_failure=False,
+            ).Execute(
+                binary_filenames,
+                io.StringIO(),
+                [
+                    self._context.Stubs["NoOp"],
+                    '"{}" -c "raise SystemExit(3)"'.format(sys.executable),
+                    self._context.Stubs["NoOp"],
+                ],
+            )
+
+        self.assertEqual(results[1].Stage, CoveragePipeline.STAGE_RUN)
+        self.assertEqual(results[1].Result, 3)
+
+        # Other binaries aren't affected
+        for index in [0, 2]:
+            self.assertEqual(results[index].Stage, None)
+            self.assertEqual(results[index].Result, _GetTotals(self._context.CoverageFilenames[index]))
+
+    # ----------------------------------------------------------------------
+    def test_CancelOnFailure(self):
+        binary_filenames = self._context.BinaryFilenames
+
+        with CoverageBenchmark.StubEnvironment(self._context):
+            results = CoveragePipeline.CoveragePipeline(None, None).Execute(
+                binary_filenames,
+                io.StringIO(),
+                [
+                    '"{}" -c "raise SystemExit(3)"'.format(sys.executable),
+                    self._context.Stubs["NoOp"],
+                    self._context.Stubs["NoOp"],
+                ],
+            )
+
+        self.assertEqual(results[0].Stage, CoveragePipeline.STAGE_RUN)
+        self.assertEqual(results[0].Result, 3)
+
+        # Binaries are run one at a time, so the others were cancelled before they were run
+        for result in results[1:]:
+            self.assertEqual(result.Result, None)
+            self.assertEqual(result.Error, CoveragePipeline.CANCELLED_ERROR)
+            self.assertTrue(result.Stage in [CoveragePipeline.STAGE_INSTRUMENT, CoveragePipeline.STAGE_RUN], result.Stage)
+
+    # ----------------------------------------------------------------------
+    def test_ExtractFailure(self):
+        binary_filename = self._context.BinaryFilenames[0]
+
+        os.remove(CoveragePipeline._GetCoverageFilename(binary_filename))
+
+        with CoverageBenchmark.StubEnvironment(self._context):
+            results = CoveragePipeline.CoveragePipeline(None, None).Execute(
+                [binary_filename],
+                io.StringIO(),
+                [self._context.Stubs["NoOp"]],
+            )
+
+        # The stand-in converter's error is written to its output, which is reported as an error
+        self.assertEqual(results[0].Stage, CoveragePipeline.STAGE_EXTRACT)
+        self.assertEqual(results[0].Result, None)
+        self.assertNotEqual(results[0].Error, None)
+
+    # ----------------------------------------------------------------------
+    def test_StartFailure(self):
+        with CoverageBenchmark.StubEnvironment(self._context):
+            results = CoveragePipeline.CoveragePipeline(
+                None,
+                None,
+                start_command_line_template='"{}" -c "raise SystemExit(5)" "{{coverage}}"'.format(sys.executable),
+            ).Execute(
+                self._context.BinaryFilenames[:1],
+                io.StringIO(),
+                [self._context.Stubs["NoOp"]],
+            )
+
+        self.assertEqual(results[0].Stage, CoveragePipeline.STAGE_RUN)
+        self.assertEqual(results[0].Result, 5)
+
+    # ----------------------------------------------------------------------
+    def test_StartTimeout(self):
+        start_time = time.perf_counter()
+
+        with CoverageBenchmark.StubEnvironment(self._context):
+            results = CoveragePipeline.CoveragePipeline(
+                None,
+                None,
+                start_command_line_template='"{}" -c "import time; time.sleep(30)" "{{coverage}}"'.format(sys.executable),
+                start_timeout=0.5,
+            ).Execute(
+                self._context.BinaryFilenames[:1],
+                io.StringIO(),
+                [self._context.Stubs["NoOp"]],
+            )
+
+        self.assertTrue(time.perf_counter() - start_time < 15)
+
+        self.assertEqual(results[0].Stage, CoveragePipeline.STAGE_RUN)
+        self.assertEqual(results[0].Result, WatchdogProcess.TIMEOUT_RESULT)
+        self.assertTrue("did not complete within 0.5 seconds" in results[0].Output, results[0].Output)
+
+    # ----------------------------------------------------------------------
+    def test_StopTimeout(self):
+        with CoverageBenchmark.StubEnvironment(self._context):
+            os.environ[CoverageSession.STOP_TIMEOUT_ENV_VAR] = "0.5"
+
+            try:
+                results = CoveragePipeline.CoveragePipeline(
+                    None,
+                    None,
+                    stop_command_line='"{}" -c "import time; time.sleep(30)"'.format(sys.executable),
+                ).Execute(
+                    self._context.BinaryFilenames[:1],
+                    io.StringIO(),
+                    [self._context.Stubs["NoOp"]],
+                )
+            finally:
+                del os.environ[CoverageSession.STOP_TIMEOUT_ENV_VAR]
+
+        self.assertEqual(results[0].Stage, CoveragePipeline.STAGE_RUN)
+        self.assertEqual(results[0].Result, WatchdogProcess.TIMEOUT_RESULT)
+
+    # ----------------------------------------------------------------------
+    def test_StopExistingMonitor(self):
+        log_filename = os.path.join(self._temp_dir, "Monitor.log")
+
+        command_line_template = '"{}" -c "import sys; open(sys.argv[1], \'a\').write(sys.argv[2] + \'\\n\')" "{}" {}'
+
+        for max_runs, expected_calls in [
+            (1, ["stop", "start", "stop"]),
+            # A running monitor may belong to another binary when runs are concurrent
+            (2, ["start", "stop"]),
+        ]:
+            if os.path.isfile(log_filename):
+                os.remove(log_filename)
+
+            with CoverageBenchmark.StubEnvironment(self._context):
+                results = CoveragePipeline.CoveragePipeline(
+                    None,
+                    None,
+                    max_runs=max_runs,
+                    start_command_line_template=command_line_template.format(sys.executable, log_filename, "start"),
+                    stop_command_line=command_line_template.format(sys.executable, log_filename, "stop"),
+                ).Execute(
+                    self._context.BinaryFilenames[:1],
+                    io.StringIO(),
+                    [self._context.Stubs["NoOp"]],
+                )
+
+            self.assertEqual(results[0].Stage, None)
+
+            with open(log_filename) as f:
+                self.assertEqual(f.read().split(), expected_calls)
+
+    # ----------------------------------------------------------------------
+    def test_InvalidCommandLines(self):
+        pipeline = CoveragePipeline.CoveragePipeline(None, None)
+
+        self.assertRaises(
+            Exception,
+            lambda: pipeline.Execute(self._context.BinaryFilenames, io.StringIO(), [None]),
+        )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetTotals(csv_filename, should_include_func=None):
+    covered = 0
+    not_covered = 0
+
+    with open(csv_filename, newline="") as f:
+        for row in csv.reader(f):
+            if should_include_func is not None and not should_include_func(row[1]):
+                continue
+
+            covered += int(row[5])
+            not_covered += int(row[6])
+
+    return covered, not_covered
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
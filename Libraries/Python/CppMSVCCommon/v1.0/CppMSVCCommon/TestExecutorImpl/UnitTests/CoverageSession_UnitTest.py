@@ -0,0 +1,178 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageSession_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 10:05:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CoverageSession.py"""
+
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl.CodeCoverageExecutor import CodeCoverageExecutor
+    from CppMSVCCommon.TestExecutorImpl.CoverageSession import CoverageSession
+
+# The benchmark creates synthetic coverage data and stand-ins for VSPerfCmd and CoverageToCsv.ps1
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", "..", "..", "..", "..", "..", "Scripts"))
+with CallOnExit(lambda: sys.path.pop(0)):
+    import CoverageBenchmark
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+        self._context = CoverageBenchmark.BenchmarkContext(
+            self._temp_dir,
+            num_methods=50,
+            num_binaries=2,
+            name_length=40,
+            num_include_patterns=0,
+            num_exclude_patterns=0,
+            pattern_shape="mixed",
+            max_workers=2,
+        )
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    # ----------------------------------------------------------------------
+    def test_Runs(self):
+        binary_filenames = self._context.BinaryFilenames
+
+        with CoverageBenchmark.StubEnvironment(self._context):
+            with CoverageSession(self._context.CoverageDirectory, io.StringIO()) as session:
+                self.assertEqual(session.Run(binary_filenames[0], self._context.Stubs["NoOp"]), 0)
+                self.assertEqual(session.Run(binary_filenames[1], self._context.Stubs["NoOp"]), 0)
+                self.assertEqual(session.Run(binary_filenames[0], self._context.Stubs["NoOp"]), 0)
+
+        self.assertEqual(
+            session.BinaryFilenames,
+            [binary_filenames[0], binary_filenames[1], binary_filenames[0]],
+        )
+        self.assertEqual([run.Result for run in session.Runs], [0, 0, 0])
+
+    # ----------------------------------------------------------------------
+    def test_RunFailure(self):
+        with CoverageBenchmark.StubEnvironment(self._context):
+            with CoverageSession(self._context.CoverageDirectory, io.StringIO()) as session:
+                result = session.Run(
+                    self._context.BinaryFilenames[0],
+                    '"{}" -c "raise SystemExit(3)"'.format(sys.executable),
+                )
+
+        self.assertEqual(result, 3)
+        self.assertEqual(session.Runs[0].Result, 3)
+
+    # ----------------------------------------------------------------------
+    def test_InactiveSession(self):
+        session = CoverageSession(self._context.CoverageDirectory, io.StringIO())
+
+        self.assertRaises(Exception, lambda: session.Run(self._context.BinaryFilenames[0]))
+
+    # ----------------------------------------------------------------------
+    def test_SameModuleName(self):
+        other_binary_filename = os.path.join(self._temp_dir, os.path.basename(self._context.BinaryFilenames[0]))
+
+        with CoverageBenchmark.StubEnvironment(self._context):
+            with CoverageSession(self._context.CoverageDirectory, io.StringIO()) as session:
+                session.Run(self._context.BinaryFilenames[0], self._context.Stubs["NoOp"])
+
+                self.assertRaises(
+                    Exception,
+                    lambda: session.Run(other_binary_filename, self._context.Stubs["NoOp"]),
+                )
+
+    # ----------------------------------------------------------------------
+    def test_StartFailure(self):
+        with CoverageBenchmark.StubEnvironment(self._context):
+            session = CoverageSession(
+                self._context.CoverageDirectory,
+                io.StringIO(),
+                start_command_line_template='"{}" -c "raise SystemExit(1)"'.format(sys.executable),
+            )
+
+            self.assertRaises(Exception, session.__enter__)
+
+    # ----------------------------------------------------------------------
+    def test_ExtractSessionCoverageInfo(self):
+        binary_filenames = self._context.BinaryFilenames
+
+        with CoverageBenchmark.StubEnvironment(self._context):
+            with CoverageSession(self._context.CoverageDirectory, io.StringIO()) as session:
+                for binary_filename in [binary_filenames[1], binary_filenames[0], binary_filenames[1]]:
+                    session.Run(binary_filename, self._context.Stubs["NoOp"])
+
+            results = CodeCoverageExecutor.ExtractSessionCoverageInfo(
+                session,
+                None,
+                None,
+                io.StringIO(),
+                max_workers=2,
+            )
+
+        # Binaries run multiple times are only extracted once
+        self.assertEqual(list(results.keys()), [binary_filenames[1], binary_filenames[0]])
+
+        for binary_filename, coverage_filename in zip(binary_filenames, self._context.CoverageFilenames):
+            result = results[binary_filename]
+
+            self.assertEqual(result.Error, None)
+            self.assertEqual(result.CoverageFilename, self._context.CoverageDirectory)
+            self.assertEqual(result.Result, _GetTotals(coverage_filename))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetTotals(csv_filename):
+    covered = 0
+    not_covered = 0
+
+    with open(csv_filename, newline="") as f:
+        for row in csv.reader(f):
+            covered += int(row[5])
+            not_covered += int(row[6])
+
+    return covered, not_covered
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
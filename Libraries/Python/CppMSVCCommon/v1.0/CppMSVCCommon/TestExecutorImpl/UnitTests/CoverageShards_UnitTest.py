@@ -0,0 +1,236 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageShards_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 13:36:28
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CoverageShards.py"""
+
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl.CodeCoverageExecutor import CodeCoverageExecutor
+    from CppMSVCCommon.TestExecutorImpl import CoverageShards
+
+# The benchmark creates stand-ins for CoverageToCsv.ps1
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", "..", "..", "..", "..", "..", "Scripts"))
+with CallOnExit(lambda: sys.path.pop(0)):
+    import CoverageBenchmark
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+        # Allow shards of any size, so that shard boundaries fall within quoted values
+        self._min_shard_size = CoverageShards.MIN_SHARD_SIZE
+        CoverageShards.MIN_SHARD_SIZE = 1
+
+        self._filename = os.path.join(self._temp_dir, "Test.exe.csv")
+
+        rows = _CreateRows(200)
+
+        with open(self._filename, "wb") as f:
+            f.write("".join(rows).encode("utf-8"))
+
+        self._record_starts = []
+        position = 0
+
+        for row in rows:
+            self._record_starts.append(position)
+            position += len(row.encode("utf-8"))
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        CoverageShards.MIN_SHARD_SIZE = self._min_shard_size
+        shutil.rmtree(self._temp_dir)
+
+    # ----------------------------------------------------------------------
+    def test_CreateShards(self):
+        size = os.path.getsize(self._filename)
+
+        # Shards begin at the start of records, even when a boundary falls within a quoted
+        # value that contains commas, quotes or newlines.
+        shards = CoverageShards.CreateShards(self._filename, size)
+
+        self.assertEqual([start for start, _ in shards], self._record_starts)
+        self.assertEqual(shards[-1][1], size)
+
+        for num_shards in [1, 2, 3, 7, 16]:
+            shards = CoverageShards.CreateShards(self._filename, num_shards)
+
+            self.assertTrue(len(shards) <= num_shards)
+            self.assertEqual(shards[0][0], 0)
+            self.assertEqual(shards[-1][1], size)
+
+            for (_, end), (start, _) in zip(shards, shards[1:]):
+                self.assertEqual(end, start)
+
+            self.assertTrue(set(start for start, _ in shards).issubset(self._record_starts))
+
+    # ----------------------------------------------------------------------
+    def test_ParseFile(self):
+        expected = _ParseSequentially(self._filename)
+
+        for max_workers in [1, 2, 3, 8]:
+            self.assertEqual(CoverageShards.ParseFile(self._filename, None, None, max_workers=max_workers), expected)
+
+        # Filtered
+        expected = _ParseSequentially(self._filename, lambda name: name.startswith("Namespace::"))
+
+        for max_workers in [1, 3]:
+            self.assertEqual(
+                CoverageShards.ParseFile(self._filename, ["Namespace::*"], None, max_workers=max_workers),
+                expected,
+            )
+
+    # ----------------------------------------------------------------------
+    def test_Error(self):
+        with open(self._filename, "wb") as f:
+            f.write("".join(_CreateRows(50) + ["The coverage file is invalid\r\n"] + _CreateRows(50)).encode("utf-8"))
+
+        expected = _ParseSequentially(self._filename)
+        self.assertEqual(expected.Error, "The coverage file is invalid")
+
+        for max_workers in [1, 4]:
+            self.assertEqual(CoverageShards.ParseFile(self._filename, None, None, max_workers=max_workers), expected)
+
+    # ----------------------------------------------------------------------
+    def test_Empty(self):
+        open(self._filename, "wb").close()
+
+        self.assertEqual(CoverageShards.CreateShards(self._filename, 4), [])
+        self.assertEqual(CoverageShards.ParseFile(self._filename, None, None, max_workers=4), (0, 0, 0, 0, None))
+
+    # ----------------------------------------------------------------------
+    def test_ExtractCoverageInfo(self):
+        # Sharded totals match the totals calculated when the converter output is streamed
+        context = CoverageBenchmark.BenchmarkContext(
+            self._temp_dir,
+            num_methods=0,
+            num_binaries=0,
+            name_length=0,
+            num_include_patterns=0,
+            num_exclude_patterns=0,
+            pattern_shape="mixed",
+            max_workers=2,
+        )
+
+        binary_filename = os.path.join(self._temp_dir, "Test.exe")
+
+        with CoverageBenchmark.StubEnvironment(context):
+            for includes, excludes in [
+                (None, None),
+                (["Namespace::*"], ["*Multi*"]),
+            ]:
+                streamed = CodeCoverageExecutor.ExtractCoverageInfo(
+                    self._filename,
+                    binary_filename,
+                    includes,
+                    excludes,
+                    io.StringIO(),
+                )
+
+                os.environ[CoverageShards.WORKERS_ENV_VAR] = "3"
+
+                try:
+                    sharded = CodeCoverageExecutor.ExtractCoverageInfo(
+                        self._filename,
+                        binary_filename,
+                        includes,
+                        excludes,
+                        io.StringIO(),
+                    )
+                finally:
+                    del os.environ[CoverageShards.WORKERS_ENV_VAR]
+
+                self.assertEqual(sharded, streamed)
+                self.assertNotEqual(sharded, (0, 0))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CreateRows(num_rows):
+    names = [
+        "Namespace::Class::Method(int, char)",
+        'Namespace::Class::operator""_suffix(const char *)',
+        "Namespace::Multi\r\nLine, name",
+        '"Quoted, "" name\r\n"',
+        "Other::Method()",
+    ]
+
+    return [
+        '"Test.exe","{}",{},{},{},{},{}\r\n'.format(
+            names[index % len(names)].replace('"', '""'),
+            index % 7,
+            index % 3,
+            index % 5,
+            index % 11,
+            index % 13,
+        )
+        for index in range(num_rows)
+    ]
+
+
+# ----------------------------------------------------------------------
+def _ParseSequentially(filename, should_include_func=None):
+    num_rows = 0
+    num_included = 0
+    covered = 0
+    not_covered = 0
+
+    with open(filename, newline="") as f:
+        for row in csv.reader(f):
+            if len(row) == 1:
+                return CoverageShards.ShardResult(num_rows, num_included, covered, not_covered, row[0])
+
+            num_rows += 1
+
+            if should_include_func is None or should_include_func(row[1]):
+                num_included += 1
+
+                covered += int(row[5])
+                not_covered += int(row[6])
+
+    return CoverageShards.ShardResult(num_rows, num_included, covered, not_covered, None)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,99 @@
+# ----------------------------------------------------------------------
+# |
+# |  TestExecutorImpl_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 19:42:11
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CppMSVCCommon.TestExecutorImpl"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+_LIBRARY_DIR                                = os.path.realpath(os.path.join(_script_dir, "..", "..", ".."))
+
+sys.path.insert(0, _LIBRARY_DIR)
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl import TestExecutorImpl
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def test_ImportIsLazy(self):
+        # Test executors are discovered on every agent, so importing the package must not
+        # import the coverage modules. This is measured in a fresh interpreter, as other
+        # tests may have imported them in this one.
+        script = textwrap.dedent(
+            """\
+            import json
+            import sys
+
+            sys.path.insert(0, {library_dir})
+
+            from CppMSVCCommon.TestExecutorImpl import TestExecutorImpl
+
+            json.dump(sorted(name for name in sys.modules if name.startswith("CppMSVCCommon.TestExecutorImpl.")), sys.stdout)
+            """,
+        ).format(
+            library_dir=repr(_LIBRARY_DIR),
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout), [])
+
+    # ----------------------------------------------------------------------
+    def test_ValidateEnvironment(self):
+        result = TestExecutorImpl.ValidateEnvironment()
+
+        if os.name == "nt":
+            self.assertEqual(result, None)
+        else:
+            self.assertEqual(result, "The '{}' test executor is only available on Windows".format(TestExecutorImpl.Name))
+
+    # ----------------------------------------------------------------------
+    def test_CodeCoverageExecutor(self):
+        from CppMSVCCommon.TestExecutorImpl.CodeCoverageExecutor import CodeCoverageExecutor
+
+        self.assertTrue(TestExecutorImpl()._CodeCoverageExecutor is CodeCoverageExecutor)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,209 @@
+# ----------------------------------------------------------------------
+# |
+# |  Timing_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 12:08:19
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for Timing.py"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl import Timing
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def test_Disabled(self):
+        self.assertFalse(Timing.IsEnabled())
+
+        with Timing.Phase("Phase", "Foo.exe") as phase:
+            self.assertFalse(phase.IsEnabled)
+
+            phase.SetCounter("rows_parsed", 10)
+            phase.SetResult(1)
+
+        # Phases aren't collected when timing isn't enabled in the parent process
+        self.assertEqual(Timing.CollectPhases(False, _Work, 1), (1, []))
+
+    # ----------------------------------------------------------------------
+    def test_CollectPhases(self):
+        result, phases = Timing.CollectPhases(True, _Work, 3)
+
+        self.assertEqual(result, 3)
+        self.assertEqual(
+            [(phase.Name, phase.BinaryFilename, phase.Succeeded, dict(phase.Counters)) for phase in phases],
+            [
+                ("Work", "Binary0.exe", True, {"value": 0}),
+                ("Work", "Binary1.exe", False, {"value": 1}),
+                ("Work", "Binary2.exe", True, {"value": 2}),
+            ],
+        )
+
+        for phase in phases:
+            self.assertEqual(phase.ProcessId, os.getpid())
+            self.assertTrue(phase.Duration >= 0)
+
+        # The sink was restored
+        self.assertFalse(Timing.IsEnabled())
+
+    # ----------------------------------------------------------------------
+    def test_Exception(self):
+        # ----------------------------------------------------------------------
+        def Func():
+            with Timing.Phase("Phase"):
+                raise Exception("Failure")
+
+        # ----------------------------------------------------------------------
+        def Invoke():
+            try:
+                Func()
+            except Exception:
+                pass
+
+        # ----------------------------------------------------------------------
+
+        _, phases = Timing.CollectPhases(True, Invoke)
+
+        self.assertEqual([(phase.Name, phase.Succeeded) for phase in phases], [("Phase", False)])
+
+    # ----------------------------------------------------------------------
+    def test_ProcessPool(self):
+        output_stream = io.StringIO()
+
+        with Timing.UseSink(Timing.SummarySink(output_stream)):
+            self.assertTrue(Timing.IsEnabled())
+
+            with ProcessPoolExecutor(2) as executor:
+                futures = [executor.submit(Timing.CollectPhases, Timing.IsEnabled(), _Work, 2) for _ in range(3)]
+
+                for future in futures:
+                    result, phases = future.result()
+
+                    self.assertEqual(result, 2)
+                    self.assertEqual(len(phases), 2)
+
+                    Timing.Replay(phases)
+
+        self.assertFalse(Timing.IsEnabled())
+
+        lines = output_stream.getvalue().splitlines()
+
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[2].split()[:3], ["Work", "6", "3"])
+        self.assertTrue(lines[2].endswith("value=3"), lines[2])
+
+    # ----------------------------------------------------------------------
+    def test_ChromeTraceSink(self):
+        temp_dir = tempfile.mkdtemp()
+
+        with CallOnExit(lambda: shutil.rmtree(temp_dir)):
+            filename = os.path.join(temp_dir, "trace.json")
+
+            with Timing.UseSink(Timing.ChromeTraceSink(filename)):
+                _Work(2)
+
+                with Timing.Phase("Other"):
+                    pass
+
+            with open(filename) as f:
+                content = json.load(f)
+
+        self.assertEqual(content["displayTimeUnit"], "ms")
+
+        events = content["traceEvents"]
+
+        self.assertEqual([event["name"] for event in events], ["Work", "Work", "Other"])
+        self.assertEqual(
+            events[1]["args"],
+            {"binary": "Binary1.exe", "succeeded": False, "value": 1},
+        )
+        self.assertEqual(events[2]["args"], {"succeeded": True})
+
+        for event in events:
+            self.assertEqual(event["ph"], "X")
+            self.assertEqual(event["pid"], os.getpid())
+            self.assertTrue(event["dur"] >= 0)
+
+    # ----------------------------------------------------------------------
+    def test_SummarySink(self):
+        output_stream = io.StringIO()
+
+        with Timing.UseSink(Timing.SummarySink(output_stream)):
+            _Work(3)
+
+            with Timing.Phase("Other"):
+                pass
+
+        lines = output_stream.getvalue().splitlines()
+
+        self.assertEqual(
+            lines[0].split(),
+            ["Phase", "Count", "Failures", "Total", "(s)", "Average", "(s)", "Min", "(s)", "Max", "(s)", "Counters"],
+        )
+        self.assertEqual(set(lines[1]), set("- "))
+
+        self.assertEqual(lines[2].split()[:3], ["Work", "3", "1"])
+        self.assertTrue(lines[2].endswith("value=3"), lines[2])
+
+        self.assertEqual(lines[3].split()[:3], ["Other", "1", "0"])
+        self.assertEqual(len(lines), 4)
+
+        # Nothing is written when no phases were completed
+        output_stream = io.StringIO()
+        Timing.SummarySink(output_stream).Close()
+
+        self.assertEqual(output_stream.getvalue(), "")
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Work(num_phases):
+    for index in range(num_phases):
+        with Timing.Phase("Work", "Binary{}.exe".format(index)) as phase:
+            phase.SetCounter("value", index)
+            phase.SetResult(index % 2)
+
+    return num_phases
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
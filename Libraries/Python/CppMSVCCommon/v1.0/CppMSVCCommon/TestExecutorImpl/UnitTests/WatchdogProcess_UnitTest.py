@@ -0,0 +1,186 @@
+# ----------------------------------------------------------------------
+# |
+# |  WatchdogProcess_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 16:42:08
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for WatchdogProcess.py"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl import WatchdogProcess
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    # ----------------------------------------------------------------------
+    def test_Output(self):
+        output_stream = io.StringIO()
+
+        result, output = WatchdogProcess.Execute(
+            _PythonCommandLine("import sys; print('one'); sys.stdout.flush(); print('two', file=sys.stderr); sys.exit(3)"),
+            output_stream,
+        )
+
+        self.assertEqual(result, 3)
+        self.assertEqual(sorted(output.split()), ["one", "two"])
+        self.assertEqual(output_stream.getvalue(), output)
+
+    # ----------------------------------------------------------------------
+    def test_NoOutputStream(self):
+        result, output = WatchdogProcess.Execute(_PythonCommandLine("print('line')"))
+
+        self.assertEqual(result, 0)
+        self.assertEqual(output, "line\n")
+
+    # ----------------------------------------------------------------------
+    def test_Timeout(self):
+        pid_filename = os.path.join(self._temp_dir, "pid")
+
+        # The sleeping process is a descendant of the shell that is launched
+        start_time = time.perf_counter()
+
+        result, output = WatchdogProcess.Execute(
+            _PythonCommandLine(
+                "import os, sys, time; open(sys.argv[1], 'w').write(str(os.getpid())); print('started'); sys.stdout.flush(); time.sleep(30)",
+                pid_filename,
+            ),
+            timeout=1,
+        )
+
+        self.assertTrue(time.perf_counter() - start_time < 15)
+
+        self.assertEqual(result, WatchdogProcess.TIMEOUT_RESULT)
+        self.assertTrue(output.startswith("started\n"), output)
+        self.assertTrue("did not complete within 1 seconds; the process was terminated." in output, output)
+
+        with open(pid_filename) as f:
+            pid = int(f.read())
+
+        self.assertTrue(_WaitForExit(pid), pid)
+
+    # ----------------------------------------------------------------------
+    def test_IdleTimeout(self):
+        result, output = WatchdogProcess.Execute(
+            _PythonCommandLine("import sys, time; print('started'); sys.stdout.flush(); time.sleep(30)"),
+            timeout=20,
+            idle_timeout=1,
+        )
+
+        self.assertEqual(result, WatchdogProcess.TIMEOUT_RESULT)
+        self.assertTrue("did not write output for 1 seconds" in output, output)
+
+    # ----------------------------------------------------------------------
+    def test_NoTimeout(self):
+        result, output = WatchdogProcess.Execute(
+            _PythonCommandLine("import time; time.sleep(0.5); print('done')"),
+            timeout=20,
+            idle_timeout=20,
+        )
+
+        self.assertEqual(result, 0)
+        self.assertEqual(output, "done\n")
+
+    # ----------------------------------------------------------------------
+    def test_OutputFilesRemoved(self):
+        before = set(_GetOutputFilenames())
+
+        WatchdogProcess.Execute(_PythonCommandLine("print('line')"))
+        WatchdogProcess.Execute(_PythonCommandLine("import time; time.sleep(30)"), timeout=0.5)
+
+        self.assertEqual(set(_GetOutputFilenames()) - before, set())
+
+    # ----------------------------------------------------------------------
+    def test_RemoveFile(self):
+        filename = os.path.join(self._temp_dir, "File{}".format(WatchdogProcess.OUTPUT_FILE_SUFFIX))
+
+        with open(filename, "w") as f:
+            f.write("content")
+
+        self.assertTrue(WatchdogProcess.RemoveFile(filename))
+        self.assertFalse(os.path.isfile(filename))
+
+        # Files that don't exist are considered to be removed
+        self.assertTrue(WatchdogProcess.RemoveFile(filename))
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _PythonCommandLine(code, *args):
+    return '"{}" -c "{}"{}'.format(
+        sys.executable,
+        code,
+        "".join(' "{}"'.format(arg) for arg in args),
+    )
+
+
+# ----------------------------------------------------------------------
+def _GetOutputFilenames():
+    return [filename for filename in os.listdir(tempfile.gettempdir()) if filename.endswith(WatchdogProcess.OUTPUT_FILE_SUFFIX)]
+
+
+# ----------------------------------------------------------------------
+def _WaitForExit(pid, timeout=10):
+    if sys.platform.startswith("win"):
+        # os.kill terminates the process on Windows rather than checking for it
+        return True
+
+    start_time = time.perf_counter()
+
+    while time.perf_counter() - start_time < timeout:
+        try:
+            os.kill(pid, 0)
+        except (ProcessLookupError, PermissionError):
+            return True
+
+        time.sleep(0.1)
+
+    return False
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
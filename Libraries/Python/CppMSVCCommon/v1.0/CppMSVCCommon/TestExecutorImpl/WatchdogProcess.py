@@ -0,0 +1,285 @@
+# ----------------------------------------------------------------------
+# |
+# |  WatchdogProcess.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 22:18:05
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Runs commands whose output can't be read through pipes, with timeouts.
+
+VSPerfCmd.exe doesn't send an EOF before terminating during startup, which causes
+pipe-based process execution to hang forever. Output is therefore redirected to a
+temporary file, which is read incrementally while the process runs. The process
+(and its descendants) are killed when it runs for longer than the timeout or when
+it doesn't write any output for longer than the idle timeout.
+
+Output files are removed once the process has exited. The file may remain in
+use for a short time after the process exits (presumably by a descendant of the
+process), so removal is retried and, if the file is still locked, deferred until
+the next invocation or until this process exits. Files that were left behind by
+processes that terminated unexpectedly are removed once they are old enough.
+"""
+
+import atexit
+import codecs
+import locale
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+import CommonEnvironment
+
+from CppMSVCCommon.TestExecutorImpl import ProcessTree
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Result code returned when the process is killed because it exceeded a timeout
+TIMEOUT_RESULT                              = -2
+
+DEFAULT_POLL_INTERVAL                       = 0.1
+
+# Output files older than this (in seconds) are considered to have been left behind
+STALE_FILE_AGE                              = 60 * 60
+
+OUTPUT_FILE_SUFFIX                          = ".WatchdogProcess.output"
+
+_REMOVE_ATTEMPTS                            = 5
+_REMOVE_RETRY_DELAY                         = 0.1
+
+_READ_SIZE                                  = 64 * 1024
+
+
+# ----------------------------------------------------------------------
+def Execute(
+    command_line,
+    output_stream=None,
+    timeout=None,
+    idle_timeout=None,
+    poll_interval=DEFAULT_POLL_INTERVAL,
+):
+    """\
+    Runs the command with its output redirected to a temporary file; returns
+    (result, output).
+
+    Output is written to `output_stream` (if provided) as it is produced. The
+    result is TIMEOUT_RESULT if the process exceeded `timeout` seconds or didn't
+    produce output for `idle_timeout` seconds; timeouts are disabled when None.
+    """
+
+    _RemoveDeferredFiles()
+    _RemoveStaleFiles()
+
+    fd, temp_filename = tempfile.mkstemp(suffix=OUTPUT_FILE_SUFFIX)
+
+    # The file is opened by the shell
+    os.close(fd)
+
+    output = []
+    timeout_message = None
+
+    try:
+        process = subprocess.Popen(
+            '{} > "{}" 2>&1'.format(command_line, temp_filename),
+            shell=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **ProcessTree.GetCreateKwargs()
+        )
+
+        try:
+            with open(temp_filename, "rb") as f:
+                reader = _OutputReader(f)
+
+                start_time = time.perf_counter()
+                last_output_time = start_time
+
+                while True:
+                    is_complete = process.poll() is not None
+
+                    content = reader.Read(is_complete)
+                    if content:
+                        output.append(content)
+
+                        if output_stream is not None:
+                            output_stream.write(content)
+
+                        last_output_time = time.perf_counter()
+
+                    if is_complete:
+                        break
+
+                    current_time = time.perf_counter()
+
+                    if timeout is not None and current_time - start_time > timeout:
+                        timeout_message = "'{}' did not complete within {} seconds".format(command_line, timeout)
+                    elif idle_timeout is not None and current_time - last_output_time > idle_timeout:
+                        timeout_message = "'{}' did not write output for {} seconds".format(command_line, idle_timeout)
+
+                    if timeout_message is not None:
+                        ProcessTree.Kill(process)
+                        process.wait()
+
+                        content = reader.Read(True)
+                        if content:
+                            output.append(content)
+
+                            if output_stream is not None:
+                                output_stream.write(content)
+
+                        break
+
+                    time.sleep(poll_interval)
+
+        finally:
+            if process.poll() is None:
+                ProcessTree.Kill(process)
+                process.wait()
+
+    finally:
+        RemoveFile(temp_filename)
+
+    if timeout_message is not None:
+        timeout_message = "{}; the process was terminated.\n".format(timeout_message)
+
+        output.append(timeout_message)
+
+        if output_stream is not None:
+            output_stream.write(timeout_message)
+
+        return TIMEOUT_RESULT, "".join(output)
+
+    return process.returncode, "".join(output)
+
+
+# ----------------------------------------------------------------------
+def RemoveFile(filename):
+    """\
+    Removes the file, retrying while it is in use; removal is deferred if the file
+    is still in use after the final attempt. Returns True if the file was removed.
+    """
+
+    for attempt in range(_REMOVE_ATTEMPTS):
+        try:
+            os.remove(filename)
+            return True
+
+        except FileNotFoundError:
+            return True
+
+        except OSError:
+            if attempt + 1 != _REMOVE_ATTEMPTS:
+                time.sleep(_REMOVE_RETRY_DELAY)
+
+    with _deferred_lock:
+        _deferred_filenames.add(filename)
+
+    return False
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+_deferred_filenames                         = set()
+_deferred_lock                              = threading.Lock()
+
+_stale_files_removed                        = False
+
+
+# ----------------------------------------------------------------------
+class _OutputReader(object):
+    """Incrementally decodes content appended to a file, normalizing newlines"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, f):
+        self._file                          = f
+        self._decoder                       = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace")
+        self._pending_cr                    = False
+
+    # ----------------------------------------------------------------------
+    def Read(self, is_final):
+        chunks = []
+
+        while True:
+            data = self._file.read(_READ_SIZE)
+            if not data:
+                break
+
+            chunks.append(data)
+
+        content = self._decoder.decode(b"".join(chunks), final=is_final)
+
+        if self._pending_cr:
+            content = "\r" + content
+            self._pending_cr = False
+
+        # A '\r\n' sequence may be split across reads
+        if content.endswith("\r") and not is_final:
+            content = content[:-1]
+            self._pending_cr = True
+
+        return content.replace("\r\n", "\n").replace("\r", "\n")
+
+
+# ----------------------------------------------------------------------
+def _RemoveDeferredFiles():
+    with _deferred_lock:
+        filenames = list(_deferred_filenames)
+
+    for filename in filenames:
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Still in use
+            continue
+
+        with _deferred_lock:
+            _deferred_filenames.discard(filename)
+
+
+# ----------------------------------------------------------------------
+def _RemoveStaleFiles():
+    global _stale_files_removed
+
+    if _stale_files_removed:
+        return
+
+    _stale_files_removed = True
+
+    threshold = time.time() - STALE_FILE_AGE
+
+    try:
+        with os.scandir(tempfile.gettempdir()) as entries:
+            for entry in entries:
+                if not entry.name.endswith(OUTPUT_FILE_SUFFIX):
+                    continue
+
+                try:
+                    if entry.stat().st_mtime < threshold:
+                        os.remove(entry.path)
+                except OSError:
+                    # Removed by another process or still in use
+                    pass
+
+    except OSError:
+        pass
+
+
+# ----------------------------------------------------------------------
+atexit.register(_RemoveDeferredFiles)
@@ -13,16 +13,20 @@
 # |  http://www.boost.org/LICENSE_1_0.txt.
 # |
 # ----------------------------------------------------------------------
-"""Contains the TestExecutorImpl object"""
+"""\
+Contains the TestExecutorImpl object.
+
+Test executors are discovered (and imported) on every agent, including agents
+where this executor isn't supported; CodeCoverageExecutor and its dependencies
+are only imported when the executor is first used.
+"""
 
 import os
 
 import CommonEnvironment
 from CommonEnvironment import Interface
-from CommonEnvironment.Shell.All import CurrentShell
 
 from CppCommon.TestExecutorImpl import TestExecutorImpl as TestExecutorImplBase
-from CppMSVCCommon.TestExecutorImpl.CodeCoverageExecutor import CodeCoverageExecutor as MSVCCodeCoverageExecutor
 
 # ----------------------------------------------------------------------
 _script_fullpath                            = CommonEnvironment.ThisFullpath()
@@ -33,12 +37,16 @@ _script_dir, _script_name                   = os.path.split(_script_fullpath)
 class TestExecutorImpl(TestExecutorImplBase):
     # ----------------------------------------------------------------------
     # |  Methods
-    @staticmethod
+    @classmethod
     @Interface.override
-    def ValidateEnvironment():
-        if CurrentShell.CategoryName != "Windows":
+    def ValidateEnvironment(cls):
+        # `os.name` is equivalent to `CurrentShell.CategoryName == "Windows"` here and doesn't
+        # require the shell implementations to be imported.
+        if os.name != "nt":
             return "The '{}' test executor is only available on Windows".format(cls.Name)
 
+        return None
+
     # ----------------------------------------------------------------------
     @staticmethod
     @Interface.override
@@ -46,4 +54,10 @@ class TestExecutorImpl(TestExecutorImplBase):
         return compiler.Name in ["CMake"]
 
     # ----------------------------------------------------------------------
-    _CodeCoverageExecutor                   = Interface.DerivedProperty(MSVCCodeCoverageExecutor)
+    # |  Properties
+    @property
+    def _CodeCoverageExecutor(self):
+        # Imported here so that the coverage modules are only loaded when the executor is used
+        from CppMSVCCommon.TestExecutorImpl.CodeCoverageExecutor import CodeCoverageExecutor
+
+        return CodeCoverageExecutor
@@ -0,0 +1,224 @@
+# ----------------------------------------------------------------------
+# |
+# |  SourceCoverageIndex_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 14:10:33
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for SourceCoverageIndex.py"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", ".."))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.SourceCoverageIndex import SourceCoverageIndex, FileCoverage, CheckChangedFiles, IsRegression
+    from CppMSVCCommon.TestExecutorImpl.CoverageResults import CoverageResults
+
+
+# ----------------------------------------------------------------------
+class StandardSuite(unittest.TestCase):
+    # ----------------------------------------------------------------------
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._index = SourceCoverageIndex(os.path.join(self._temp_dir, "index"))
+
+        self._binary1 = self._CreateFile("One.exe")
+        self._binary2 = self._CreateFile("Two.exe")
+        self._coverage1 = self._CreateFile("One.coverage")
+        self._coverage2 = self._CreateFile("Two.coverage")
+
+        self._source = os.path.join(self._temp_dir, "File.cpp")
+        self._other_source = os.path.join(self._temp_dir, "Other.cpp")
+
+    # ----------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    # ----------------------------------------------------------------------
+    def test_Scopes(self):
+        # Methods with the same name in different classes are different methods, and
+        # overloads (rows with the same scope) are summed.
+        self._index.Record(
+            self._binary1,
+            self._coverage1,
+            None,
+            None,
+            self._CreateResults(
+                "One.exe",
+                [
+                    ("Namespace", "Class1", "Init()", 1, 2, self._source),
+                    ("Namespace", "Class2", "Init()", 2, 4, self._source),
+                    ("Namespace", "Class2", "Method()", 1, 0, self._source),
+                    ("Namespace", "Class2", "Method()", 0, 1, self._source),
+                    ("Namespace", "Class2", "Other()", 5, 5, self._other_source),
+                    ("Namespace", "Class2", "Unknown()", 5, 5, ""),
+                ],
+            ),
+        )
+
+        self.assertEqual(
+            self._index.GetFileCoverage([self._source, self._other_source, self._CreateFile("Missing.cpp")]),
+            [
+                FileCoverage(os.path.normcase(os.path.realpath(self._source)), None, None, 4, 7),
+                FileCoverage(os.path.normcase(os.path.realpath(self._other_source)), None, None, 5, 5),
+            ],
+        )
+
+    # ----------------------------------------------------------------------
+    def test_MultipleBinaries(self):
+        # Overloads are summed within each binary before the best coverage is taken across binaries
+        self._index.Record(
+            self._binary1,
+            self._coverage1,
+            None,
+            None,
+            self._CreateResults(
+                "One.exe",
+                [
+                    ("", "Class", "Method()", 2, 0, self._source),
+                    ("", "Class", "Method()", 1, 1, self._source),
+                    ("", "Class", "Other()", 0, 2, self._source),
+                ],
+            ),
+        )
+
+        self._index.Record(
+            self._binary2,
+            self._coverage2,
+            None,
+            None,
+            self._CreateResults(
+                "Two.exe",
+                [
+                    ("", "Class", "Method()", 1, 5, self._source),
+                    ("", "Other", "Method()", 4, 0, self._source),
+                ],
+            ),
+        )
+
+        file_coverage = self._index.GetFileCoverage([self._source])[0]
+
+        self.assertEqual((file_coverage.CurrentCovered, file_coverage.CurrentNotCovered), (3 + 0 + 4, 3 + 2 + 0))
+
+        # Recording a binary again replaces its methods
+        self._index.Record(self._binary2, self._coverage2, None, None, CoverageResults())
+
+        file_coverage = self._index.GetFileCoverage([self._source])[0]
+
+        self.assertEqual((file_coverage.CurrentCovered, file_coverage.CurrentNotCovered), (3, 3))
+
+    # ----------------------------------------------------------------------
+    def test_IsRecorded(self):
+        self.assertFalse(self._index.IsRecorded(self._binary1, self._coverage1, None, None))
+
+        self._index.Record(self._binary1, self._coverage1, ["*"], None, CoverageResults())
+
+        self.assertTrue(self._index.IsRecorded(self._binary1, self._coverage1, ["*"], None))
+        self.assertFalse(self._index.IsRecorded(self._binary1, self._coverage1, None, None))
+        self.assertFalse(self._index.IsRecorded(self._binary1, self._coverage2, ["*"], None))
+
+        with open(self._coverage1, "a") as f:
+            f.write("changed")
+
+        self.assertFalse(self._index.IsRecorded(self._binary1, self._coverage1, ["*"], None))
+
+    # ----------------------------------------------------------------------
+    def test_CheckChangedFiles(self):
+        self._index.Record(
+            self._binary1,
+            self._coverage1,
+            None,
+            None,
+            self._CreateResults("One.exe", [("", "Class", "Method()", 3, 1, self._source)]),
+        )
+
+        # The first check establishes the baseline
+        self.assertEqual(CheckChangedFiles(self._index, [self._source], io.StringIO()), 0)
+        self.assertEqual(self._index.GetFileCoverage([self._source])[0].BaselineCovered, 3)
+
+        # Coverage regressed
+        with open(self._coverage1, "a") as f:
+            f.write("changed")
+
+        extracted = []
+
+        # ----------------------------------------------------------------------
+        def Extract(coverage_filename, binary_filename, includes, excludes, output_stream):
+            extracted.append(binary_filename)
+            return self._CreateResults("One.exe", [("", "Class", "Method()", 1, 3, self._source)])
+
+        # ----------------------------------------------------------------------
+
+        output_stream = io.StringIO()
+
+        self.assertEqual(CheckChangedFiles(self._index, [self._source], output_stream, Extract), -1)
+        self.assertEqual(len(extracted), 1)
+        self.assertTrue("Code coverage regressed" in output_stream.getvalue())
+
+        # The binary isn't extracted again once it has been recorded
+        self.assertEqual(CheckChangedFiles(self._index, [self._source], io.StringIO(), Extract), -1)
+        self.assertEqual(len(extracted), 1)
+
+    # ----------------------------------------------------------------------
+    def test_IsRegression(self):
+        self.assertFalse(IsRegression(FileCoverage("File.cpp", None, None, 0, 10)))
+        self.assertFalse(IsRegression(FileCoverage("File.cpp", 1, 1, 2, 2)))
+        self.assertFalse(IsRegression(FileCoverage("File.cpp", 1, 1, 3, 1)))
+        self.assertTrue(IsRegression(FileCoverage("File.cpp", 1, 1, 1, 2)))
+        self.assertTrue(IsRegression(FileCoverage("File.cpp", 1, 0, 0, 0)))
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _CreateFile(self, name):
+        filename = os.path.join(self._temp_dir, name)
+
+        with open(filename, "w") as f:
+            f.write(name)
+
+        return filename
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _CreateResults(module, methods):
+        results = CoverageResults()
+
+        for namespace, class_name, name, covered, not_covered, source_file in methods:
+            results.Append(module, name, [covered, 0, not_covered, covered, not_covered], namespace, class_name, source_file)
+
+        return results
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(
+            unittest.main(
+                verbosity=2,
+            ),
+        )
+    except KeyboardInterrupt:
+        pass
@@ -27,6 +27,11 @@ _script_fullpath                            = CommonEnvironmentImports.CommonEnv
 _script_dir, _script_name                   = os.path.split(_script_fullpath)
 # ----------------------------------------------------------------------
 
+sys.path.insert(0, os.path.join(_script_dir, "Libraries", "Python", "CppMSVCCommon", "v1.0"))
+from CppMSVCCommon import SourceCoverageIndex
+
+del sys.path[0]
+
 # <Unused argument> pylint: disable = W0613
 
 # ----------------------------------------------------------------------
@@ -41,7 +46,21 @@ def OnCommitting(data, output_stream):
     doesn't include the value, it will only be called once.
     """
 
-    return
+    # Coverage is only checked when the index has been populated by earlier extractions
+    # (see CppMSVCCommon.SourceCoverageIndex).
+    index = SourceCoverageIndex.SourceCoverageIndex.GetDefault()
+    if index is None:
+        return
+
+    changed_filenames = [
+        filename if os.path.isabs(filename) else os.path.join(_script_dir, filename)
+        for filename in list(getattr(data, "modified", None) or []) + list(getattr(data, "added", None) or [])
+    ]
+
+    if not changed_filenames:
+        return
+
+    return SourceCoverageIndex.CheckChangedFiles(index, changed_filenames, output_stream)
 
 
 # ----------------------------------------------------------------------
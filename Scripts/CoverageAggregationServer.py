@@ -0,0 +1,91 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageAggregationServer.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 23:14:02
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Runs a local coverage aggregation server that merges per-method coverage submitted
+by build agents (see CppMSVCCommon.TestExecutorImpl.CoverageAggregation).
+"""
+
+import os
+import sys
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+from CommonEnvironment import CommandLine
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "Libraries", "Python", "CppMSVCCommon", "v1.0"))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon.TestExecutorImpl.CoverageAggregation import CoverageAggregationServer
+    from CppMSVCCommon.TestExecutorImpl.CoverageResults import KEY_NAME, KEYS
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint(
+    port=CommandLine.EntryPoint.Parameter("Port to listen on (0 to use any available port)"),
+    key=CommandLine.EntryPoint.Parameter("Aligns methods by name or by module and name"),
+)
+@CommandLine.Constraints(
+    port=CommandLine.IntTypeInfo(
+        min=0,
+        max=65535,
+        arity="?",
+    ),
+    key=CommandLine.EnumTypeInfo(
+        list(KEYS),
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Execute(
+    port=0,
+    key=KEY_NAME,
+    output_stream=sys.stdout,
+):
+    """Runs the server until interrupted"""
+
+    server = CoverageAggregationServer(
+        port=port,
+        key=key,
+    )
+
+    with CallOnExit(server.Stop):
+        output_stream.write("Listening on {}:{}...\n".format(*server.Address))
+        output_stream.flush()
+
+        try:
+            server.ServeForever()
+        except KeyboardInterrupt:
+            pass
+
+    output_stream.write(
+        "{} methods were aggregated.\n".format(server.Aggregator.NumMethods),
+    )
+
+    return 0
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass
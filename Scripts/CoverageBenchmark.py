@@ -0,0 +1,843 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoverageBenchmark.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 17:20:04
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2019-22
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Benchmarks code coverage extraction with synthetic data.
+
+CoverageToCsv.ps1, vsinstr and VSPerfCmd are replaced by stub scripts (via the
+environment variables that each component honors), so the benchmark runs on
+any platform and only measures the Python side of the pipeline.
+
+Results are compared to a baseline file when one is provided; a non-zero
+result code is returned if throughput or peak memory regressed by more than
+the tolerance.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import time
+import tracemalloc
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+from CommonEnvironment import CommandLine
+from CommonEnvironment import Interface
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+sys.path.insert(0, os.path.join(_script_dir, "..", "Libraries", "Python", "CppMSVCCommon", "v1.0"))
+with CallOnExit(lambda: sys.path.pop(0)):
+    from CppMSVCCommon import SourceCoverageIndex
+    from CppMSVCCommon.TestExecutorImpl import CoverageCache
+    from CppMSVCCommon.TestExecutorImpl import CoverageConverter
+    from CppMSVCCommon.TestExecutorImpl import CoverageSession
+    from CppMSVCCommon.TestExecutorImpl import CoverageShards
+    from CppMSVCCommon.TestExecutorImpl import InstrumentationManifest
+    from CppMSVCCommon.TestExecutorImpl import Timing
+    from CppMSVCCommon.TestExecutorImpl.CodeCoverageExecutor import CodeCoverageExecutor
+    from CppMSVCCommon.TestExecutorImpl.CoverageIndex import CoverageIndex
+
+# ----------------------------------------------------------------------
+PATTERN_SHAPES                              = ["prefix", "suffix", "contains", "exact", "mixed"]
+
+SCENARIOS                                   = OrderedDict(
+    [
+        ("ExtractCoverageInfo", "Totals for each binary"),
+        ("ExtractMethodCoverageInfo", "Per-method results for each binary"),
+        ("ExtractCoverageInfoBatch", "Totals for all binaries on a process pool"),
+        ("ExtractCoverageInfo (cached)", "Totals for each binary from a warm cache"),
+        ("ExtractCoverageInfo (sharded)", "Totals for each binary, parsing the converter output in shards on a process pool"),
+        ("CoverageIndex", "Index per-method results and calculate namespace and prefix totals"),
+        ("Pipeline", "Instrument, run within a session and extract all binaries"),
+    ],
+)
+
+_BASELINE_VERSION                           = 1
+
+_NUM_NAMESPACES                             = 16
+_NUM_CLASSES                                = 256
+
+# ----------------------------------------------------------------------
+# Stubs; coverage files contain the synthetic output for a module. When the coverage
+# "file" is a directory (as is the case for sessions), it contains a file for each module.
+_STUB_CONVERTER                             = textwrap.dedent(
+    """\
+    import os
+    import shutil
+    import sys
+
+    coverage_filename = sys.argv[1]
+    if os.path.isdir(coverage_filename):
+        coverage_filename = os.path.join(coverage_filename, "{}.csv".format(sys.argv[2]))
+
+    with open(coverage_filename, "rb") as f:
+        shutil.copyfileobj(f, sys.stdout.buffer, 1024 * 1024)
+    """,
+)
+
+_STUB_BATCH_CONVERTER                       = textwrap.dedent(
+    """\
+    import os
+    import shutil
+    import sys
+
+    with open(sys.argv[1]) as f:
+        jobs = [line.rstrip("\\n").split("\\t") for line in f if line.strip()]
+
+    out = sys.stdout.buffer
+
+    for index, (coverage_filename, module_name) in enumerate(jobs):
+        out.write("{},{}\\n".format(sys.argv[2], index).encode("utf-8"))
+
+        if os.path.isdir(coverage_filename):
+            coverage_filename = os.path.join(coverage_filename, "{}.csv".format(module_name))
+
+        with open(coverage_filename, "rb") as f:
+            shutil.copyfileobj(f, out, 1024 * 1024)
+
+        out.write("{},{}\\n".format(sys.argv[3], index).encode("utf-8"))
+    """,
+)
+
+_STUB_INSTRUMENT                            = textwrap.dedent(
+    """\
+    import shutil
+    import sys
+
+    shutil.copyfile(sys.argv[1], sys.argv[1] + ".orig")
+
+    with open(sys.argv[1], "ab") as f:
+        f.write(b"instrumented")
+    """,
+)
+
+_STUB_NOOP                                  = "import sys\n"
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint(
+    baseline_filename=CommandLine.EntryPoint.Parameter("Baseline to compare against (created if it doesn't exist)"),
+    update_baseline=CommandLine.EntryPoint.Parameter("Overwrite the baseline with these results"),
+    scenario=CommandLine.EntryPoint.Parameter("Scenarios to run (all scenarios are run by default)"),
+    methods=CommandLine.EntryPoint.Parameter("Number of methods in each binary"),
+    binaries=CommandLine.EntryPoint.Parameter("Number of binaries"),
+    name_length=CommandLine.EntryPoint.Parameter("Approximate length of each method name"),
+    include_patterns=CommandLine.EntryPoint.Parameter("Number of include patterns"),
+    exclude_patterns=CommandLine.EntryPoint.Parameter("Number of exclude patterns"),
+    pattern_shape=CommandLine.EntryPoint.Parameter("Shape of the generated patterns"),
+    iterations=CommandLine.EntryPoint.Parameter("Number of timed iterations for each scenario; the fastest is reported"),
+    max_workers=CommandLine.EntryPoint.Parameter("Number of workers for scenarios that use a process pool"),
+    tolerance=CommandLine.EntryPoint.Parameter("Fractional change from the baseline that is considered a regression"),
+    trace_filename=CommandLine.EntryPoint.Parameter("Write phase timings as a Chrome trace"),
+)
+@CommandLine.Constraints(
+    baseline_filename=CommandLine.FilenameTypeInfo(
+        ensure_exists=False,
+        arity="?",
+    ),
+    scenario=CommandLine.EnumTypeInfo(
+        list(SCENARIOS.keys()),
+        arity="*",
+    ),
+    methods=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    binaries=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    name_length=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    include_patterns=CommandLine.IntTypeInfo(
+        min=0,
+        arity="?",
+    ),
+    exclude_patterns=CommandLine.IntTypeInfo(
+        min=0,
+        arity="?",
+    ),
+    pattern_shape=CommandLine.EnumTypeInfo(
+        PATTERN_SHAPES,
+        arity="?",
+    ),
+    iterations=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    tolerance=CommandLine.FloatTypeInfo(
+        min=0.0,
+        arity="?",
+    ),
+    trace_filename=CommandLine.FilenameTypeInfo(
+        ensure_exists=False,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Execute(
+    baseline_filename=None,
+    update_baseline=False,
+    scenario=None,
+    methods=100000,
+    binaries=4,
+    name_length=60,
+    include_patterns=8,
+    exclude_patterns=4,
+    pattern_shape="mixed",
+    iterations=3,
+    max_workers=None,
+    tolerance=0.2,
+    trace_filename=None,
+    output_stream=sys.stdout,
+):
+    """Benchmarks code coverage extraction"""
+
+    scenarios = scenario or list(SCENARIOS.keys())
+    del scenario
+
+    parameters = OrderedDict(
+        [
+            ("methods", methods),
+            ("binaries", binaries),
+            ("name_length", name_length),
+            ("include_patterns", include_patterns),
+            ("exclude_patterns", exclude_patterns),
+            ("pattern_shape", pattern_shape),
+        ],
+    )
+
+    temp_directory = tempfile.mkdtemp(prefix="CoverageBenchmark.")
+
+    with CallOnExit(lambda: shutil.rmtree(temp_directory, ignore_errors=True)):
+        output_stream.write("Generating synthetic data...")
+        output_stream.flush()
+
+        start_time = time.perf_counter()
+
+        context = BenchmarkContext(
+            temp_directory,
+            methods,
+            binaries,
+            name_length,
+            include_patterns,
+            exclude_patterns,
+            pattern_shape,
+            max_workers,
+        )
+
+        output_stream.write(
+            "DONE ({:.2f}s, {} rows, {:.1f} MB)\n\n".format(
+                time.perf_counter() - start_time,
+                context.NumRows,
+                context.NumBytes / (1024.0 * 1024.0),
+            ),
+        )
+
+        results = OrderedDict()
+        phase_sink = _PhaseCollectorSink(trace_filename)
+
+        with Timing.UseSink(phase_sink), StubEnvironment(context):
+            for scenario_name in scenarios:
+                output_stream.write("{}...".format(scenario_name))
+                output_stream.flush()
+
+                results[scenario_name] = _RunScenario(context, scenario_name, iterations, phase_sink)
+
+                output_stream.write(
+                    "DONE ({:,.0f} rows/s)\n".format(results[scenario_name]["rows_per_second"]),
+                )
+
+    output_stream.write("\n")
+    _WriteResults(results, output_stream)
+
+    if baseline_filename is None:
+        return 0
+
+    if update_baseline or not os.path.isfile(baseline_filename):
+        with open(baseline_filename, "w") as f:
+            json.dump(
+                OrderedDict(
+                    [
+                        ("version", _BASELINE_VERSION),
+                        ("parameters", parameters),
+                        ("scenarios", results),
+                    ],
+                ),
+                f,
+                indent=2,
+            )
+
+        output_stream.write("\nThe baseline has been written to '{}'.\n".format(baseline_filename))
+        return 0
+
+    with open(baseline_filename) as f:
+        baseline = json.load(f)
+
+    if baseline.get("version") != _BASELINE_VERSION or baseline.get("parameters") != parameters:
+        output_stream.write(
+            "\nThe baseline was created with different parameters and can't be compared; run with 'update_baseline' to replace it.\n",
+        )
+        return -1
+
+    return _CompareToBaseline(results, baseline["scenarios"], tolerance, output_stream)
+
+
+# ----------------------------------------------------------------------
+class BenchmarkContext(object):
+    """Synthetic data and stubs for a benchmark run (also used by the unit tests)"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        temp_directory,
+        num_methods,
+        num_binaries,
+        name_length,
+        num_include_patterns,
+        num_exclude_patterns,
+        pattern_shape,
+        max_workers,
+    ):
+        self.MaxWorkers                     = max_workers
+
+        self.CoverageDirectory              = os.path.join(temp_directory, "coverage")
+        self.BinaryDirectory                = os.path.join(temp_directory, "binaries")
+        self.StubDirectory                  = os.path.join(temp_directory, "stubs")
+        self.CacheDirectory                 = os.path.join(temp_directory, "cache")
+
+        for directory in [self.CoverageDirectory, self.BinaryDirectory, self.StubDirectory]:
+            os.makedirs(directory)
+
+        # Data
+        names = [_CreateMethodName(index, name_length) for index in range(num_methods)]
+
+        self.BinaryFilenames                = []
+        self.CoverageFilenames              = []
+        self.NumBytes                       = 0
+
+        for binary_index in range(num_binaries):
+            module_name = "Test{}.exe".format(binary_index)
+
+            binary_filename = os.path.join(self.BinaryDirectory, module_name)
+
+            with open(binary_filename, "wb") as f:
+                f.write(os.urandom(64 * 1024))
+
+            self.BinaryFilenames.append(binary_filename)
+
+            csv_filename = os.path.join(self.CoverageDirectory, "{}.csv".format(module_name))
+
+            with open(csv_filename, "w", newline="") as f:
+                for method_index, name in enumerate(names):
+                    f.write(_CreateRow(module_name, name, binary_index, method_index))
+
+            self.CoverageFilenames.append(csv_filename)
+            self.NumBytes += os.path.getsize(csv_filename)
+
+        self.NumRows                        = num_methods * num_binaries
+
+        self.Includes                       = _CreatePatterns(names, num_include_patterns, pattern_shape, 0)
+        self.Excludes                       = _CreatePatterns(names, num_exclude_patterns, pattern_shape, num_include_patterns)
+
+        self.ScopeIncludes                  = _CreateScopePrefixes(num_include_patterns, 0)
+        self.ScopeExcludes                  = _CreateScopePrefixes(num_exclude_patterns, num_include_patterns)
+
+        # Stubs
+        self.Stubs                          = {}
+
+        for name, content in [
+            ("Converter", _STUB_CONVERTER),
+            ("BatchConverter", _STUB_BATCH_CONVERTER),
+            ("Instrument", _STUB_INSTRUMENT),
+            ("NoOp", _STUB_NOOP),
+        ]:
+            filename = os.path.join(self.StubDirectory, "{}.py".format(name))
+
+            with open(filename, "w") as f:
+                f.write(content)
+
+            self.Stubs[name] = '"{}" "{}"'.format(sys.executable, filename)
+
+    # ----------------------------------------------------------------------
+    def ResetBinaries(self):
+        """Restores the binaries to their uninstrumented state"""
+
+        for binary_filename in self.BinaryFilenames:
+            original_filename = "{}.orig".format(binary_filename)
+
+            if os.path.isfile(original_filename):
+                os.replace(original_filename, binary_filename)
+
+            manifest_filename = InstrumentationManifest.GetManifestFilename(binary_filename)
+
+            if os.path.isfile(manifest_filename):
+                os.remove(manifest_filename)
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def StubEnvironment(context):
+    """Replaces the external tools with the stubs in `context` while active"""
+
+    values = {
+        CoverageConverter.COMMAND_LINE_TEMPLATE_ENV_VAR: '{} "{{coverage}}" "{{module}}"'.format(context.Stubs["Converter"]),
+        CoverageConverter.BATCH_COMMAND_LINE_TEMPLATE_ENV_VAR: '{} "{{batch}}" "{}" "{}"'.format(
+            context.Stubs["BatchConverter"],
+            CoverageConverter.BATCH_BEGIN_FRAME,
+            CoverageConverter.BATCH_END_FRAME,
+        ),
+        InstrumentationManifest.COMMAND_LINE_TEMPLATE_ENV_VAR: '{} "{{binary}}"'.format(context.Stubs["Instrument"]),
+        CoverageSession.START_COMMAND_LINE_TEMPLATE_ENV_VAR: '{} "{{coverage}}"'.format(context.Stubs["NoOp"]),
+        CoverageSession.STOP_COMMAND_LINE_ENV_VAR: context.Stubs["NoOp"],
+        CoverageCache.CACHE_DIR_ENV_VAR: None,
+        CoverageShards.WORKERS_ENV_VAR: None,
+        SourceCoverageIndex.INDEX_DIR_ENV_VAR: None,
+    }
+
+    original_values = {key: os.environ.get(key) for key in values}
+
+    # ----------------------------------------------------------------------
+    def Apply(values):
+        for key, value in values.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    # ----------------------------------------------------------------------
+
+    Apply(values)
+
+    try:
+        yield
+    finally:
+        Apply(original_values)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+class _PhaseCollectorSink(Timing.Sink):
+    """Accumulates phase durations for the scenario that is currently running"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, trace_filename):
+        self._trace_sink                    = Timing.ChromeTraceSink(trace_filename) if trace_filename else None
+        self._phases                        = OrderedDict()
+
+    # ----------------------------------------------------------------------
+    @Interface.override
+    def OnPhase(self, phase_info):
+        self._phases[phase_info.Name] = self._phases.get(phase_info.Name, 0.0) + phase_info.Duration
+
+        if self._trace_sink is not None:
+            self._trace_sink.OnPhase(phase_info)
+
+    # ----------------------------------------------------------------------
+    @Interface.override
+    def Close(self):
+        if self._trace_sink is not None:
+            self._trace_sink.Close()
+
+    # ----------------------------------------------------------------------
+    def Reset(self):
+        phases = self._phases
+        self._phases = OrderedDict()
+
+        return phases
+
+
+# ----------------------------------------------------------------------
+def _RunScenario(context, scenario_name, iterations, phase_sink):
+    func = {
+        "ExtractCoverageInfo": _ExtractCoverageInfoScenario,
+        "ExtractMethodCoverageInfo": _ExtractMethodCoverageInfoScenario,
+        "ExtractCoverageInfoBatch": _ExtractCoverageInfoBatchScenario,
+        "ExtractCoverageInfo (cached)": _ExtractCoverageInfoCachedScenario,
+        "ExtractCoverageInfo (sharded)": _ExtractCoverageInfoShardedScenario,
+        "CoverageIndex": _CoverageIndexScenario,
+        "Pipeline": _PipelineScenario,
+    }[scenario_name]
+
+    with func(context) as iteration_func:
+        # Warm up (and verify that the scenario works before timing it)
+        iteration_func()
+        phase_sink.Reset()
+
+        durations = []
+
+        for _ in range(iterations):
+            start_time = time.perf_counter()
+            iteration_func()
+            durations.append(time.perf_counter() - start_time)
+
+        phases = phase_sink.Reset()
+
+        # Memory is measured in a separate iteration so that tracing doesn't impact the timings
+        tracemalloc.start()
+
+        try:
+            iteration_func()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        phase_sink.Reset()
+
+    best_duration = min(durations)
+
+    return OrderedDict(
+        [
+            ("seconds", best_duration),
+            ("rows_per_second", context.NumRows / best_duration),
+            ("peak_memory", peak_memory),
+            ("phases", OrderedDict((name, duration / iterations) for name, duration in phases.items())),
+        ],
+    )
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def _ExtractCoverageInfoScenario(context):
+    # ----------------------------------------------------------------------
+    def Impl():
+        for coverage_filename, binary_filename in zip(context.CoverageFilenames, context.BinaryFilenames):
+            _VerifyResult(
+                CodeCoverageExecutor.ExtractCoverageInfo(
+                    coverage_filename,
+                    binary_filename,
+                    context.Includes,
+                    context.Excludes,
+                    _NullStream,
+                ),
+            )
+
+    # ----------------------------------------------------------------------
+
+    yield Impl
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def _ExtractMethodCoverageInfoScenario(context):
+    # ----------------------------------------------------------------------
+    def Impl():
+        for coverage_filename, binary_filename in zip(context.CoverageFilenames, context.BinaryFilenames):
+            _VerifyResult(
+                CodeCoverageExecutor.ExtractMethodCoverageInfo(
+                    coverage_filename,
+                    binary_filename,
+                    context.Includes,
+                    context.Excludes,
+                    _NullStream,
+                ),
+            )
+
+    # ----------------------------------------------------------------------
+
+    yield Impl
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def _ExtractCoverageInfoBatchScenario(context):
+    # ----------------------------------------------------------------------
+    def Impl():
+        _ExtractBatch(context, list(zip(context.CoverageFilenames, context.BinaryFilenames)))
+
+    # ----------------------------------------------------------------------
+
+    yield Impl
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def _ExtractCoverageInfoCachedScenario(context):
+    os.environ[CoverageCache.CACHE_DIR_ENV_VAR] = context.CacheDirectory
+
+    try:
+        with _ExtractCoverageInfoScenario(context) as impl:
+            yield impl
+    finally:
+        del os.environ[CoverageCache.CACHE_DIR_ENV_VAR]
+        shutil.rmtree(context.CacheDirectory, ignore_errors=True)
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def _ExtractCoverageInfoShardedScenario(context):
+    os.environ[CoverageShards.WORKERS_ENV_VAR] = str(context.MaxWorkers or os.cpu_count() or 1)
+
+    try:
+        with _ExtractCoverageInfoScenario(context) as impl:
+            yield impl
+    finally:
+        del os.environ[CoverageShards.WORKERS_ENV_VAR]
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def _CoverageIndexScenario(context):
+    all_results = []
+
+    for coverage_filename, binary_filename in zip(context.CoverageFilenames, context.BinaryFilenames):
+        results = CodeCoverageExecutor.ExtractMethodCoverageInfo(
+            coverage_filename,
+            binary_filename,
+            [],
+            [],
+            _NullStream,
+        )
+
+        _VerifyResult(results)
+        all_results.append(results)
+
+    # ----------------------------------------------------------------------
+    def Impl():
+        for results in all_results:
+            index = CoverageIndex(results)
+
+            index.Totals(includes=context.ScopeIncludes, excludes=context.ScopeExcludes)
+            index.NamespaceTotals()
+            index.ClassTotals()
+
+    # ----------------------------------------------------------------------
+
+    yield Impl
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def _PipelineScenario(context):
+    # ----------------------------------------------------------------------
+    def Impl():
+        context.ResetBinaries()
+
+        for result in CodeCoverageExecutor.PreprocessBinaries(
+            context.BinaryFilenames,
+            _NullStream,
+            max_workers=context.MaxWorkers,
+        ):
+            _VerifyResult(result)
+
+        with CoverageSession.CoverageSession(context.CoverageDirectory, _NullStream) as session:
+            for binary_filename in context.BinaryFilenames:
+                _VerifyResult(session.Run(binary_filename, context.Stubs["NoOp"]))
+
+        _ExtractBatch(
+            context,
+            [(session.CoverageFilename, binary_filename) for binary_filename in session.BinaryFilenames],
+        )
+
+    # ----------------------------------------------------------------------
+
+    try:
+        yield Impl
+    finally:
+        context.ResetBinaries()
+
+
+# ----------------------------------------------------------------------
+def _ExtractBatch(context, items):
+    for result in CodeCoverageExecutor.ExtractCoverageInfoBatch(
+        items,
+        context.Includes,
+        context.Excludes,
+        _NullStream,
+        max_workers=context.MaxWorkers,
+    ):
+        if result.Error is not None:
+            raise Exception(result.Error)
+
+        _VerifyResult(result.Result)
+
+
+# ----------------------------------------------------------------------
+def _VerifyResult(result):
+    if isinstance(result, int) and result != 0:
+        raise Exception("The scenario failed ({})".format(result))
+
+
+# ----------------------------------------------------------------------
+def _WriteResults(results, output_stream):
+    output_stream.write(
+        "{:<30}  {:>10}  {:>14}  {:>12}\n".format("Scenario", "Seconds", "Rows/s", "Peak Memory"),
+    )
+    output_stream.write("{}  {}  {}  {}\n".format("-" * 30, "-" * 10, "-" * 14, "-" * 12))
+
+    for scenario_name, info in results.items():
+        output_stream.write(
+            "{:<30}  {:>10.3f}  {:>14,.0f}  {:>9.1f} MB\n".format(
+                scenario_name,
+                info["seconds"],
+                info["rows_per_second"],
+                info["peak_memory"] / (1024.0 * 1024.0),
+            ),
+        )
+
+        for phase_name, duration in info["phases"].items():
+            output_stream.write("    {:<26}  {:>10.3f}\n".format(phase_name, duration))
+
+
+# ----------------------------------------------------------------------
+def _CompareToBaseline(results, baseline_results, tolerance, output_stream):
+    regressions = []
+
+    for scenario_name, info in results.items():
+        baseline_info = baseline_results.get(scenario_name)
+        if baseline_info is None:
+            continue
+
+        if info["rows_per_second"] < baseline_info["rows_per_second"] * (1.0 - tolerance):
+            regressions.append(
+                "{}: {:,.0f} rows/s (baseline: {:,.0f} rows/s)".format(
+                    scenario_name,
+                    info["rows_per_second"],
+                    baseline_info["rows_per_second"],
+                ),
+            )
+
+        if info["peak_memory"] > baseline_info["peak_memory"] * (1.0 + tolerance):
+            regressions.append(
+                "{}: {:.1f} MB peak memory (baseline: {:.1f} MB)".format(
+                    scenario_name,
+                    info["peak_memory"] / (1024.0 * 1024.0),
+                    baseline_info["peak_memory"] / (1024.0 * 1024.0),
+                ),
+            )
+
+    if not regressions:
+        output_stream.write("\nNo regressions were detected.\n")
+        return 0
+
+    output_stream.write(
+        "\nRegressions were detected:\n{}\n".format(
+            "\n".join("    - {}".format(regression) for regression in regressions),
+        ),
+    )
+
+    return -1
+
+
+# ----------------------------------------------------------------------
+def _CreateMethodName(index, name_length):
+    name = "Namespace{}::Class{}::Method{}".format(
+        index % _NUM_NAMESPACES,
+        index % _NUM_CLASSES,
+        index,
+    )
+
+    if len(name) < name_length:
+        # Pad with template arguments, which are common in long method names
+        arguments = ("int, " * (name_length // 5 + 1))[:name_length - len(name) - 2].rstrip(", ")
+        name = "{}<{}>".format(name, arguments)
+
+    return name
+
+
+# ----------------------------------------------------------------------
+def _CreateRow(module_name, name, binary_index, method_index):
+    value = method_index * 31 + binary_index * 17
+
+    return '"{}","{}",{},{},{},{},{},"Namespace{}","Class{}","Namespace{}\\Class{}.cpp"\n'.format(
+        module_name,
+        name.replace('"', '""'),
+        value % 11,
+        value % 3,
+        value % 5,
+        value % 13,
+        value % 7,
+        method_index % _NUM_NAMESPACES,
+        method_index % _NUM_CLASSES,
+        method_index % _NUM_NAMESPACES,
+        method_index % _NUM_CLASSES,
+    )
+
+
+# ----------------------------------------------------------------------
+def _CreateScopePrefixes(num_prefixes, offset):
+    prefixes = []
+
+    for index in range(num_prefixes):
+        value = offset + index
+
+        if index % 2 == 0:
+            prefixes.append("Namespace{}".format(value % _NUM_NAMESPACES))
+        else:
+            prefixes.append("Namespace{}::Class{}".format(value % _NUM_NAMESPACES, value % _NUM_CLASSES))
+
+    return prefixes
+
+
+# ----------------------------------------------------------------------
+def _CreatePatterns(names, num_patterns, pattern_shape, offset):
+    patterns = []
+
+    for index in range(num_patterns):
+        shape = pattern_shape if pattern_shape != "mixed" else PATTERN_SHAPES[index % (len(PATTERN_SHAPES) - 1)]
+        value = offset + index
+
+        if shape == "prefix":
+            patterns.append("Namespace{}::*".format(value % _NUM_NAMESPACES))
+        elif shape == "suffix":
+            patterns.append("*{}".format(names[(value * 7919) % len(names)][-12:]))
+        elif shape == "contains":
+            patterns.append("*::Class{}::*".format(value % _NUM_CLASSES))
+        elif shape == "exact":
+            patterns.append(names[(value * 104729) % len(names)])
+        else:
+            assert False, shape
+
+    return patterns
+
+
+# ----------------------------------------------------------------------
+class _NullStream(object):
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def write(content):
+        pass
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def flush():
+        pass
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass